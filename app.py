@@ -1,17 +1,38 @@
-from flask import Flask, jsonify, request
+from flask import Flask, Response, g, jsonify, request
 from flask_cors import CORS
 from datetime import datetime, timezone, timedelta
 import requests
+import asyncio
 import logging
+import atexit
 import threading
 import time
+import math
 import os
-from rdflib import Graph, Namespace, URIRef, Literal, RDF, RDFS, OWL
+import re
+import tempfile
+from urllib.parse import urlsplit
+from concurrent.futures import ThreadPoolExecutor
+from rdflib import URIRef, Literal, RDF
 from rdflib.namespace import XSD
-import owlrl
 
 # Import du module d'exploration d'ontologie
 from ontology_explorer import OntologyExplorer
+from ontology_template import OntologyTemplate, FLOOD_NS
+from http_client import UpstreamConnectionConfig
+from async_ingestion import AsyncUpstreamClient
+from circuit_breaker import CircuitOpenError, CLOSED
+from singleflight import SingleFlight
+from ttl_cache import TTLCache
+from shared_cache import SQLiteCacheBackend, LeaderLock, private_directory
+from http_cache import JSONResponseCache
+from timeseries import TimeSeries, HydroSeriesStore, parse_time_bound, DOWNSAMPLING_METHODS, MIN_DOWNSAMPLING_POINTS
+from features import FeatureStore
+from openmeteo_cache import OpenMeteoDayCache
+from events import EventBroker
+from scheduler import RefreshScheduler
+from swrl_engine import SWRLRuleEngine
+import metrics
 
 # Configuration du logging
 logging.basicConfig(
@@ -27,28 +48,58 @@ app = Flask(__name__)
 CORS(app, resources={r"/api/*": {"origins": "*", "allow_headers": "*", "expose_headers": "*"}})
 
 # Configuration
+# Les URLs des APIs externes et les chemins de l'ontologie peuvent être remplacés par variables
+# d'environnement (ex: serveur local des benchmarks)
 # API principale (WIGOS)
-METEO_API_BASE_URL = "https://wis2.meteoburkina.bf/oapi/collections/urn:wmo:md:bf-anam:mx2w8y/items"
+METEO_API_BASE_URL = os.environ.get(
+    "METEO_API_BASE_URL", "https://wis2.meteoburkina.bf/oapi/collections/urn:wmo:md:bf-anam:mx2w8y/items")
 WIGOS_STATION_ID = "0-854-0-090"
 DEFAULT_LIMIT = 6
 
 # Chemin vers l'ontologie et les règles SWRL
-ONTOLOGY_PATH = os.path.join(os.path.dirname(__file__), "data", "ontologie_inondations_ouagadougou_fixed.owl")
-SWRL_RULES_PATH = os.path.join(os.path.dirname(__file__), "data", "swrl_rules_final.txt")
+ONTOLOGY_PATH = os.environ.get(
+    "ONTOLOGY_PATH", os.path.join(os.path.dirname(__file__), "data", "ontologie_inondations_ouagadougou_fixed.owl"))
+SWRL_RULES_PATH = os.environ.get(
+    "SWRL_RULES_PATH", os.path.join(os.path.dirname(__file__), "data", "swrl_rules_final.txt"))
 
 # API alternative (Open-Meteo)
-OPENMETEO_API_URL = "https://api.open-meteo.com/v1/forecast"
+OPENMETEO_API_URL = os.environ.get("OPENMETEO_API_URL", "https://api.open-meteo.com/v1/forecast")
 # Coordonnées de Ouagadougou (station de Somgandé)
 OUAGA_LAT = 12.4052
 OUAGA_LON = -1.5063
 
 # Configuration API FANFAR pour les données hydrologiques
-FANFAR_API_BASE_URL = "https://hypewebapp.smhi.se/fanfar/server/point"
+FANFAR_API_BASE_URL = os.environ.get("FANFAR_API_BASE_URL", "https://hypewebapp.smhi.se/fanfar/server/point")
 FANFAR_MODEL = "wa-hype1.2_hgfd3.2_ecoper_noEOWL_INSITU-AR"
 # Station de WAYEN sur la Volta Blanche
 WAYEN_STATION_SUBID = 208493
 WAYEN_STATION_Y = 12.41203
 
+# Zone de prédiction par défaut : Ouagadougou, observée par la station WIGOS de Ouagadougou
+# (ou Open-Meteo à ses coordonnées) et située en aval de la station FANFAR de Wayen
+DEFAULT_PREDICTION_ZONE = {
+    "name": "Ouagadougou",
+    "hydro_station": "Wayen",
+    "station_id": WAYEN_STATION_SUBID,
+    "station_y": WAYEN_STATION_Y,
+    "wigos_station_id": WIGOS_STATION_ID,
+    "latitude": OUAGA_LAT,
+    "longitude": OUAGA_LON
+}
+# Champs d'une zone de prédiction et leur type
+PREDICTION_ZONE_FIELDS = {
+    "name": str,
+    "hydro_station": str,
+    "station_id": int,
+    "station_y": float,
+    "wigos_station_id": str,
+    "latitude": float,
+    "longitude": float
+}
+# Prédictions groupées : nombre maximal de zones par requête et de zones évaluées en parallèle
+PREDICTION_BATCH_MAX_ZONES = 100
+PREDICTION_BATCH_MAX_WORKERS = int(os.environ.get("PREDICTION_BATCH_MAX_WORKERS", 8))
+
 # Paramètres météo à récupérer
 METEO_PARAMETERS = [
     "air_temperature",
@@ -59,6 +110,50 @@ METEO_PARAMETERS = [
     "total_precipitation_or_total_water_equivalent"
 ]
 
+# Connexions aux APIs externes : connexions persistantes par hôte, tentatives et délais d'attente,
+# communs aux backends aiohttp et requests (repli) de l'ingestion asynchrone
+HTTP_POOL_SIZE = int(os.environ.get("HTTP_POOL_SIZE", 10))
+HTTP_RETRIES = 2
+HTTP_BACKOFF_FACTOR = 0.5
+# Délais d'attente par hôte (en secondes)
+UPSTREAM_TIMEOUTS = {
+    "wis2.meteoburkina.bf": 10,
+    "api.open-meteo.com": 10,
+    "hypewebapp.smhi.se": 15
+}
+# L'historique WIGOS renvoie des réponses plus volumineuses
+METEO_HISTORY_TIMEOUT = 15
+
+upstream_config = UpstreamConnectionConfig(
+    pool_size=HTTP_POOL_SIZE,
+    retries=HTTP_RETRIES,
+    backoff_factor=HTTP_BACKOFF_FACTOR,
+    timeouts=UPSTREAM_TIMEOUTS
+)
+
+# Ingestion asynchrone : les requêtes vers les APIs externes s'exécutent sur une boucle asyncio
+# à concurrence bornée ; les routes Flask attendent leur résultat via la façade synchrone
+UPSTREAM_MAX_CONCURRENCY = int(os.environ.get("UPSTREAM_MAX_CONCURRENCY", 16))
+# Disjoncteur par hôte : un hôte dont les requêtes récentes échouent ou approchent du délai d'attente
+# est contourné (WIGOS -> Open-Meteo) jusqu'à ce qu'une requête de sonde confirme son rétablissement
+CIRCUIT_BREAKER_OPTIONS = {
+    "window_size": 20,
+    "min_calls": 5,
+    "failure_rate_threshold": 0.5,
+    "slow_call_rate_threshold": 0.8,
+    "open_duration": 30,
+    "max_open_duration": 300
+}
+# Nom de chaque API externe dans les métriques
+UPSTREAM_NAMES = {
+    urlsplit(METEO_API_BASE_URL).netloc: "wigos",
+    urlsplit(OPENMETEO_API_URL).netloc: "open-meteo",
+    urlsplit(FANFAR_API_BASE_URL).netloc: "fanfar"
+}
+upstream = AsyncUpstreamClient(upstream_config, max_concurrency=UPSTREAM_MAX_CONCURRENCY,
+                               breaker_options=CIRCUIT_BREAKER_OPTIONS, upstream_names=UPSTREAM_NAMES)
+atexit.register(upstream.close)
+
 # Mapping entre les paramètres WIGOS et Open-Meteo
 OPENMETEO_PARAM_MAPPING = {
     "air_temperature": "temperature_2m",
@@ -79,30 +174,228 @@ OPENMETEO_UNITS = {
     "total_precipitation_or_total_water_equivalent": "mm"
 }
 
-# Cache global pour stocker les données
-cache = {
-    "meteo": None,
-    "meteo_timestamp": None,
-    "meteo_history": None,
-    "meteo_history_timestamp": None,
-    "hydro": None,
-    "hydro_timestamp": None,
-    "hydro_history": None,
-    "hydro_history_timestamp": None,
-    "flood_prediction": None,
-    "flood_prediction_timestamp": None,
-    "cache_lifetime": 300  # 5 minutes en secondes
+# Intervalles de rafraîchissement par source, alignés sur leur fréquence de publication (secondes)
+METEO_REFRESH_INTERVAL = 900  # observations WIGOS horaires, captées au plus 15 minutes après publication
+METEO_HISTORY_REFRESH_INTERVAL = 3600
+# Les simulations FANFAR sont produites une fois par jour, mais leur heure de publication n'est pas
+# garantie : interroger toutes les 3 heures capte une nouvelle simulation au plus 3 heures après sa
+# publication, pour 8 requêtes par jour, au lieu d'un retard pouvant atteindre 24 heures
+FANFAR_REFRESH_INTERVAL = 3 * 3600
+REFRESH_MARGIN = 10  # Rafraîchir 10 secondes avant l'expiration
+
+# Caches des données, indexés par les arguments complets de chaque fonction de récupération ;
+# une entrée vit le temps de l'intervalle de rafraîchissement de sa source
+CACHE_TTLS = {
+    "meteo": METEO_REFRESH_INTERVAL,
+    "meteo_history": METEO_HISTORY_REFRESH_INTERVAL,
+    "hydro": FANFAR_REFRESH_INTERVAL,
+    "hydro_history": FANFAR_REFRESH_INTERVAL,
+    # Recalculée après chaque rafraîchissement de ses données d'entrée
+    "flood_prediction": METEO_REFRESH_INTERVAL
+}
+# Durée après expiration pendant laquelle une entrée est encore servie pendant sa revalidation
+CACHE_MAX_STALE = int(os.environ.get("CACHE_MAX_STALE", 3600))
+CACHE_MAX_ENTRIES = 64  # Nombre maximal de dates, stations ou périodes conservées par type de données
+
+# Cache partagé entre les workers d'un même hôte (SQLite WAL) et élection du processus
+# chargé de la boucle de rafraîchissement. Le répertoire doit être privé (0700, utilisateur courant) :
+# sinon un répertoire temporaire propre au processus est utilisé à la place
+SHARED_CACHE_DIR = private_directory(
+    os.environ.get("SHARED_CACHE_DIR", os.path.join(tempfile.gettempdir(), "bf-flood-prediction"))
+)
+LEADER_RETRY_INTERVAL = 30  # secondes entre deux tentatives d'élection pour les autres workers
+shared_cache_backend = SQLiteCacheBackend(os.path.join(SHARED_CACHE_DIR, "cache.sqlite3"))
+refresh_leader = LeaderLock(os.path.join(SHARED_CACHE_DIR, "refresh.lock"))
+
+caches = {
+    slot: TTLCache(maxsize=CACHE_MAX_ENTRIES, ttl=ttl, backend=shared_cache_backend, name=slot)
+    for slot, ttl in CACHE_TTLS.items()
 }
 
+# Niveaux de risque produits par les règles SWRL, du plus faible au plus élevé
+RISK_LEVELS = {
+    FLOOD_NS.LowRisk: "Faible",
+    FLOOD_NS.ModerateRisk: "Modéré",
+    FLOOD_NS.HighRisk: "Élevé"
+}
+RISK_ORDER = ["Faible", "Modéré", "Élevé"]
+# Station pour laquelle les seuils de débit des règles 5 (alerte, 50 m³/s) et 7 (risque modéré, 10 m³/s)
+# ont été fixés ; pour les autres stations, ces règles s'appliquent avec les mêmes seuils
+DISCHARGE_RULES_STATION = "Wayen"
+
+# Regroupement des recalculs simultanés lors de l'expiration du cache
+single_flight = SingleFlight()
+
+# Revalidation en arrière-plan des entrées expirées (stale-while-revalidate)
+revalidation_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="revalidation")
+
+# Évaluation parallèle des zones d'une prédiction groupée
+prediction_executor = ThreadPoolExecutor(max_workers=PREDICTION_BATCH_MAX_WORKERS, thread_name_prefix="prediction")
+
+# État du cache pour la dernière donnée servie dans le thread courant (requête Flask)
+_cache_state = threading.local()
+
+def _cached(slot, key, compute, *args):
+    """
+    Retourne la donnée en cache pour (slot, key), ou la recalcule et la met en cache
+    
+    Une entrée expirée depuis moins de CACHE_MAX_STALE secondes est servie immédiatement
+    et recalculée en arrière-plan ; au-delà, l'appelant attend le recalcul.
+    
+    Args:
+        slot (str): Type de données (clé de `caches`)
+        key (tuple): Arguments identifiant la donnée
+        compute (callable): Fonction de récupération appelée avec *args en cas d'absence
+    
+    Returns:
+        La donnée en cache ou le résultat de compute (les erreurs ne sont pas mises en cache)
+    """
+    flight_key = (slot,) + key
+    entry = caches[slot].lookup(key, max_stale=CACHE_MAX_STALE)
+    if entry is not None:
+        value, age, stale = entry
+        _cache_state.info = {"age": round(age, 1), "stale": stale}
+        _cache_state.ttl = caches[slot].ttl
+        if stale:
+            logger.info(f"Données expirées servies pendant leur revalidation: {slot} {key} ({age:.0f} s)")
+            if not single_flight.in_flight(flight_key):
+                revalidation_executor.submit(_revalidate, flight_key, slot, key, compute, *args)
+        else:
+            logger.info(f"Utilisation des données en cache: {slot} {key}")
+        return value
+    
+    # Un seul appelant recalcule la donnée, les appels simultanés attendent son résultat
+    result = single_flight.do(flight_key, _compute_and_store, slot, key, compute, *args)
+    _cache_state.info = {"age": 0.0, "stale": False}
+    _cache_state.ttl = caches[slot].ttl
+    return result
+
+def _compute_and_store(slot, key, compute, *args):
+    """Exécute compute et enregistre son résultat dans le cache s'il ne s'agit pas d'une erreur"""
+    result = compute(*args)
+    if not (isinstance(result, dict) and "error" in result):
+        caches[slot].set(key, result)
+    return result
+
+def _revalidate(flight_key, slot, key, compute, *args):
+    """Recalcule une entrée expirée en arrière-plan ; l'ancienne valeur reste servie en cas d'échec"""
+    try:
+        result = single_flight.do(flight_key, _compute_and_store, slot, key, compute, *args)
+        if isinstance(result, dict) and "error" in result:
+            logger.warning(f"Échec de la revalidation de {slot} {key}: {result['error']}")
+    except Exception as e:
+        logger.error(f"Erreur lors de la revalidation de {slot} {key}: {str(e)}")
+
+def _cache_info():
+    """Retourne l'âge et l'état d'expiration de la dernière donnée servie par le cache dans ce thread"""
+    return getattr(_cache_state, "info", None)
+
+def _cache_max_age():
+    """Retourne la durée de validité côté client de la dernière donnée servie (Cache-Control)"""
+    info = _cache_info()
+    if info is None:
+        return min(CACHE_TTLS.values())
+    return 0 if info["stale"] else _cache_state.ttl - info["age"]
+
+# Séries hydrologiques en colonnes par station, pour les requêtes par intervalle et le sous-échantillonnage
+hydro_series_store = HydroSeriesStore()
+
+# Cumuls, maxima et pentes glissants (24 h, 72 h) des précipitations et des débits,
+# mis à jour à chaque nouvelle observation servie par le cache
+feature_store = FeatureStore()
+PRECIPITATION_PARAMETER = "total_precipitation_or_total_water_equivalent"
+
+# Journées Open-Meteo en mémoire (24 valeurs par paramètre), dont sont extraites l'heure demandée
+# par le repli de la météo actuelle et les heures manquantes de l'historique WIGOS
+openmeteo_days = OpenMeteoDayCache(ttl=CACHE_TTLS["meteo"])
+# Heures récentes non comblées dans l'historique : leur observation WIGOS peut encore être publiée
+METEO_BACKFILL_DELAY = 2
+
+# Réponses JSON avec ETag, requêtes conditionnelles et compression
+response_cache = JSONResponseCache()
+
+# Flux SSE des mises à jour publiées par la boucle de rafraîchissement, partagé entre les workers
+# par le journal d'événements du cache partagé
+SSE_HEARTBEAT_INTERVAL = 15  # secondes
+# Abonnés simultanés par worker ; gunicorn.conf.py abaisse cette limite pour les workers à threads,
+# où chaque abonné occupe un thread (le serveur de développement crée un thread par connexion)
+SSE_MAX_SUBSCRIBERS = int(os.environ.get("SSE_MAX_SUBSCRIBERS", 100))
+STREAM_EVENTS = ("meteo", "hydro", "prediction")
+event_broker = EventBroker(shared_cache_backend, max_subscribers=SSE_MAX_SUBSCRIBERS)
+_published_updates = {}  # type d'événement -> dernier résumé publié par ce processus
+
+# Durée de validité côté client des réponses de l'explorateur ; l'ETag change à chaque rechargement
+ONTOLOGY_HTTP_MAX_AGE = 300
+# Nombre maximal de sauts de voisinage de la visualisation de l'ontologie
+VISUALIZATION_MAX_DEPTH = 10
+
+# Instantanés JSON de l'ontologie fermée, reconstruits uniquement si l'ontologie ou les règles changent
+ONTOLOGY_SNAPSHOT_DIR = os.environ.get("ONTOLOGY_SNAPSHOT_DIR", os.path.join(SHARED_CACHE_DIR, "snapshots"))
+
 # Initialisation de l'explorateur d'ontologie
-ontology_explorer = OntologyExplorer(ONTOLOGY_PATH, SWRL_RULES_PATH)
+ontology_explorer = OntologyExplorer(ONTOLOGY_PATH, SWRL_RULES_PATH, ONTOLOGY_SNAPSHOT_DIR)
+
+# Ontologie de base partagée par les prédictions, analysée et fermée une seule fois au démarrage
+ontology_template = OntologyTemplate(ONTOLOGY_PATH, SWRL_RULES_PATH, ONTOLOGY_SNAPSHOT_DIR)
+ontology_template.load()
+
+# Moteur de règles SWRL compilées depuis le fichier de règles
+rule_engine = SWRLRuleEngine(SWRL_RULES_PATH)
+rule_engine.load()
+
+# Métriques exposées par /metrics (par processus) : les durées sont observées au fil des requêtes,
+# les compteurs des caches et la taille des graphes sont lus uniquement à l'export
+HTTP_REQUEST_SECONDS = metrics.registry.histogram(
+    "bf_flood_http_request_duration_seconds",
+    "Durée de traitement des requêtes HTTP par route",
+    ("route", "method", "status")
+)
+PREDICTION_STAGE_SECONDS = metrics.registry.histogram(
+    "bf_flood_prediction_stage_duration_seconds",
+    "Durée des étapes d'une prédiction (raisonnement OWL-RL incrémental, règles SWRL)",
+    ("stage",),
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1)
+)
+
+def _collect_cache_lookups():
+    for slot, slot_cache in caches.items():
+        stats = slot_cache.stats()
+        yield (slot, "hit"), stats["hits"] - stats["shared_hits"]
+        yield (slot, "shared_hit"), stats["shared_hits"]
+        yield (slot, "stale"), stats["stale_hits"]
+        yield (slot, "miss"), stats["misses"]
+    stats = openmeteo_days.stats()
+    yield ("openmeteo_days", "hit"), stats["hits"]
+    yield ("openmeteo_days", "miss"), stats["misses"]
 
-def get_openmeteo_data(date_iso=None):
+def _collect_graph_triples():
+    for name, graph in (("prediction_base", ontology_template.graph), ("explorer", ontology_explorer.graph)):
+        if graph is not None:
+            yield (name,), len(graph)
+
+metrics.registry.callback("bf_flood_cache_lookups_total", "Consultations des caches par résultat",
+                          "counter", ("slot", "result"), _collect_cache_lookups)
+metrics.registry.callback("bf_flood_cache_entries", "Nombre d'entrées en mémoire par cache", "gauge", ("slot",),
+                          lambda: [((slot,), slot_cache.stats()["size"]) for slot, slot_cache in caches.items()])
+metrics.registry.callback("bf_flood_ontology_triples", "Nombre de triplets des graphes d'ontologie chargés",
+                          "gauge", ("graph",), _collect_graph_triples)
+metrics.registry.callback("bf_flood_circuit_breaker_open", "Disjoncteur ouvert ou semi-ouvert (1) ou fermé (0)",
+                          "gauge", ("host",),
+                          lambda: [((host,), int(stats["state"] != CLOSED))
+                                   for host, stats in upstream.breaker_stats().items()])
+
+def get_openmeteo_data(date_iso=None, latitude=OUAGA_LAT, longitude=OUAGA_LON):
+    """Version synchrone de get_openmeteo_data_async"""
+    return upstream.run(get_openmeteo_data_async(date_iso, latitude, longitude))
+
+async def get_openmeteo_data_async(date_iso=None, latitude=OUAGA_LAT, longitude=OUAGA_LON):
     """
     Récupère les données météorologiques depuis l'API Open-Meteo comme alternative
     
     Args:
         date_iso (str, optional): Date spécifique au format ISO (YYYY-MM-DDTHH:MM:SSZ).
+        latitude (float, optional): Latitude du point. Par défaut, Ouagadougou.
+        longitude (float, optional): Longitude du point. Par défaut, Ouagadougou.
     
     Returns:
         dict: Données météorologiques formatées ou dict avec une clé 'error' en cas d'erreur
@@ -118,52 +411,28 @@ def get_openmeteo_data(date_iso=None):
         # Formater les dates pour Open-Meteo (format YYYY-MM-DD)
         date_str = target_date.strftime('%Y-%m-%d')
         
-        # Préparer les paramètres pour Open-Meteo
-        params = {
-            "latitude": OUAGA_LAT,
-            "longitude": OUAGA_LON,
-            "hourly": ",".join(OPENMETEO_PARAM_MAPPING.values()),  # Tous les paramètres nécessaires
-            "start_date": date_str,
-            "end_date": date_str,
-            "timezone": "UTC"
-        }
-        
-        logger.info(f"Tentative avec API alternative Open-Meteo: {OPENMETEO_API_URL}")
-        response = requests.get(OPENMETEO_API_URL, params=params, timeout=10)
-        
-        if response.status_code != 200:
-            logger.error(f"Erreur API Open-Meteo: {response.status_code}, {response.text}")
-            return {"error": "API Open-Meteo indisponible"}
-            
-        data = response.json()
-        
-        # Vérifier que les données sont complètes
-        if "hourly" not in data or not all(param in data["hourly"] for param in OPENMETEO_PARAM_MAPPING.values()):
+        # La journée entière est conservée en cache : les autres heures de la même date n'appellent plus l'API
+        days = await _fetch_openmeteo_days_async(latitude, longitude, [date_str])
+        if "error" in days:
+            return days
+        if date_str not in days:
             logger.error("API Open-Meteo: données incomplètes")
             return {"error": "Données météorologiques incomplètes depuis Open-Meteo"}
         
-        # Trouver l'heure la plus proche de la date cible
+        # Extraire l'heure cible de la journée
         target_hour = target_date.hour
-        hourly_data = data["hourly"]
+        hourly_values = days[date_str].at(target_hour)
         
         # Organiser les données dans le même format que les données WIGOS
         result = [{
             "reportId": f"openmeteo-{date_str}-{target_hour:02d}",
             "timestamp": f"{date_str}T{target_hour:02d}:00:00Z",
             "reportTime": f"{date_str}T{target_hour:02d}:00:00Z",
-            "station": "open-meteo-ouagadougou",
-            "measurements": {}
+            "station": "open-meteo-ouagadougou" if (latitude, longitude) == (OUAGA_LAT, OUAGA_LON)
+                       else f"open-meteo-{latitude},{longitude}",
+            "measurements": _openmeteo_measurements(hourly_values)
         }]
         
-        # Convertir chaque paramètre Open-Meteo en format WIGOS
-        for wigos_param, openmeteo_param in OPENMETEO_PARAM_MAPPING.items():
-            if openmeteo_param in hourly_data and len(hourly_data[openmeteo_param]) > target_hour:
-                value = hourly_data[openmeteo_param][target_hour]
-                result[0]["measurements"][wigos_param] = {
-                    "value": value,
-                    "unit": OPENMETEO_UNITS[wigos_param]
-                }
-        
         logger.info("Données météo récupérées avec succès depuis Open-Meteo")
         return result
         
@@ -171,7 +440,69 @@ def get_openmeteo_data(date_iso=None):
         logger.error(f"Erreur lors de la récupération des données Open-Meteo: {str(e)}")
         return {"error": f"Erreur avec l'API Open-Meteo: {str(e)}"}
 
-def get_current_meteo(specific_date=None):
+async def _fetch_openmeteo_days_async(latitude, longitude, dates):
+    """
+    Retourne des journées Open-Meteo depuis le cache, les journées absentes étant récupérées en une seule requête
+    
+    Args:
+        latitude (float): Latitude du point
+        longitude (float): Longitude du point
+        dates (list): Dates au format YYYY-MM-DD, triées
+    
+    Returns:
+        dict: Date -> OpenMeteoDay (les journées absentes de la réponse sont omises),
+            ou dict avec une clé 'error' en cas d'erreur
+    
+    Raises:
+        requests.exceptions.RequestException: En cas d'échec de l'appel HTTP
+    """
+    days = {}
+    for date_str in dates:
+        day = openmeteo_days.get(latitude, longitude, date_str)
+        if day is not None:
+            days[date_str] = day
+    missing = [date_str for date_str in dates if date_str not in days]
+    if not missing:
+        logger.info(f"Utilisation des journées Open-Meteo en cache: {', '.join(dates)}")
+        return days
+    
+    # Préparer les paramètres pour Open-Meteo
+    params = {
+        "latitude": latitude,
+        "longitude": longitude,
+        "hourly": ",".join(OPENMETEO_PARAM_MAPPING.values()),  # Tous les paramètres nécessaires
+        "start_date": missing[0],
+        "end_date": missing[-1],
+        "timezone": "UTC"
+    }
+    
+    logger.info(f"Tentative avec API alternative Open-Meteo: {OPENMETEO_API_URL} ({missing[0]} au {missing[-1]})")
+    response = await upstream.get(OPENMETEO_API_URL, params=params)
+    
+    if response.status_code != 200:
+        logger.error(f"Erreur API Open-Meteo: {response.status_code}, {response.text}")
+        return {"error": "API Open-Meteo indisponible"}
+        
+    data = response.json()
+    
+    # Vérifier que les données sont complètes
+    if "hourly" not in data or not all(param in data["hourly"] for param in OPENMETEO_PARAM_MAPPING.values()):
+        logger.error("API Open-Meteo: données incomplètes")
+        return {"error": "Données météorologiques incomplètes depuis Open-Meteo"}
+    
+    fetched = openmeteo_days.store(latitude, longitude, data["hourly"], OPENMETEO_PARAM_MAPPING.values())
+    days.update({date_str: fetched[date_str] for date_str in missing if date_str in fetched})
+    return days
+
+def _openmeteo_measurements(hourly_values):
+    """Convertit les valeurs Open-Meteo d'une heure en mesures au format WIGOS (valeurs manquantes omises)"""
+    return {
+        wigos_param: {"value": hourly_values[openmeteo_param], "unit": OPENMETEO_UNITS[wigos_param]}
+        for wigos_param, openmeteo_param in OPENMETEO_PARAM_MAPPING.items()
+        if hourly_values.get(openmeteo_param) is not None
+    }
+
+def get_current_meteo(specific_date=None, wigos_station_id=WIGOS_STATION_ID, latitude=OUAGA_LAT, longitude=OUAGA_LON):
     """
     Récupère les données météorologiques actuelles depuis l'API Météo Burkina
     ou depuis Open-Meteo en cas d'échec
@@ -179,13 +510,38 @@ def get_current_meteo(specific_date=None):
     Args:
         specific_date (str, optional): Date spécifique au format ISO (YYYY-MM-DDTHH:MM:SSZ).
             Si non spécifiée, utilise l'heure pleine précédente.
+        wigos_station_id (str, optional): Identifiant WIGOS de la station. Par défaut, Ouagadougou.
+        latitude (float, optional): Latitude utilisée par Open-Meteo. Par défaut, Ouagadougou.
+        longitude (float, optional): Longitude utilisée par Open-Meteo. Par défaut, Ouagadougou.
     """
-    # Vérifier si les données en cache sont encore valides
-    current_time = time.time()
-    if cache["meteo"] and cache["meteo_timestamp"] and (current_time - cache["meteo_timestamp"] < cache["cache_lifetime"]):
-        logger.info("Utilisation des données météo en cache")
-        return cache["meteo"]
-    
+    data = _cached("meteo", (specific_date, wigos_station_id, latitude, longitude), _fetch_current_meteo,
+                   specific_date, wigos_station_id, latitude, longitude)
+    if specific_date is None and not (isinstance(data, dict) and "error" in data):
+        feature_store.observe_source(_precipitation_key(wigos_station_id, latitude, longitude), "current",
+                                     data, _precipitation_observations)
+    return data
+
+def _precipitation_key(wigos_station_id, latitude, longitude):
+    """Clé de la série glissante des précipitations d'une station météo"""
+    return ("precipitation", wigos_station_id, latitude, longitude)
+
+def _precipitation_observations(reports, field="measurements"):
+    """Extrait les paires (horodatage en ms, précipitation) de rapports météo"""
+    for report in reports:
+        measurement = report.get(field, {}).get(PRECIPITATION_PARAMETER)
+        if measurement is None or not report.get("timestamp"):
+            continue
+        try:
+            yield parse_time_bound(report["timestamp"]), measurement.get("value")
+        except ValueError:
+            continue
+
+def _fetch_current_meteo(specific_date=None, wigos_station_id=WIGOS_STATION_ID, latitude=OUAGA_LAT, longitude=OUAGA_LON):
+    """Interroge WIGOS puis Open-Meteo en cas d'échec (voir get_current_meteo)"""
+    return upstream.run(_fetch_current_meteo_async(specific_date, wigos_station_id, latitude, longitude))
+
+async def _fetch_current_meteo_async(specific_date=None, wigos_station_id=WIGOS_STATION_ID, latitude=OUAGA_LAT, longitude=OUAGA_LON):
+    """Version asynchrone de _fetch_current_meteo"""
     # Déterminer la date cible
     if specific_date:
         date_iso = specific_date
@@ -202,13 +558,13 @@ def get_current_meteo(specific_date=None):
         params = {
             "f": "json",  # Format JSON explicite
             "datetime": f"{date_iso}/..",
-            "wigos_station_identifier": WIGOS_STATION_ID,
+            "wigos_station_identifier": wigos_station_id,
             "limit": DEFAULT_LIMIT
         }
         
         logger.info(f"Appel API WIGOS: {METEO_API_BASE_URL}?datetime={params['datetime']}&wigos_station_identifier={params['wigos_station_identifier']}&limit={params['limit']}")
         
-        response = requests.get(METEO_API_BASE_URL, params=params, timeout=10)
+        response = await upstream.get(METEO_API_BASE_URL, params=params)
         
         # Vérifier la réponse de l'API
         if response.status_code == 200:
@@ -251,10 +607,6 @@ def get_current_meteo(specific_date=None):
                 result = list(meteo_data.values())
                 result.sort(key=lambda x: x["reportTime"] if x["reportTime"] else "", reverse=True)
                 
-                # Mettre à jour le cache
-                cache["meteo"] = result
-                cache["meteo_timestamp"] = time.time()
-                
                 return result
             else:
                 logger.warning(f"API WIGOS: aucune donnée disponible pour la date {date_iso}, tentative avec Open-Meteo")
@@ -264,16 +616,12 @@ def get_current_meteo(specific_date=None):
         # Si nous arrivons ici, c'est que l'API WIGOS n'a pas fonctionné
         # Tentative avec l'API Open-Meteo
         logger.info("Tentative de récupération des données via Open-Meteo")
-        openmeteo_result = get_openmeteo_data(date_iso)
+        openmeteo_result = await get_openmeteo_data_async(date_iso, latitude, longitude)
         
         if not isinstance(openmeteo_result, dict) or "error" not in openmeteo_result:
             # Succès avec Open-Meteo
             logger.info("Données météo récupérées avec succès depuis Open-Meteo (API alternative)")
             
-            # Mettre à jour le cache
-            cache["meteo"] = openmeteo_result
-            cache["meteo_timestamp"] = time.time()
-            
             return openmeteo_result
         else:
             # Échec avec les deux APIs
@@ -282,18 +630,18 @@ def get_current_meteo(specific_date=None):
             
     except requests.exceptions.RequestException as e:
         # Erreur de requête HTTP avec WIGOS, essayer Open-Meteo
-        logger.error(f"Erreur lors de l'appel à l'API WIGOS: {str(e)}, tentative avec Open-Meteo")
+        if isinstance(e, CircuitOpenError):
+            # WIGOS est connu comme indisponible : bascule immédiate, sans attendre le délai d'attente
+            logger.info(f"{str(e)}, utilisation directe d'Open-Meteo")
+        else:
+            logger.error(f"Erreur lors de l'appel à l'API WIGOS: {str(e)}, tentative avec Open-Meteo")
         
-        openmeteo_result = get_openmeteo_data(date_iso)
+        openmeteo_result = await get_openmeteo_data_async(date_iso, latitude, longitude)
         
         if not isinstance(openmeteo_result, dict) or "error" not in openmeteo_result:
             # Succès avec Open-Meteo
             logger.info("Données météo récupérées avec succès depuis Open-Meteo (API alternative)")
             
-            # Mettre à jour le cache
-            cache["meteo"] = openmeteo_result
-            cache["meteo_timestamp"] = time.time()
-            
             return openmeteo_result
         else:
             # Échec avec les deux APIs
@@ -304,6 +652,48 @@ def get_current_meteo(specific_date=None):
         logger.error(f"Erreur inattendue: {str(e)}")
         return {"error": f"Une erreur inattendue s'est produite: {str(e)}"}
 
+async def _fetch_meteo_history_parameter(param, start_date_iso, end_date_iso, limit):
+    """
+    Récupère l'historique WIGOS d'un seul paramètre météo
+    
+    Args:
+        param (str): Nom du paramètre WIGOS
+        start_date_iso (str): Début de la période au format ISO
+        end_date_iso (str): Fin de la période au format ISO
+        limit (int): Nombre maximal de mesures à récupérer
+    
+    Returns:
+        list: Features GeoJSON renvoyées par l'API (vide si l'API répond sans données)
+    
+    Raises:
+        requests.exceptions.RequestException: En cas d'échec de l'appel HTTP
+    """
+    # Paramètres de la requête
+    params = {
+        "f": "json",
+        "name": param,
+        "datetime": f"{start_date_iso}/{end_date_iso}",
+        "wigos_station_identifier": WIGOS_STATION_ID,
+        # Utiliser une limite plus grande pour récupérer suffisamment de données
+        "limit": limit
+    }
+    
+    logger.info(f"Appel API météo historique pour {param}: {METEO_API_BASE_URL}?name={param}&datetime={params['datetime']}&wigos_station_identifier={params['wigos_station_identifier']}&limit={params['limit']}")
+    
+    response = await upstream.get(METEO_API_BASE_URL, params=params, timeout=METEO_HISTORY_TIMEOUT)
+    
+    if response.status_code != 200:
+        logger.error(f"Erreur API météo historique pour {param}: {response.status_code}")
+        return []
+    
+    data = response.json()
+    
+    if "features" not in data or not data["features"]:
+        logger.warning(f"Aucune donnée d'historique disponible pour {param}")
+        return []
+    
+    return data["features"]
+
 def get_meteo_history_forecast(days_before=5, days_after=5):
     """
     Récupère l'historique météorologique des derniers jours et les prévisions pour les prochains jours
@@ -312,12 +702,18 @@ def get_meteo_history_forecast(days_before=5, days_after=5):
         days_before (int): Nombre de jours d'historique à récupérer
         days_after (int): Nombre de jours de prévisions à récupérer
     """
-    # Vérifier si les données en cache sont encore valides
-    current_time = time.time()
-    if cache["meteo_history"] and cache["meteo_history_timestamp"] and (current_time - cache["meteo_history_timestamp"] < cache["cache_lifetime"]):
-        logger.info("Utilisation des données d'historique météo en cache")
-        return cache["meteo_history"]
-    
+    data = _cached("meteo_history", (days_before, days_after), _fetch_meteo_history_forecast, days_before, days_after)
+    if not (isinstance(data, dict) and "error" in data):
+        feature_store.observe_source(_precipitation_key(WIGOS_STATION_ID, OUAGA_LAT, OUAGA_LON), "history",
+                                     data, lambda d: _precipitation_observations(d["history"], "parameters"))
+    return data
+
+def _fetch_meteo_history_forecast(days_before=5, days_after=5):
+    """Interroge l'historique WIGOS (voir get_meteo_history_forecast)"""
+    return upstream.run(_fetch_meteo_history_forecast_async(days_before, days_after))
+
+async def _fetch_meteo_history_forecast_async(days_before=5, days_after=5):
+    """Version asynchrone de _fetch_meteo_history_forecast"""
     try:
         # Calculer les dates de début et de fin de la période
         now = datetime.now(timezone.utc)
@@ -330,35 +726,18 @@ def get_meteo_history_forecast(days_before=5, days_after=5):
         
         logger.info(f"Récupération des données météo du {start_date_iso} au {end_date_iso}")
         
-        # Récupérer les données pour chaque paramètre météo
+        # Récupérer les données de tous les paramètres météo en parallèle
+        limit = days_before * 24 + days_after * 24  # Approximativement 1 mesure par heure
+        results = await asyncio.gather(*[
+            _fetch_meteo_history_parameter(param, start_date_iso, end_date_iso, limit)
+            for param in METEO_PARAMETERS
+        ])
+        features_by_param = dict(zip(METEO_PARAMETERS, results))
+        
+        # Fusionner les résultats dans l'ordre des paramètres pour un résultat déterministe
         all_data = {}
         for param in METEO_PARAMETERS:
-            # Paramètres de la requête
-            params = {
-                "f": "json",
-                "name": param,
-                "datetime": f"{start_date_iso}/{end_date_iso}",
-                "wigos_station_identifier": WIGOS_STATION_ID,
-                # Utiliser une limite plus grande pour récupérer suffisamment de données
-                "limit": days_before * 24 + days_after * 24  # Approximativement 1 mesure par heure
-            }
-            
-            logger.info(f"Appel API météo historique pour {param}: {METEO_API_BASE_URL}?name={param}&datetime={params['datetime']}&wigos_station_identifier={params['wigos_station_identifier']}&limit={params['limit']}")
-            
-            response = requests.get(METEO_API_BASE_URL, params=params, timeout=15)
-            
-            if response.status_code != 200:
-                logger.error(f"Erreur API météo historique pour {param}: {response.status_code}")
-                continue
-            
-            data = response.json()
-            
-            if "features" not in data or not data["features"]:
-                logger.warning(f"Aucune donnée d'historique disponible pour {param}")
-                continue
-                
-            # Organiser les données par date/heure
-            for feature in data["features"]:
+            for feature in features_by_param[param]:
                 if "properties" not in feature:
                     continue
                     
@@ -392,6 +771,9 @@ def get_meteo_history_forecast(days_before=5, days_after=5):
         history = [item for item in result if item["timestamp"] <= now_str]
         forecast = [item for item in result if item["timestamp"] > now_str]
         
+        # Compléter les heures sans observation WIGOS avec les valeurs Open-Meteo
+        history = await _backfill_meteo_history_async(history, start_date, now)
+        
         final_result = {
             "history": history,
             "forecast": forecast,
@@ -402,16 +784,77 @@ def get_meteo_history_forecast(days_before=5, days_after=5):
             }
         }
         
-        # Mettre à jour le cache
-        cache["meteo_history"] = final_result
-        cache["meteo_history_timestamp"] = time.time()
-        
         return final_result
         
     except Exception as e:
         logger.error(f"Erreur lors de la récupération de l'historique météo: {str(e)}")
         return {"error": f"Erreur lors de la récupération de l'historique météo: {str(e)}"}
 
+async def _backfill_meteo_history_async(history, start_date, now, latitude=OUAGA_LAT, longitude=OUAGA_LON):
+    """
+    Comble les heures sans observation WIGOS de l'historique avec les valeurs Open-Meteo
+    
+    Les heures comblées portent "source": "open-meteo" ; les METEO_BACKFILL_DELAY dernières heures
+    ne sont pas comblées.
+    
+    Args:
+        history (list): Historique WIGOS trié ({"timestamp", "parameters"})
+        start_date (datetime): Début de la période
+        now (datetime): Date courante (UTC)
+        latitude (float, optional): Latitude utilisée par Open-Meteo. Par défaut, Ouagadougou.
+        longitude (float, optional): Longitude utilisée par Open-Meteo. Par défaut, Ouagadougou.
+    
+    Returns:
+        list: Historique complété et trié ; inchangé si Open-Meteo est indisponible
+    """
+    observed = set()
+    for item in history:
+        try:
+            observed.add(parse_time_bound(item["timestamp"]) // 3600000)
+        except ValueError:
+            continue
+    
+    # Heures manquantes, regroupées par journée
+    last_hour = now.replace(minute=0, second=0, microsecond=0) - timedelta(hours=METEO_BACKFILL_DELAY)
+    missing = {}
+    hour = start_date.replace(minute=0, second=0, microsecond=0)
+    while hour <= last_hour:
+        if int(hour.timestamp()) // 3600 not in observed:
+            missing.setdefault(hour.strftime("%Y-%m-%d"), []).append(hour.hour)
+        hour += timedelta(hours=1)
+    if not missing:
+        return history
+    
+    try:
+        days = await _fetch_openmeteo_days_async(latitude, longitude, sorted(missing))
+    except requests.exceptions.RequestException as e:
+        days = {"error": str(e)}
+    if "error" in days:
+        logger.warning(f"Lacunes de l'historique WIGOS non comblées: {days['error']}")
+        return history
+    
+    filled = []
+    for date_str, hours in missing.items():
+        if date_str not in days:
+            continue
+        # Une seule extraction par journée, couvrant toutes ses heures manquantes
+        first_hour = hours[0]
+        columns = days[date_str].between(first_hour, hours[-1])
+        for hour in hours:
+            values = {param: column[hour - first_hour] for param, column in columns.items()}
+            measurements = _openmeteo_measurements({param: None if math.isnan(value) else float(value)
+                                                    for param, value in values.items()})
+            if measurements:
+                filled.append({
+                    "timestamp": f"{date_str}T{hour:02d}:00:00Z",
+                    "parameters": measurements,
+                    "source": "open-meteo"
+                })
+    
+    if filled:
+        logger.info(f"{len(filled)} heure(s) manquante(s) de l'historique WIGOS comblée(s) avec Open-Meteo")
+    return sorted(history + filled, key=lambda item: item["timestamp"])
+
 def get_current_hydro(station_subid=WAYEN_STATION_SUBID, station_y=WAYEN_STATION_Y):
     """
     Récupère les données hydrologiques actuelles depuis l'API FANFAR
@@ -420,19 +863,36 @@ def get_current_hydro(station_subid=WAYEN_STATION_SUBID, station_y=WAYEN_STATION
         station_subid (int, optional): ID de la sous-station à utiliser. Par défaut, station de WAYEN.
         station_y (float, optional): Coordonnée Y de la station. Par défaut, station de WAYEN.
     """
-    # Vérifier si les données en cache sont encore valides
-    current_time = time.time()
-    if cache["hydro"] and cache["hydro_timestamp"] and (current_time - cache["hydro_timestamp"] < cache["cache_lifetime"]):
-        logger.info("Utilisation des données hydro en cache")
-        return cache["hydro"]
-    
+    data = _cached("hydro", (station_subid, station_y), _fetch_current_hydro, station_subid, station_y)
+    if not (isinstance(data, dict) and "error" in data):
+        feature_store.observe_source(_discharge_key(station_subid, station_y), "current", data,
+                                     _current_discharge_observations)
+    return data
+
+def _current_discharge_observations(data):
+    """Débits simulés récents et débit actuel d'une donnée hydro actuelle, en paires (horodatage en ms, débit)"""
+    recent = data.get("recent") or {}  # absent des données mises en cache par une version précédente
+    points = list(zip(recent.get("timestamp", []), recent.get("discharge", [])))
+    points.append((data["current"].get("timestamp"), data["current"].get("discharge")))
+    return points
+
+def _discharge_key(station_subid, station_y):
+    """Clé de la série glissante des débits d'une station hydrologique"""
+    return ("discharge", station_subid, station_y)
+
+def _fetch_current_hydro(station_subid=WAYEN_STATION_SUBID, station_y=WAYEN_STATION_Y):
+    """Interroge FANFAR (voir get_current_hydro)"""
+    return upstream.run(_fetch_current_hydro_async(station_subid, station_y))
+
+async def _fetch_current_hydro_async(station_subid=WAYEN_STATION_SUBID, station_y=WAYEN_STATION_Y):
+    """Version asynchrone de _fetch_current_hydro"""
     try:
         # Construire l'URL de l'API FANFAR
         url = f"{FANFAR_API_BASE_URL}/{FANFAR_MODEL}?x=undefined&y={station_y}&subid={station_subid}"
         
         logger.info(f"Appel API FANFAR: {url}")
         
-        response = requests.get(url, timeout=15)
+        response = await upstream.get(url)
         
         if response.status_code != 200:
             logger.error(f"Erreur API FANFAR: {response.status_code}, {response.text}")
@@ -465,6 +925,14 @@ def get_current_hydro(station_subid=WAYEN_STATION_SUBID, station_y=WAYEN_STATION
             "hq30": data["chartData"].get("hq30")  # Crue trentennale
         }
         
+        # Débits simulés précédant le débit actuel, sur la plus grande fenêtre glissante : ils amorcent
+        # la série des débits de la station sans requête d'historique supplémentaire
+        recent = []
+        if current_timestamp:
+            recent_start = current_timestamp - max(feature_store.windows.values()) * 3600 * 1000
+            recent = [point for point in data["chartData"].get("hindcast") or []
+                      if len(point) >= 2 and recent_start < point[0] < current_timestamp]
+        
         # Formater les données de sortie
         result = {
             "station": {
@@ -480,13 +948,13 @@ def get_current_hydro(station_subid=WAYEN_STATION_SUBID, station_y=WAYEN_STATION
                 "discharge": current_flow,  # Débit en m³/s
                 "unit": "m³/s"
             },
+            "recent": {
+                "timestamp": [point[0] for point in recent],
+                "discharge": [point[1] for point in recent]
+            },
             "thresholds": thresholds
         }
         
-        # Mettre à jour le cache
-        cache["hydro"] = result
-        cache["hydro_timestamp"] = time.time()
-        
         logger.info(f"Données hydrologiques récupérées avec succès pour la station {station_info.get('name')}")
         return result
         
@@ -497,27 +965,40 @@ def get_current_hydro(station_subid=WAYEN_STATION_SUBID, station_y=WAYEN_STATION
         logger.error(f"Erreur inattendue: {str(e)}")
         return {"error": f"Une erreur inattendue s'est produite: {str(e)}"}
 
-def get_hydro_history_forecast(station_subid=WAYEN_STATION_SUBID, station_y=WAYEN_STATION_Y):
+def get_hydro_history_forecast(station_subid=WAYEN_STATION_SUBID, station_y=WAYEN_STATION_Y,
+                               start=None, end=None, max_points=None, method="lttb"):
     """
     Récupère l'historique et les prévisions hydrologiques depuis l'API FANFAR
     
     Args:
         station_subid (int, optional): ID de la sous-station à utiliser. Par défaut, station de WAYEN.
         station_y (float, optional): Coordonnée Y de la station. Par défaut, station de WAYEN.
+        start (int, optional): Début de l'intervalle demandé (horodatage en millisecondes)
+        end (int, optional): Fin de l'intervalle demandé (horodatage en millisecondes)
+        max_points (int, optional): Nombre maximal de points par série (sous-échantillonnage)
+        method (str, optional): Méthode de sous-échantillonnage ("lttb" ou "minmax")
     """
-    # Vérifier si les données en cache sont encore valides
-    current_time = time.time()
-    if cache["hydro_history"] and cache["hydro_history_timestamp"] and (current_time - cache["hydro_history_timestamp"] < cache["cache_lifetime"]):
-        logger.info("Utilisation des données d'historique hydro en cache")
-        return cache["hydro_history"]
-    
+    station = (station_subid, station_y)
+    data = _cached("hydro_history", station, _fetch_hydro_history_forecast, station_subid, station_y)
+    if isinstance(data, dict) and "error" in data:
+        return data
+    feature_store.observe_source(_discharge_key(station_subid, station_y), "history", data,
+                                 lambda d: zip(d["history"]["timestamp"], d["history"]["discharge"]))
+    return hydro_series_store.query(station, data, start, end, max_points, method)
+
+def _fetch_hydro_history_forecast(station_subid=WAYEN_STATION_SUBID, station_y=WAYEN_STATION_Y):
+    """Interroge l'historique FANFAR (voir get_hydro_history_forecast)"""
+    return upstream.run(_fetch_hydro_history_forecast_async(station_subid, station_y))
+
+async def _fetch_hydro_history_forecast_async(station_subid=WAYEN_STATION_SUBID, station_y=WAYEN_STATION_Y):
+    """Version asynchrone de _fetch_hydro_history_forecast ; la requête FANFAR est partagée avec les données actuelles"""
     try:
         # Construire l'URL de l'API FANFAR
         url = f"{FANFAR_API_BASE_URL}/{FANFAR_MODEL}?x=undefined&y={station_y}&subid={station_subid}"
         
         logger.info(f"Appel API FANFAR pour historique et prévisions: {url}")
         
-        response = requests.get(url, timeout=15)
+        response = await upstream.get(url)
         
         if response.status_code != 200:
             logger.error(f"Erreur API FANFAR: {response.status_code}, {response.text}")
@@ -535,30 +1016,10 @@ def get_hydro_history_forecast(station_subid=WAYEN_STATION_SUBID, station_y=WAYE
         hindcast_data = data["chartData"]["hindcast"]  # Données historiques
         forecast_data = data["chartData"]["forecast"]  # Données de prévision
         
-        # Convertir les données en format plus lisible
-        history = []
-        for item in hindcast_data:
-            if len(item) >= 2:
-                timestamp = item[0]  # Timestamp en millisecondes
-                flow = item[1]       # Débit en m³/s
-                history.append({
-                    "timestamp": timestamp,
-                    "datetime": datetime.fromtimestamp(timestamp / 1000).strftime("%Y-%m-%dT%H:%M:%SZ"),
-                    "discharge": flow,
-                    "unit": "m³/s"
-                })
-        
-        forecast = []
-        for item in forecast_data:
-            if len(item) >= 2:
-                timestamp = item[0]  # Timestamp en millisecondes
-                flow = item[1]       # Débit en m³/s
-                forecast.append({
-                    "timestamp": timestamp,
-                    "datetime": datetime.fromtimestamp(timestamp / 1000).strftime("%Y-%m-%dT%H:%M:%SZ"),
-                    "discharge": flow,
-                    "unit": "m³/s"
-                })
+        # Conserver les séries en colonnes (horodatages en ms, débits en m³/s) ; les points
+        # de l'API sont construits à la demande pour l'intervalle et la résolution demandés
+        history = TimeSeries.from_pairs(hindcast_data).to_columns("discharge")
+        forecast = TimeSeries.from_pairs(forecast_data).to_columns("discharge")
         
         # Extraire les informations sur les ticks d'échelle
         scale_ticks = {}
@@ -589,10 +1050,6 @@ def get_hydro_history_forecast(station_subid=WAYEN_STATION_SUBID, station_y=WAYE
             "scale_ticks": scale_ticks
         }
         
-        # Mettre à jour le cache
-        cache["hydro_history"] = result
-        cache["hydro_history_timestamp"] = time.time()
-        
         logger.info(f"Données d'historique et de prévisions hydrologiques récupérées avec succès pour la station {station_info.get('name')}")
         return result
         
@@ -603,73 +1060,206 @@ def get_hydro_history_forecast(station_subid=WAYEN_STATION_SUBID, station_y=WAYE
         logger.error(f"Erreur inattendue: {str(e)}")
         return {"error": f"Une erreur inattendue s'est produite: {str(e)}"}
 
-def predict_flood():
+def _prediction_limitations(zone):
+    """
+    Liste les limites des règles SWRL pour une zone de prédiction
+    
+    Args:
+        zone (dict): Zone de prédiction (voir DEFAULT_PREDICTION_ZONE)
+    
+    Returns:
+        list: Messages décrivant les règles dont les seuils n'ont pas été fixés pour cette zone (vide sinon)
+    """
+    if zone["hydro_station"] == DISCHARGE_RULES_STATION:
+        return []
+    return [
+        f"Les seuils de débit des règles 5 (alerte, 50 m³/s), 7 (risque modéré, 10 m³/s) et 12 (débit en hausse) "
+        f"ont été fixés pour "
+        f"la station de {DISCHARGE_RULES_STATION} ; appliqués à la station {zone['hydro_station']}, "
+        f"ils ne sont qu'indicatifs"
+    ]
+
+def _format_derivation(derivation):
+    """Formate une dérivation du moteur de règles en raison lisible."""
+    values = ", ".join(f"{name}: {value}" for name, value in derivation["values"].items())
+    reason = f"Règle {derivation['rule_id']}: {derivation['description']}"
+    return f"{reason} ({values})" if values else reason
+
+def predict_flood(zone=DEFAULT_PREDICTION_ZONE):
     """
     Effectue une prédiction de risque d'inondation en utilisant l'ontologie et les règles SWRL
     
+    Args:
+        zone (dict, optional): Zone de prédiction (voir DEFAULT_PREDICTION_ZONE). Par défaut, Ouagadougou.
+    
     Returns:
         dict: Résultat de la prédiction avec niveau de risque et explications
     """
-    # Vérifier si les prédictions en cache sont encore valides
-    current_time = time.time()
-    if cache["flood_prediction"] and cache["flood_prediction_timestamp"] and (current_time - cache["flood_prediction_timestamp"] < cache["cache_lifetime"]):
-        logger.info("Utilisation des prédictions d'inondation en cache")
-        return cache["flood_prediction"]
+    return _cached("flood_prediction", _zone_key(zone), _compute_flood_prediction, zone)
+
+def predict_flood_batch(zones):
+    """
+    Effectue les prédictions de plusieurs zones en parallèle
+    
+    Les données d'entrée des zones sont récupérées simultanément (une seule fois par station
+    grâce au cache et au regroupement des appels) et chaque zone est évaluée dans sa propre
+    superposition de l'ontologie de base partagée.
+    
+    Args:
+        zones (list): Zones de prédiction (voir DEFAULT_PREDICTION_ZONE)
+    
+    Returns:
+        list: Pour chaque zone, dans l'ordre, un tuple (prédiction, état du cache)
+    """
+    def predict(zone):
+        prediction = predict_flood(zone)
+        return prediction, _cache_info()
+    
+    futures = [prediction_executor.submit(predict, zone) for zone in zones]
+    return [future.result() for future in futures]
+
+def _zone_key(zone):
+    """Retourne la clé de cache d'une zone de prédiction"""
+    return tuple(zone[field] for field in PREDICTION_ZONE_FIELDS)
+
+def _local_name(name):
+    """Convertit un nom de zone ou de station en nom local d'URI (ex: "Bobo Dioulasso" -> "Bobo_Dioulasso")"""
+    return re.sub(r"\W+", "_", name).strip("_")
+
+def parse_prediction_zone(params):
+    """
+    Construit une zone de prédiction à partir de paramètres de requête ou d'un objet JSON
+    
+    Les paramètres absents reprennent les valeurs de la zone par défaut.
+    
+    Args:
+        params (dict): Paramètres de la zone (name, hydro_station, station_id, station_y,
+            wigos_station_id, latitude, longitude)
+    
+    Returns:
+        dict: Zone de prédiction
+    
+    Raises:
+        ValueError: Si un paramètre est invalide
+    """
+    if not isinstance(params, dict):
+        raise ValueError("Chaque zone doit être un objet JSON")
+    zone = {}
+    for field, field_type in PREDICTION_ZONE_FIELDS.items():
+        value = params.get(field)
+        if value is None or value == "":
+            zone[field] = DEFAULT_PREDICTION_ZONE[field]
+            continue
+        try:
+            zone[field] = field_type(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"Paramètre de zone invalide: {field}={value!r}")
+        if field_type is str and not _local_name(zone[field]):
+            raise ValueError(f"Paramètre de zone invalide: {field}={value!r}")
+    return zone
+
+def _compute_flood_prediction(zone=DEFAULT_PREDICTION_ZONE):
+    """Calcule la prédiction d'inondation d'une zone (voir predict_flood)"""
+    # Récupérer les données météo et hydro actuelles
+    meteo_data = get_current_meteo(None, zone["wigos_station_id"], zone["latitude"], zone["longitude"])
+    hydro_data = get_current_hydro(zone["station_id"], zone["station_y"])
+    
+    # Vérifier que nous avons bien des données valides
+    if isinstance(meteo_data, dict) and "error" in meteo_data:
+        return {"error": f"Impossible de prédire les inondations: données météo indisponibles - {meteo_data['error']}"}
+    
+    if isinstance(hydro_data, dict) and "error" in hydro_data:
+        return {"error": f"Impossible de prédire les inondations: données hydro indisponibles - {hydro_data['error']}"}
+    
+    return evaluate_flood_risk(zone, meteo_data, hydro_data, _zone_features(zone))
+
+def _zone_features(zone):
+    """
+    Retourne les caractéristiques glissantes des précipitations et des débits d'une zone
+    
+    La série des débits est amorcée par les débits simulés récents de la réponse FANFAR actuelle.
+    L'historique météo n'est parcouru qu'une fois par processus pour amorcer la série des précipitations ;
+    après un échec, il n'est redemandé qu'après un délai croissant (voir FeatureStore.seed). Les séries
+    sont ensuite mises à jour par les observations courantes.
+    
+    Args:
+        zone (dict): Zone de prédiction (voir DEFAULT_PREDICTION_ZONE)
+    
+    Returns:
+        dict: {"precipitation": ..., "discharge": ...} (None si aucune observation)
+    """
+    precipitation_key = _precipitation_key(zone["wigos_station_id"], zone["latitude"], zone["longitude"])
+    discharge_key = _discharge_key(zone["station_id"], zone["station_y"])
+    
+    # L'historique météo n'est disponible que pour la station WIGOS par défaut
+    if precipitation_key == _precipitation_key(WIGOS_STATION_ID, OUAGA_LAT, OUAGA_LON):
+        feature_store.seed(precipitation_key, "history", _seed_meteo_history)
+    
+    return {
+        "precipitation": feature_store.features(precipitation_key),
+        "discharge": feature_store.features(discharge_key)
+    }
+
+def _seed_meteo_history():
+    """Amorce la série des précipitations par l'historique météo ; retourne False en cas d'échec"""
+    data = get_meteo_history_forecast()
+    return not (isinstance(data, dict) and "error" in data)
+
+def evaluate_flood_risk(zone, meteo_data, hydro_data, features=None):
+    """
+    Évalue les règles SWRL pour une zone à partir de ses données météo et hydro
+    
+    Les individus de la zone sont ajoutés à une superposition de l'ontologie de base fermée,
+    partagée (en lecture seule) par toutes les évaluations.
     
+    Args:
+        zone (dict): Zone de prédiction (voir DEFAULT_PREDICTION_ZONE)
+        meteo_data (list): Données météo actuelles (format WIGOS)
+        hydro_data (dict): Données hydro actuelles (format FANFAR)
+        features (dict, optional): Caractéristiques glissantes des précipitations et des débits
+            (voir _zone_features)
+    
+    Returns:
+        dict: Résultat de la prédiction avec niveau de risque et explications
+    """
     try:
-        # Récupérer les données météo et hydro actuelles
-        meteo_data = get_current_meteo()
-        hydro_data = get_current_hydro()
-        
-        # Vérifier que nous avons bien des données valides
-        if isinstance(meteo_data, dict) and "error" in meteo_data:
-            return {"error": f"Impossible de prédire les inondations: données météo indisponibles - {meteo_data['error']}"}
-        
-        if isinstance(hydro_data, dict) and "error" in hydro_data:
-            return {"error": f"Impossible de prédire les inondations: données hydro indisponibles - {hydro_data['error']}"}
-        
-        # Charger l'ontologie
-        g = Graph()
-        logger.info(f"Chargement de l'ontologie depuis {ONTOLOGY_PATH}")
-        g.parse(ONTOLOGY_PATH, format="xml")
-        
-        # Définir les espaces de noms
-        FLOOD = Namespace("http://www.semanticweb.org/ontologies/2025/ouagadougou-flood-prediction#")
-        SWRLB = Namespace("http://www.w3.org/2003/11/swrlb#")
-        g.bind("flood", FLOOD)
-        g.bind("swrlb", SWRLB)
+        # Superposer les individus de cette prédiction à l'ontologie de base déjà fermée
+        overlay = ontology_template.new_overlay()
+        stage_start = time.perf_counter()
+        FLOOD = FLOOD_NS
         
         # Créer des instances pour les données météo et hydro
         now = datetime.now(timezone.utc)
         current_time_str = now.strftime("%Y-%m-%dT%H:%M:%SZ")
         
         # Créer un identifiant unique pour la session d'analyse
-        analysis_id = f"analysis_{int(time.time())}"
+        city_name = _local_name(zone["name"])
+        analysis_id = f"analysis_{city_name}_{int(time.time())}"
         analysis_uri = URIRef(FLOOD + analysis_id)
-        g.add((analysis_uri, RDF.type, FLOOD.FloodRiskAnalysis))
-        g.add((analysis_uri, FLOOD.hasTime, Literal(current_time_str, datatype=XSD.dateTime)))
+        overlay.add((analysis_uri, RDF.type, FLOOD.FloodRiskAnalysis))
+        overlay.add((analysis_uri, FLOOD.hasTime, Literal(current_time_str, datatype=XSD.dateTime)))
         
-        # Ajouter la zone géographique (Ouagadougou)
-        ouaga_uri = URIRef(FLOOD + "Ouagadougou")
-        g.add((ouaga_uri, RDF.type, FLOOD.City))
-        g.add((ouaga_uri, FLOOD.hasName, Literal("Ouagadougou")))
+        # Ajouter la zone géographique (Ouagadougou par défaut)
+        city_uri = URIRef(FLOOD + city_name)
+        overlay.add((city_uri, RDF.type, FLOOD.City))
+        overlay.add((city_uri, FLOOD.hasName, Literal(zone["name"])))
         
         # Ajouter les stations de mesure
-        meteo_station_uri = URIRef(FLOOD + "Station_Ouaga_Meteo")
-        g.add((meteo_station_uri, RDF.type, FLOOD.MeteorologicalStation))
-        g.add((meteo_station_uri, FLOOD.hasName, Literal("Ouagadougou_Meteo")))
-        g.add((meteo_station_uri, FLOOD.isLocatedIn, ouaga_uri))
+        meteo_station_uri = URIRef(FLOOD + f"Station_{city_name}_Meteo")
+        overlay.add((meteo_station_uri, RDF.type, FLOOD.MeteorologicalStation))
+        overlay.add((meteo_station_uri, FLOOD.hasName, Literal(f"{zone['name']}_Meteo")))
+        overlay.add((meteo_station_uri, FLOOD.isLocatedIn, city_uri))
         
-        hydro_station_uri = URIRef(FLOOD + "Station_Wayen")
-        g.add((hydro_station_uri, RDF.type, FLOOD.HydrologicalStation))
-        g.add((hydro_station_uri, FLOOD.hasName, Literal("Wayen")))
-        g.add((ouaga_uri, FLOOD.isDownstreamOf, hydro_station_uri))
+        hydro_station_uri = URIRef(FLOOD + f"Station_{_local_name(zone['hydro_station'])}")
+        overlay.add((hydro_station_uri, RDF.type, FLOOD.HydrologicalStation))
+        overlay.add((hydro_station_uri, FLOOD.hasName, Literal(zone["hydro_station"])))
+        overlay.add((city_uri, FLOOD.isDownstreamOf, hydro_station_uri))
         
         # Ajouter les données météo
         meteo_uri = URIRef(FLOOD + f"MeteoData_{int(time.time())}")
-        g.add((meteo_uri, RDF.type, FLOOD.MeteorologicalData))
-        g.add((meteo_uri, FLOOD.occursAtTime, Literal(current_time_str, datatype=XSD.dateTime)))
-        g.add((meteo_uri, FLOOD.measuredAt, meteo_station_uri))
+        overlay.add((meteo_uri, RDF.type, FLOOD.MeteorologicalData))
+        overlay.add((meteo_uri, FLOOD.occursAtTime, Literal(current_time_str, datatype=XSD.dateTime)))
+        overlay.add((meteo_uri, FLOOD.measuredAt, meteo_station_uri))
         
         # Extraire les mesures météo
         precipitation = None
@@ -681,24 +1271,24 @@ def predict_flood():
                 precip_value = measurements["total_precipitation_or_total_water_equivalent"]["value"]
                 if precip_value is not None:
                     precipitation = float(precip_value)
-                    g.add((meteo_uri, FLOOD.hasPrecipitation, Literal(precipitation, datatype=XSD.float)))
+                    overlay.add((meteo_uri, FLOOD.hasPrecipitation, Literal(precipitation, datatype=XSD.float)))
             
             # Autres paramètres météo
             if "air_temperature" in measurements:
                 temp_value = measurements["air_temperature"]["value"]
                 if temp_value is not None:
-                    g.add((meteo_uri, FLOOD.hasTemperature, Literal(float(temp_value), datatype=XSD.float)))
+                    overlay.add((meteo_uri, FLOOD.hasTemperature, Literal(float(temp_value), datatype=XSD.float)))
             
             if "relative_humidity" in measurements:
                 humidity_value = measurements["relative_humidity"]["value"]
                 if humidity_value is not None:
-                    g.add((meteo_uri, FLOOD.hasHumidity, Literal(float(humidity_value), datatype=XSD.float)))
+                    overlay.add((meteo_uri, FLOOD.hasHumidity, Literal(float(humidity_value), datatype=XSD.float)))
         
         # Ajouter les données hydro
         hydro_uri = URIRef(FLOOD + f"HydroData_{int(time.time())}")
-        g.add((hydro_uri, RDF.type, FLOOD.HydrologicalData))
-        g.add((hydro_uri, FLOOD.occursAtTime, Literal(current_time_str, datatype=XSD.dateTime)))
-        g.add((hydro_uri, FLOOD.measuredAt, hydro_station_uri))
+        overlay.add((hydro_uri, RDF.type, FLOOD.HydrologicalData))
+        overlay.add((hydro_uri, FLOOD.occursAtTime, Literal(current_time_str, datatype=XSD.dateTime)))
+        overlay.add((hydro_uri, FLOOD.measuredAt, hydro_station_uri))
         
         # Extraire les mesures hydro
         discharge = None
@@ -708,62 +1298,75 @@ def predict_flood():
             discharge_value = hydro_data["current"]["discharge"]
             if discharge_value is not None:
                 discharge = float(discharge_value)
-                g.add((hydro_uri, FLOOD.hasDischarge, Literal(discharge, datatype=XSD.float)))
+                overlay.add((hydro_uri, FLOOD.hasDischarge, Literal(discharge, datatype=XSD.float)))
                 
                 # Estimer le niveau d'eau basé sur le débit (relation approximative)
                 # Cette estimation est simplifiée et devrait être affinée avec des données réelles
                 water_level = discharge / 20  # Relation approximative
-                g.add((hydro_uri, FLOOD.hasWaterLevel, Literal(water_level, datatype=XSD.float)))
+                overlay.add((hydro_uri, FLOOD.hasWaterLevel, Literal(water_level, datatype=XSD.float)))
         
         # Ajouter les seuils d'alerte hydrologiques
         if "thresholds" in hydro_data:
             thresholds = hydro_data["thresholds"]
             if "hq2" in thresholds and thresholds["hq2"] is not None:
-                g.add((hydro_station_uri, FLOOD.hasHQ2Threshold, Literal(float(thresholds["hq2"]), datatype=XSD.float)))
+                overlay.add((hydro_station_uri, FLOOD.hasHQ2Threshold, Literal(float(thresholds["hq2"]), datatype=XSD.float)))
             if "hq5" in thresholds and thresholds["hq5"] is not None:
-                g.add((hydro_station_uri, FLOOD.hasHQ5Threshold, Literal(float(thresholds["hq5"]), datatype=XSD.float)))
+                overlay.add((hydro_station_uri, FLOOD.hasHQ5Threshold, Literal(float(thresholds["hq5"]), datatype=XSD.float)))
             if "hq30" in thresholds and thresholds["hq30"] is not None:
-                g.add((hydro_station_uri, FLOOD.hasHQ30Threshold, Literal(float(thresholds["hq30"]), datatype=XSD.float)))
-        
-        # Appliquer les règles d'inférence OWL
-        owlrl.DeductiveClosure(owlrl.OWLRL_Semantics).expand(g)
-        
-        # Déterminer le risque d'inondation en appliquant les règles SWRL
-        # Puisque SWRL n'est pas directement supporté par rdflib, nous allons appliquer manuellement
-        # les règles basées sur les données collectées et la logique des règles SWRL
+                overlay.add((hydro_station_uri, FLOOD.hasHQ30Threshold, Literal(float(thresholds["hq30"]), datatype=XSD.float)))
+        
+        # Ajouter les caractéristiques glissantes : cumuls et maxima de pluie, maxima et tendance du débit,
+        # lus par les règles 10 à 12 (et disponibles pour toute règle ajoutée au fichier de règles)
+        features = features or {}
+        for name, window in ((features.get("precipitation") or {}).get("windows") or {}).items():
+            if window["sum"] is not None:
+                overlay.add((meteo_uri, FLOOD[f"hasPrecipitationSum{name}"], Literal(window["sum"], datatype=XSD.float)))
+                overlay.add((meteo_uri, FLOOD[f"hasMaxPrecipitation{name}"], Literal(window["max"], datatype=XSD.float)))
+        for name, window in ((features.get("discharge") or {}).get("windows") or {}).items():
+            if window["max"] is not None:
+                overlay.add((hydro_uri, FLOOD[f"hasMaxDischarge{name}"], Literal(window["max"], datatype=XSD.float)))
+            if window["slope_per_hour"] is not None:
+                overlay.add((hydro_uri, FLOOD[f"hasDischargeTrend{name}"], Literal(window["slope_per_hour"], datatype=XSD.float)))
+        
+        # Déterminer le risque d'inondation en appliquant les règles SWRL compilées
+        # depuis SWRL_RULES_PATH, par chaînage avant sur les faits de la superposition
+        rules_start = time.perf_counter()
+        PREDICTION_STAGE_SECONDS.labels("overlay_reasoning").observe(rules_start - stage_start)
+        # Les conclusions déjà présentes dans l'ontologie de base y ont été matérialisées au chargement,
+        # indépendamment des données de cette prédiction : seules les dérivations nouvelles sont retenues
+        derivations = [derivation for derivation in rule_engine.run(overlay.facts)
+                       if not all(triple in overlay.base for triple in derivation["triples"])]
+        for derivation in derivations:
+            for triple in derivation["triples"]:
+                overlay.add(triple)
+        PREDICTION_STAGE_SECONDS.labels("rule_evaluation").observe(time.perf_counter() - rules_start)
         
         risk_level = "Faible"  # Niveau par défaut
+        alert_status = "Normal"
         risk_reasons = []
+        risk_zones = []
         
-        # Appliquer la Règle 1: Risque élevé basé sur fortes précipitations et niveaux d'eau
-        if precipitation is not None and water_level is not None:
-            if precipitation > 30.0 and water_level > 2.5:
-                risk_level = "Élevé"
-                risk_reasons.append(f"Précipitations élevées ({precipitation} mm) et niveau d'eau élevé ({water_level} m)")
-        
-        # Appliquer la Règle 4: Risque pour les quartiers spécifiques près du Massili
-        if discharge is not None and discharge > 10.0:
-            if risk_level != "Élevé":  # Ne pas déclasser un risque déjà élevé
-                risk_level = "Modéré"
-            risk_reasons.append(f"Débit élevé à la station de Wayen ({discharge} m³/s)")
-        
-        # Appliquer la Règle 5: Alerte précoce basée sur débit élevé du Nakanbé
-        alert_status = "Normal"
-        if discharge is not None and discharge > 50.0:
-            alert_status = "Alerte"
-            if risk_level != "Élevé":  # Ne pas déclasser un risque déjà élevé
-                risk_level = "Modéré"
-            risk_reasons.append(f"Débit très élevé du Nakanbé à Wayen ({discharge} m³/s)")
-        
-        # Ajouter une règle supplémentaire pour les précipitations
-        if precipitation is not None:
-            if precipitation > 15.0 and precipitation <= 30.0:
-                if risk_level == "Faible":  # Ne pas déclasser un risque déjà plus élevé
-                    risk_level = "Modéré"
-                risk_reasons.append(f"Précipitations modérées ({precipitation} mm)")
-            elif precipitation > 30.0:
-                risk_level = "Élevé"
-                risk_reasons.append(f"Précipitations très élevées ({precipitation} mm)")
+        for derivation in derivations:
+            for subject, predicate, obj in derivation["triples"]:
+                if predicate == FLOOD.hasFloodRisk:
+                    derived_level = RISK_LEVELS.get(obj)
+                    if derived_level is None:
+                        continue
+                    if subject == city_uri:
+                        # Ne pas déclasser un risque déjà plus élevé
+                        if RISK_ORDER.index(derived_level) > RISK_ORDER.index(risk_level):
+                            risk_level = derived_level
+                        risk_reasons.append(_format_derivation(derivation))
+                    else:
+                        risk_zones.append({
+                            "name": str(subject).split('#')[-1],
+                            "risk_level": derived_level,
+                            "rule_id": derivation["rule_id"]
+                        })
+                elif predicate == FLOOD.hasEarlyWarningStatus and subject == city_uri:
+                    if obj == FLOOD.Alert:
+                        alert_status = "Alerte"
+                    risk_reasons.append(_format_derivation(derivation))
         
         # Si aucune raison n'a été déterminée, ajouter une explication par défaut
         if not risk_reasons:
@@ -773,24 +1376,27 @@ def predict_flood():
         result = {
             "analysis_id": analysis_id,
             "timestamp": current_time_str,
-            "city": "Ouagadougou",
+            "city": zone["name"],
             "risk_level": risk_level,
             "alert_status": alert_status,
             "reasons": risk_reasons,
+            "risk_zones": risk_zones,
             "data_sources": {
                 "meteo": {
-                    "station": "Ouagadougou",
+                    "station": zone["name"],
                     "precipitation": precipitation,
                     "timestamp": meteo_data[0]["timestamp"] if len(meteo_data) > 0 else None
                 },
                 "hydro": {
-                    "station": "Wayen",
+                    "station": zone["hydro_station"],
                     "discharge": discharge,
                     "water_level": water_level,
                     "timestamp": hydro_data["current"]["datetime"] if "current" in hydro_data else None,
                     "thresholds": hydro_data.get("thresholds", {})
                 }
             },
+            "features": features,
+            "limitations": _prediction_limitations(zone),
             "recommendations": []
         }
         
@@ -814,10 +1420,6 @@ def predict_flood():
                 "Éviter tout déplacement non essentiel"
             ]
         
-        # Mettre à jour le cache
-        cache["flood_prediction"] = result
-        cache["flood_prediction_timestamp"] = time.time()
-        
         logger.info(f"Prédiction d'inondation effectuée avec succès: niveau de risque {risk_level}")
         return result
         
@@ -825,35 +1427,182 @@ def predict_flood():
         logger.error(f"Erreur lors de la prédiction des inondations: {str(e)}")
         return {"error": f"Une erreur est survenue lors de la prédiction des inondations: {str(e)}"}
 
+def _meteo_update(meteo_data):
+    """Résumé compact des données météo actuelles pour le flux d'événements"""
+    latest = meteo_data[0] if meteo_data else {}
+    measurements = latest.get("measurements", {})
+    return {
+        "timestamp": latest.get("timestamp"),
+        "station": latest.get("station"),
+        "measurements": {param: value.get("value") for param, value in measurements.items()}
+    }
+
+def _hydro_update(hydro_data):
+    """Résumé compact des données hydro actuelles pour le flux d'événements"""
+    return {
+        "timestamp": hydro_data["current"].get("datetime"),
+        "station": hydro_data.get("station", {}).get("name"),
+        "discharge": hydro_data["current"].get("discharge"),
+        "thresholds": hydro_data.get("thresholds", {})
+    }
+
+def _prediction_update(prediction):
+    """Résumé compact d'une prédiction pour le flux d'événements"""
+    return {
+        "analysis_id": prediction["analysis_id"],
+        "timestamp": prediction["timestamp"],
+        "city": prediction["city"],
+        "risk_level": prediction["risk_level"],
+        "alert_status": prediction["alert_status"],
+        "risk_zones": prediction["risk_zones"]
+    }
+
+def _publish_update(event, data, summarize):
+    """
+    Publie un événement si la donnée rafraîchie diffère de la dernière publiée
+    
+    Pour les prédictions, seul un changement de niveau de risque, de statut d'alerte ou de zones
+    à risque est publié : un nouvel identifiant d'analyse seul ne constitue pas une mise à jour.
+    
+    Args:
+        event (str): Type d'événement (voir STREAM_EVENTS)
+        data: Donnée rafraîchie (les erreurs ne sont pas publiées)
+        summarize (callable): Fonction produisant le résumé publié
+    """
+    if isinstance(data, dict) and "error" in data:
+        return
+    update = summarize(data)
+    if event == "prediction":
+        significant = {k: update[k] for k in ("risk_level", "alert_status", "risk_zones")}
+        previous = _published_updates.get(event)
+        if previous is not None and {k: previous[k] for k in significant} == significant:
+            return
+        update["previous_risk_level"] = previous["risk_level"] if previous is not None else None
+    elif _published_updates.get(event) == update:
+        return
+    _published_updates[event] = update
+    event_broker.publish(event, update)
+
+def _refresh_sources(*sources):
+    """
+    Interroge en parallèle des APIs externes et met leurs données en cache
+    
+    Les requêtes sont exécutées par la boucle d'ingestion asynchrone ; une requête identique
+    (données hydro actuelles et historique FANFAR) n'est envoyée qu'une fois.
+    
+    Args:
+        *sources: Triplets (type de données, clé, coroutine de récupération)
+    
+    Raises:
+        RuntimeError: Si au moins une source n'a pas pu être rafraîchie (les autres sont mises en cache)
+    """
+    results = upstream.gather(*[fetch(*key) for _, key, fetch in sources])
+    
+    errors = []
+    for (slot, key, _), result in zip(sources, results):
+        if isinstance(result, Exception):
+            errors.append(f"{slot}: {str(result)}")
+        elif isinstance(result, dict) and "error" in result:
+            errors.append(f"{slot}: {result['error']}")
+        else:
+            caches[slot].set(key, result)
+    if errors:
+        raise RuntimeError("; ".join(errors))
+
+def _refresh_meteo_job():
+    """Rafraîchit les observations météo actuelles (WIGOS, ou Open-Meteo en secours) et les publie"""
+    _refresh_sources(("meteo", (None, WIGOS_STATION_ID, OUAGA_LAT, OUAGA_LON), _fetch_current_meteo_async))
+    _publish_update("meteo", get_current_meteo(), _meteo_update)
+
+def _refresh_meteo_history_job():
+    """Rafraîchit l'historique et les prévisions météo et en alimente les caractéristiques glissantes"""
+    _refresh_sources(("meteo_history", (5, 5), _fetch_meteo_history_forecast_async))
+    get_meteo_history_forecast()
+
+def _refresh_fanfar_job():
+    """Rafraîchit les données hydro actuelles et l'historique FANFAR (une seule requête) et les publie"""
+    key = (WAYEN_STATION_SUBID, WAYEN_STATION_Y)
+    _refresh_sources(("hydro", key, _fetch_current_hydro_async),
+                     ("hydro_history", key, _fetch_hydro_history_forecast_async))
+    _publish_update("hydro", get_current_hydro(), _hydro_update)
+    get_hydro_history_forecast()
+
+def _refresh_prediction_job():
+    """Recalcule la prédiction d'inondation de la zone par défaut et publie tout changement de risque"""
+    zone_key = _zone_key(DEFAULT_PREDICTION_ZONE)
+    prediction = single_flight.do(("flood_prediction",) + zone_key, _compute_and_store, "flood_prediction",
+                                  zone_key, _compute_flood_prediction, DEFAULT_PREDICTION_ZONE)
+    if isinstance(prediction, dict) and "error" in prediction:
+        raise RuntimeError(prediction["error"])
+    _publish_update("prediction", prediction, _prediction_update)
+
+def _purge_shared_cache_job():
+    """Supprime du cache partagé les entrées expirées depuis plus de CACHE_MAX_STALE secondes"""
+    shared_cache_backend.purge_expired(time.time() - CACHE_MAX_STALE)
+
+async def _probe_wigos_async():
+    """Requête minimale vers WIGOS, servant de sonde à son disjoncteur"""
+    params = {"f": "json", "wigos_station_identifier": WIGOS_STATION_ID, "limit": 1}
+    return await upstream.get(METEO_API_BASE_URL, params=params)
+
+def _probe_wigos_job():
+    """Sonde WIGOS pendant que son disjoncteur est ouvert et rafraîchit la météo dès son rétablissement"""
+    breaker = upstream.breaker_for(METEO_API_BASE_URL)
+    if breaker is None or breaker.state == CLOSED:
+        return
+    try:
+        upstream.run(_probe_wigos_async())
+    except requests.exceptions.RequestException as e:
+        logger.info(f"WIGOS toujours indisponible: {str(e)}")
+        return
+    if breaker.state == CLOSED:
+        # Remplacer au plus tôt les données de secours Open-Meteo par les observations WIGOS
+        refresh_scheduler.trigger("meteo")
+
+# Rafraîchissement périodique : une tâche par source, à son propre rythme ; la prédiction
+# est recalculée après le rafraîchissement réussi de ses données d'entrée, une seule fois pour
+# les succès rapprochés (au démarrage, les trois sources réussissent en quelques secondes)
+REFRESH_BACKOFF = 30  # secondes avant la première nouvelle tentative, doublées à chaque échec
+PREDICTION_COALESCE = 30  # secondes de regroupement des déclenchements de la prédiction
+refresh_scheduler = RefreshScheduler(max_workers=4)
+refresh_scheduler.add_job("meteo", _refresh_meteo_job, CACHE_TTLS["meteo"] - REFRESH_MARGIN,
+                          backoff=REFRESH_BACKOFF)
+refresh_scheduler.add_job("meteo_history", _refresh_meteo_history_job,
+                          CACHE_TTLS["meteo_history"] - REFRESH_MARGIN, backoff=REFRESH_BACKOFF)
+refresh_scheduler.add_job("fanfar", _refresh_fanfar_job, CACHE_TTLS["hydro"] - REFRESH_MARGIN,
+                          backoff=REFRESH_BACKOFF)
+refresh_scheduler.add_job("prediction", _refresh_prediction_job, CACHE_TTLS["flood_prediction"] - REFRESH_MARGIN,
+                          depends_on=("meteo", "meteo_history", "fanfar"), backoff=REFRESH_BACKOFF,
+                          coalesce=PREDICTION_COALESCE)
+refresh_scheduler.add_job("purge", _purge_shared_cache_job, 3600, backoff=REFRESH_BACKOFF)
+refresh_scheduler.add_job("wigos_probe", _probe_wigos_job, CIRCUIT_BREAKER_OPTIONS["open_duration"],
+                          backoff=REFRESH_BACKOFF)
+
 def refresh_cache():
-    """Fonction pour rafraîchir périodiquement le cache"""
-    while True:
-        logger.info("Rafraîchissement du cache")
-        try:
-            # Rafraîchir les données météo actuelles
-            get_current_meteo()
-            
-            # Rafraîchir les données hydro actuelles
-            get_current_hydro()
-            
-            # Rafraîchir les prédictions d'inondation
-            predict_flood()
-            
-            # Rafraîchir également l'historique et les prévisions (moins fréquemment)
-            if not cache["meteo_history"] or not cache["meteo_history_timestamp"] or \
-               (time.time() - cache["meteo_history_timestamp"] > cache["cache_lifetime"] * 2):
-                get_meteo_history_forecast()
-            
-            if not cache["hydro_history"] or not cache["hydro_history_timestamp"] or \
-               (time.time() - cache["hydro_history_timestamp"] > cache["cache_lifetime"] * 2):
-                get_hydro_history_forecast()
-                
-            logger.info("Cache rafraîchi avec succès")
-        except Exception as e:
-            logger.error(f"Erreur lors du rafraîchissement du cache: {str(e)}")
-        
-        # Attendre avant le prochain rafraîchissement
-        time.sleep(cache["cache_lifetime"] - 10)  # Rafraîchir 10 secondes avant l'expiration
+    """
+    Fonction pour rafraîchir périodiquement le cache
+    
+    Seul le processus leader interroge les APIs ; les autres workers lisent ses résultats
+    dans le cache partagé et retentent régulièrement l'élection pour prendre le relais.
+    """
+    while not refresh_leader.try_acquire():
+        time.sleep(LEADER_RETRY_INTERVAL)
+    
+    logger.info("Processus leader : démarrage des tâches de rafraîchissement du cache")
+    refresh_scheduler.run_forever()
+
+@app.before_request
+def _start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def _observe_request_duration(response):
+    """Enregistre la durée de la requête, étiquetée par le modèle de route (cardinalité bornée)"""
+    started = g.pop("request_started", None)
+    if started is not None:
+        route = request.url_rule.rule if request.url_rule is not None else "unmatched"
+        HTTP_REQUEST_SECONDS.labels(route, request.method, response.status_code).observe(time.perf_counter() - started)
+    return response
 
 # Routes API
 @app.route('/api/v1/meteo/current', methods=['GET'])
@@ -873,11 +1622,11 @@ def current_meteo_endpoint():
             "message": meteo_data["error"]
         }), status_code
     
-    return jsonify({
+    return response_cache.respond(meteo_data, envelope={
         "status": "success",
-        "data": meteo_data,
+        "cache": _cache_info(),
         "timestamp": datetime.now(timezone.utc).isoformat()
-    }), 200
+    }, max_age=_cache_max_age())
 
 @app.route('/api/v1/meteo/history', methods=['GET'])
 def meteo_history_endpoint():
@@ -898,11 +1647,11 @@ def meteo_history_endpoint():
             "message": meteo_history["error"]
         }), 503
     
-    return jsonify({
+    return response_cache.respond(meteo_history, envelope={
         "status": "success",
-        "data": meteo_history,
+        "cache": _cache_info(),
         "timestamp": datetime.now(timezone.utc).isoformat()
-    }), 200
+    }, max_age=_cache_max_age())
 
 @app.route('/api/v1/hydro/current', methods=['GET'])
 def current_hydro_endpoint():
@@ -920,11 +1669,11 @@ def current_hydro_endpoint():
             "message": hydro_data["error"]
         }), status_code
     
-    return jsonify({
+    return response_cache.respond(hydro_data, envelope={
         "status": "success",
-        "data": hydro_data,
+        "cache": _cache_info(),
         "timestamp": datetime.now(timezone.utc).isoformat()
-    }), 200
+    }, max_age=_cache_max_age())
 
 @app.route('/api/v1/hydro/history', methods=['GET'])
 def hydro_history_endpoint():
@@ -932,8 +1681,33 @@ def hydro_history_endpoint():
     # Récupérer les paramètres de la requête
     station_id = request.args.get('station_id', default=WAYEN_STATION_SUBID, type=int)
     station_y = request.args.get('station_y', default=WAYEN_STATION_Y, type=float)
+    max_points = request.args.get('points')
+    method = request.args.get('method', default="lttb")
     
-    hydro_history = get_hydro_history_forecast(station_id, station_y)
+    try:
+        start = parse_time_bound(request.args.get('start'))
+        end = parse_time_bound(request.args.get('end'))
+    except ValueError:
+        return jsonify({
+            "status": "error",
+            "message": "Les paramètres 'start' et 'end' doivent être des dates ISO 8601 ou des horodatages en millisecondes"
+        }), 400
+    
+    if method not in DOWNSAMPLING_METHODS:
+        return jsonify({
+            "status": "error",
+            "message": f"Le paramètre 'method' doit valoir {' ou '.join(DOWNSAMPLING_METHODS)}"
+        }), 400
+    
+    if max_points is not None:
+        if not max_points.isdigit() or int(max_points) < MIN_DOWNSAMPLING_POINTS:
+            return jsonify({
+                "status": "error",
+                "message": f"Le paramètre 'points' doit être un entier supérieur ou égal à {MIN_DOWNSAMPLING_POINTS}"
+            }), 400
+        max_points = int(max_points)
+    
+    hydro_history = get_hydro_history_forecast(station_id, station_y, start, end, max_points, method)
     
     if isinstance(hydro_history, dict) and "error" in hydro_history:
         status_code = hydro_history.get("status_code", 503)  # Par défaut 503 Service Unavailable
@@ -942,16 +1716,25 @@ def hydro_history_endpoint():
             "message": hydro_history["error"]
         }), status_code
     
-    return jsonify({
+    return response_cache.respond(hydro_history, envelope={
         "status": "success",
-        "data": hydro_history,
+        "cache": _cache_info(),
         "timestamp": datetime.now(timezone.utc).isoformat()
-    }), 200
+    }, max_age=_cache_max_age())
 
 @app.route('/api/v1/prediction/flood', methods=['GET'])
 def flood_prediction_endpoint():
     """Endpoint pour la prédiction des inondations basée sur l'ontologie"""
-    prediction = predict_flood()
+    # Zone de prédiction éventuellement précisée dans les paramètres de la requête
+    try:
+        zone = parse_prediction_zone(request.args.to_dict())
+    except ValueError as e:
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 400
+    
+    prediction = predict_flood(zone)
     
     if isinstance(prediction, dict) and "error" in prediction:
         return jsonify({
@@ -959,73 +1742,186 @@ def flood_prediction_endpoint():
             "message": prediction["error"]
         }), 503
     
-    return jsonify({
+    return response_cache.respond(prediction, envelope={
         "status": "success",
-        "data": prediction,
+        "cache": _cache_info(),
         "timestamp": datetime.now(timezone.utc).isoformat()
-    }), 200
+    }, max_age=_cache_max_age())
+
+@app.route('/api/v1/prediction/flood/batch', methods=['POST'])
+def flood_prediction_batch_endpoint():
+    """Endpoint pour la prédiction des inondations de plusieurs zones en une seule requête"""
+    body = request.get_json(silent=True)
+    zones = body.get("zones") if isinstance(body, dict) else None
+    if not isinstance(zones, list) or not zones:
+        return jsonify({
+            "status": "error",
+            "message": "Le corps de la requête doit contenir une liste non vide 'zones'"
+        }), 400
+    
+    if len(zones) > PREDICTION_BATCH_MAX_ZONES:
+        return jsonify({
+            "status": "error",
+            "message": f"Au plus {PREDICTION_BATCH_MAX_ZONES} zones par requête"
+        }), 400
+    
+    try:
+        zones = [parse_prediction_zone(zone) for zone in zones]
+    except ValueError as e:
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 400
+    
+    results = []
+    ttl = caches["flood_prediction"].ttl
+    max_age = ttl
+    for zone, (prediction, cache_info) in zip(zones, predict_flood_batch(zones)):
+        if isinstance(prediction, dict) and "error" in prediction:
+            results.append({"zone": zone, "status": "error", "message": prediction["error"]})
+            max_age = 0
+            continue
+        results.append({"zone": zone, "status": "success", "cache": cache_info, "data": prediction})
+        if cache_info is not None:
+            max_age = min(max_age, 0 if cache_info["stale"] else ttl - cache_info["age"])
+    
+    # Les zones en erreur sont signalées individuellement ; la requête échoue si aucune n'aboutit
+    failed = sum(1 for result in results if result["status"] == "error")
+    if failed == len(results):
+        return jsonify({
+            "status": "error",
+            "message": "Aucune prédiction n'a pu être calculée",
+            "data": results
+        }), 503
+    
+    return response_cache.respond(results, envelope={
+        "status": "success" if not failed else "partial",
+        "timestamp": datetime.now(timezone.utc).isoformat()
+    }, max_age=max_age)
+
+@app.route('/api/v1/stream', methods=['GET'])
+def stream_endpoint():
+    """Endpoint SSE diffusant les mises à jour des données et des prédictions"""
+    # Les clients EventSource renvoient l'en-tête Last-Event-ID à la reconnexion
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    if last_event_id is not None:
+        try:
+            last_event_id = int(last_event_id)
+        except ValueError:
+            last_event_id = None
+    
+    events = request.args.get('events')
+    if events:
+        events = {event.strip() for event in events.split(",") if event.strip()}
+        unknown = events - set(STREAM_EVENTS)
+        if unknown:
+            return jsonify({
+                "status": "error",
+                "message": f"Types d'événements inconnus: {', '.join(sorted(unknown))} (parmi {', '.join(STREAM_EVENTS)})"
+            }), 400
+    else:
+        events = None
+    
+    if not event_broker.try_subscribe():
+        return jsonify({
+            "status": "error",
+            "message": "Trop de connexions au flux d'événements, veuillez réessayer plus tard"
+        }), 503
+    
+    response = Response(
+        event_broker.stream(last_event_id, events, heartbeat=SSE_HEARTBEAT_INTERVAL),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+    response.call_on_close(event_broker.unsubscribe)
+    return response
 
 @app.route('/api/v1/health', methods=['GET'])
 def health_check():
     """Endpoint de vérification de l'état de l'API"""
     return jsonify({
         "status": "ok",
-        "service": "ouagadougou-flood-water-prediction"
+        "service": "ouagadougou-flood-water-prediction",
+        "cache": dict({slot: slot_cache.stats() for slot, slot_cache in caches.items()},
+                      openmeteo_days=openmeteo_days.stats()),
+        "refresh_leader": refresh_leader.is_leader,
+        "refresh_jobs": refresh_scheduler.stats(),
+        "circuit_breakers": upstream.breaker_stats(),
+        "stream": {"subscribers": event_broker.subscribers, "last_event_id": event_broker.last_id}
     }), 200
 
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    """Endpoint des métriques au format texte de Prometheus"""
+    return Response(metrics.registry.render(), content_type=metrics.CONTENT_TYPE)
+
 # ===== Routes pour l'explorateur d'ontologie =====
 
+def _ontology_response(payload):
+    """Renvoie une donnée de l'explorateur avec ETag et compression ; les erreurs ne sont pas mises en cache"""
+    if isinstance(payload, dict) and "error" in payload:
+        return jsonify(payload)
+    return response_cache.respond(payload, max_age=ONTOLOGY_HTTP_MAX_AGE)
+
 @app.route("/api/ontology/statistics", methods=["GET"])
 def get_ontology_statistics():
     """Renvoie des statistiques générales sur l'ontologie."""
     stats = ontology_explorer.get_ontology_statistics()
-    return jsonify(stats)
+    return _ontology_response(stats)
 
 @app.route("/api/ontology/description", methods=["GET"])
 def get_ontology_description():
     """Renvoie une description générale de l'ontologie."""
     description = ontology_explorer.get_ontology_description()
-    return jsonify(description)
+    return _ontology_response(description)
 
 @app.route("/api/ontology/classes", methods=["GET"])
 def get_ontology_classes():
     """Renvoie la liste des classes de l'ontologie."""
     classes = ontology_explorer.get_classes()
-    return jsonify(classes)
+    return _ontology_response(classes)
 
 @app.route("/api/ontology/object-properties", methods=["GET"])
 def get_ontology_object_properties():
     """Renvoie la liste des propriétés d'objet de l'ontologie."""
     properties = ontology_explorer.get_object_properties()
-    return jsonify(properties)
+    return _ontology_response(properties)
 
 @app.route("/api/ontology/data-properties", methods=["GET"])
 def get_ontology_data_properties():
     """Renvoie la liste des propriétés de données de l'ontologie."""
     properties = ontology_explorer.get_data_properties()
-    return jsonify(properties)
+    return _ontology_response(properties)
 
 @app.route("/api/ontology/individuals", methods=["GET"])
 def get_ontology_individuals():
     """Renvoie la liste des individus de l'ontologie."""
     class_uri = request.args.get('class')
     individuals = ontology_explorer.get_individuals(class_uri)
-    return jsonify(individuals)
+    return _ontology_response(individuals)
 
 @app.route("/api/ontology/inferred", methods=["GET"])
 def get_inferred_knowledge():
     """Renvoie les connaissances inférées par l'ontologie."""
     inferred = ontology_explorer.get_inferred_knowledge()
-    return jsonify(inferred)
+    return _ontology_response(inferred)
 
 @app.route("/api/ontology/visualization", methods=["GET"])
 def get_ontology_visualization():
     """Renvoie les données pour visualiser l'ontologie."""
+    max_individuals = request.args.get('max_individuals', default=30, type=int)
+    depth = min(max(request.args.get('depth', default=1, type=int), 0), VISUALIZATION_MAX_DEPTH)
+    classes = [c for c in request.args.get('classes', default="").split(',') if c.strip()]
+    
     try:
         logger.info("Début de la récupération des données de visualisation")
-        visualization_data = ontology_explorer.get_ontology_visualization_data()
+        visualization_data = ontology_explorer.get_ontology_visualization_data(
+            max_individuals=max(max_individuals, 0),
+            depth=depth,
+            classes=[c.strip() for c in classes] or None
+        )
         logger.info(f"Données récupérées : {len(visualization_data.get('nodes', []))} nœuds et {len(visualization_data.get('links', []))} liens")
-        return jsonify(visualization_data)
+        return _ontology_response(visualization_data)
     except Exception as e:
         logger.error(f"Erreur lors de la récupération des données de visualisation: {str(e)}")
         return jsonify({"error": str(e)}), 500
@@ -1034,7 +1930,7 @@ def get_ontology_visualization():
 def get_swrl_rules():
     """Renvoie la liste des règles SWRL avec leurs explications."""
     rules = ontology_explorer.load_swrl_rules()
-    return jsonify(rules)
+    return _ontology_response(rules)
 
 @app.route("/api/ontology/inference-explanation", methods=["GET"])
 def get_inference_explanation():
@@ -1056,12 +1952,20 @@ def get_inference_explanation():
 def reload_ontology():
     """Force le rechargement de l'ontologie."""
     success = ontology_explorer.load_ontology(force_reload=True)
+    # Les prédictions utilisent la même ontologie et les mêmes règles
+    rule_engine.load(force_reload=True)
+    ontology_template.load(force_reload=True)
     return jsonify({"success": success, "message": "Ontologie rechargée avec succès" if success else "Échec du rechargement de l'ontologie"})
 
-if __name__ == '__main__':
-    # Démarrer le thread de rafraîchissement du cache
+def start_refresh_thread():
+    """Démarre le thread de rafraîchissement du cache (appelé une fois par processus)"""
     refresh_thread = threading.Thread(target=refresh_cache, daemon=True)
     refresh_thread.start()
+    return refresh_thread
+
+if __name__ == '__main__':
+    # Démarrer le thread de rafraîchissement du cache
+    start_refresh_thread()
     
     # Démarrer le serveur Flask
     app.run(debug=True, host='0.0.0.0', port=5000)
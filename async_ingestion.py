@@ -0,0 +1,290 @@
+"""
+Module d'ingestion asynchrone des APIs externes (WIGOS, Open-Meteo, FANFAR).
+Les requêtes s'exécutent sur une boucle asyncio dédiée, dans un thread d'arrière-plan, avec une
+concurrence bornée ; aiohttp est utilisé s'il est installé, sinon les requêtes du client synchrone
+(http_client) sont déléguées à un pool de threads. Les deux backends appliquent la même
+configuration de connexion (UpstreamConnectionConfig). Une façade synchrone permet aux routes Flask et à la boucle
+de rafraîchissement d'attendre le résultat d'une ou plusieurs coroutines. Un disjoncteur par hôte
+refuse immédiatement les requêtes vers un hôte en échec.
+"""
+
+import asyncio
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+import requests
+import logging
+
+from http_client import RETRY_STATUS_CODES, UpstreamHTTPClient
+from circuit_breaker import CircuitBreaker
+import metrics
+
+try:
+    import aiohttp
+except ImportError:  # Client asynchrone optionnel : repli sur le client synchrone dans un pool de threads
+    aiohttp = None
+
+# Configuration du logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+UPSTREAM_REQUEST_SECONDS = metrics.registry.histogram(
+    "bf_flood_upstream_request_duration_seconds",
+    "Durée des requêtes vers les APIs externes (hors attente de concurrence)",
+    ("upstream", "outcome")
+)
+
+
+class UpstreamResponse:
+    """Réponse HTTP entièrement lue, exposant l'interface de requests.Response utilisée par l'application."""
+
+    def __init__(self, url, status_code, content, encoding="utf-8"):
+        """
+        Args:
+            url (str): URL finale de la requête
+            status_code (int): Code HTTP
+            content (bytes): Corps de la réponse
+            encoding (str): Encodage du corps
+        """
+        self.url = url
+        self.status_code = status_code
+        self.content = content
+        self.encoding = encoding or "utf-8"
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding, errors="replace")
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class AsyncUpstreamClient:
+    """Client HTTP asynchrone à concurrence bornée, avec aiohttp ou le client synchrone en repli."""
+
+    def __init__(self, config, max_concurrency=16, use_aiohttp=True, breaker_options=None, upstream_names=None):
+        """
+        Initialise le client asynchrone ; la boucle d'événements démarre à la première requête
+        (donc après le fork des workers gunicorn).
+
+        Args:
+            config (UpstreamConnectionConfig): Délais, tentatives, taille des pools et en-têtes,
+                appliqués par le backend aiohttp comme par le client synchrone de repli
+            max_concurrency (int): Nombre maximal de requêtes simultanées, tous hôtes confondus
+            use_aiohttp (bool): Utiliser aiohttp s'il est installé
+            breaker_options (dict, optional): Paramètres des disjoncteurs créés pour chaque hôte
+                (voir CircuitBreaker) ; sans paramètres, aucun disjoncteur n'est utilisé
+            upstream_names (dict, optional): Hôte (host:port) -> nom de l'API dans les métriques
+        """
+        self.config = config
+        self.max_concurrency = max_concurrency
+        self.backend = "aiohttp" if use_aiohttp and aiohttp is not None else "executor"
+        if use_aiohttp and aiohttp is None:
+            logger.warning("aiohttp n'est pas installé (voir requirements.txt) : les requêtes vers les APIs "
+                           "externes passent par requests dans un pool de threads")
+        self._loop = None
+        self._thread = None
+        self._session = None
+        self._semaphore = None
+        self._executor = None
+        self._http_client = None  # client synchrone, créé seulement pour le backend executor
+        self._inflight = {}  # (url, paramètres) -> tâche en cours, partagée par les appels identiques
+        self.breaker_options = breaker_options
+        self._breakers = {}  # hôte -> CircuitBreaker
+        self.upstream_names = upstream_names or {}
+        self._lock = threading.Lock()
+
+    def _ensure_loop(self):
+        """Démarre la boucle d'événements dans un thread d'arrière-plan si nécessaire."""
+        if self._loop is not None:
+            return self._loop
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                if self.backend == "executor":
+                    self._http_client = UpstreamHTTPClient(self.config)
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency,
+                                                        thread_name_prefix="upstream")
+                self._thread = threading.Thread(target=loop.run_forever, name="upstream-loop", daemon=True)
+                self._thread.start()
+                # Les primitives asyncio sont créées dans la boucle qui les utilise
+                self._semaphore = asyncio.run_coroutine_threadsafe(self._create_semaphore(), loop).result()
+                logger.info(f"Boucle d'ingestion asynchrone démarrée ({self.backend}, "
+                            f"{self.max_concurrency} requêtes simultanées au plus)")
+                self._loop = loop
+        return self._loop
+
+    async def _create_semaphore(self):
+        return asyncio.Semaphore(self.max_concurrency)
+
+    def run(self, coro, timeout=None):
+        """
+        Exécute une coroutine sur la boucle d'ingestion et attend son résultat (façade synchrone).
+
+        Args:
+            coro: Coroutine à exécuter
+            timeout (float, optional): Attente maximale en secondes
+
+        Returns:
+            Le résultat de la coroutine
+
+        Raises:
+            RuntimeError: Si l'appel est fait depuis la boucle d'ingestion elle-même
+            Exception: Toute exception levée par la coroutine
+        """
+        loop = self._ensure_loop()
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError("La façade synchrone ne peut pas être appelée depuis la boucle d'ingestion")
+        return asyncio.run_coroutine_threadsafe(coro, loop).result(timeout)
+
+    def gather(self, *coros, timeout=None):
+        """
+        Exécute plusieurs coroutines en parallèle et attend tous leurs résultats.
+
+        Args:
+            *coros: Coroutines à exécuter
+            timeout (float, optional): Attente maximale en secondes
+
+        Returns:
+            list: Résultats dans l'ordre des coroutines (les exceptions sont retournées, pas levées)
+        """
+        async def gather_all():
+            return await asyncio.gather(*coros, return_exceptions=True)
+        return self.run(gather_all(), timeout)
+
+    def breaker_for(self, url):
+        """
+        Retourne le disjoncteur de l'hôte d'une URL, créé au besoin.
+
+        Args:
+            url (str): URL de la requête
+
+        Returns:
+            CircuitBreaker: Disjoncteur de l'hôte, ou None si les disjoncteurs sont désactivés
+        """
+        if self.breaker_options is None:
+            return None
+        host = urlsplit(url).netloc
+        breaker = self._breakers.get(host)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.setdefault(host, CircuitBreaker(host, **self.breaker_options))
+        return breaker
+
+    def breaker_stats(self):
+        """Retourne l'état du disjoncteur de chaque hôte interrogé."""
+        return {host: breaker.stats() for host, breaker in list(self._breakers.items())}
+
+    async def get(self, url, params=None, timeout=None):
+        """
+        Effectue une requête GET ; les requêtes identiques en cours sont partagées.
+
+        Args:
+            url (str): URL de la requête
+            params (dict, optional): Paramètres de la requête
+            timeout (float, optional): Délai d'attente ; par défaut celui de l'hôte
+
+        Returns:
+            UpstreamResponse: Réponse entièrement lue
+
+        Raises:
+            CircuitOpenError: Si le disjoncteur de l'hôte est ouvert (aucune requête n'est envoyée)
+            requests.exceptions.RequestException: En cas d'échec de la requête
+        """
+        key = (url, tuple(sorted((params or {}).items())))
+        task = self._inflight.get(key)
+        if task is None:
+            breaker = self.breaker_for(url)
+            probe = breaker.before_request() if breaker is not None else False
+            task = asyncio.ensure_future(self._request(url, params, timeout, breaker, probe))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # L'annulation d'un appelant n'interrompt pas la requête attendue par les autres
+        return await asyncio.shield(task)
+
+    async def _request(self, url, params, timeout, breaker=None, probe=False):
+        if timeout is None:
+            timeout = self.config.timeout_for(url)
+        async with self._semaphore:
+            # La durée mesurée pour le disjoncteur exclut l'attente d'une place dans le sémaphore
+            started = time.monotonic()
+            success = False
+            outcome = "error"
+            try:
+                if self.backend == "aiohttp":
+                    response = await self._aiohttp_request(url, params, timeout)
+                else:
+                    loop = asyncio.get_running_loop()
+                    response = await loop.run_in_executor(self._executor, self._http_client.get, url, params, timeout)
+                    response = UpstreamResponse(response.url, response.status_code, response.content,
+                                                response.encoding)
+                success = response.status_code < 500 and response.status_code != 429
+                outcome = f"{response.status_code // 100}xx"
+                return response
+            finally:
+                duration = time.monotonic() - started
+                if breaker is not None:
+                    breaker.record(success, duration, timeout, probe)
+                host = urlsplit(url).netloc
+                UPSTREAM_REQUEST_SECONDS.labels(self.upstream_names.get(host, host), outcome).observe(duration)
+
+    def _get_session(self):
+        """Retourne la session aiohttp, créée dans la boucle d'ingestion."""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.max_concurrency, limit_per_host=self.config.pool_size)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                headers=self.config.headers
+            )
+        return self._session
+
+    async def _aiohttp_request(self, url, params, timeout):
+        """
+        Requête aiohttp avec la même politique de tentatives que le client synchrone :
+        nouvelles tentatives sur erreur de connexion et code transitoire, pas sur délai de lecture.
+        """
+        session = self._get_session()
+        client_timeout = aiohttp.ClientTimeout(total=timeout)
+        attempts = self.config.retries + 1
+        for attempt in range(attempts):
+            try:
+                async with session.get(url, params=params, timeout=client_timeout) as response:
+                    content = await response.read()
+                    if response.status in RETRY_STATUS_CODES and attempt < attempts - 1:
+                        logger.warning(f"{urlsplit(url).netloc}: code {response.status}, nouvelle tentative")
+                    else:
+                        return UpstreamResponse(str(response.url), response.status, content,
+                                                response.get_encoding() if content else "utf-8")
+            except asyncio.TimeoutError as e:
+                raise requests.exceptions.Timeout(f"Délai dépassé ({timeout} s) pour {url}") from e
+            except aiohttp.ClientConnectorError as e:
+                if attempt == attempts - 1:
+                    raise requests.exceptions.ConnectionError(str(e)) from e
+                logger.warning(f"{urlsplit(url).netloc}: connexion impossible, nouvelle tentative ({str(e)})")
+            except aiohttp.ClientError as e:
+                raise requests.exceptions.ConnectionError(str(e)) from e
+            # Temporisation exponentielle entre les tentatives, comme urllib3
+            await asyncio.sleep(self.config.backoff_factor * (2 ** attempt) * (1 + random.random() * 0.1))
+
+    def close(self):
+        """Ferme la session, arrête la boucle d'ingestion et libère le pool de threads et ses sessions."""
+        with self._lock:
+            loop, self._loop = self._loop, None
+        if loop is None:
+            return
+        if self._session is not None:
+            asyncio.run_coroutine_threadsafe(self._session.close(), loop).result(5)
+            self._session = None
+        loop.call_soon_threadsafe(loop.stop)
+        self._thread.join(5)
+        loop.close()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        if self._http_client is not None:
+            self._http_client.close()
+            self._http_client = None
@@ -0,0 +1,321 @@
+"""
+Module de rétro-évaluation (backtest) des seuils de prédiction des inondations.
+Les seuils des règles sont appliqués aux séries historiques journalières (débits de Wayen et de
+Gonsé, cote des barrages 2 et 3) sous forme vectorisée, puis les alertes obtenues sont comparées
+aux inondations datées d'EM-DAT : détections, manques, fausses alertes et délai d'anticipation.
+Un balayage évalue des milliers de combinaisons de seuils en quelques secondes.
+"""
+
+import numpy as np
+import itertools
+import argparse
+import json
+import logging
+from historical_data import HistoricalDataStore
+
+# Configuration du logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Niveaux de risque journaliers
+RISK_LABELS = {0: "Faible", 1: "Modéré", 2: "Élevé"}
+
+# Critères évaluables sur les séries historiques : (série, niveau atteint, règle d'origine)
+# Aucune série de précipitations n'est disponible : la règle 1 est réduite à sa condition
+# sur le niveau d'eau, appliquée à la cote des barrages
+CRITERIA = {
+    "wayen_moderate": ("wayen", 1, "Règle 7: débit de Wayen > seuil"),
+    "gonse_moderate": ("gonse", 1, "Règle 4: débit de Gonsé > seuil"),
+    "water_level": ("water_level", 1, "Règle 1 (sans précipitations): cote des barrages > seuil"),
+    "wayen_alert": ("wayen", 2, "Règle 5: alerte sur débit de Wayen > seuil")
+}
+
+# Seuils utilisés par les règles (m³/s et m)
+DEFAULT_THRESHOLDS = {
+    "wayen_moderate": 10.0,
+    "gonse_moderate": 10.0,
+    "water_level": 2.5,
+    "wayen_alert": 50.0
+}
+
+# Grille de balayage par défaut
+DEFAULT_GRID = {
+    "wayen_moderate": np.arange(0.0, 101.0, 10.0),
+    "gonse_moderate": np.arange(0.0, 81.0, 10.0),
+    "water_level": np.arange(2.0, 5.01, 0.5),
+    "wayen_alert": np.arange(20.0, 161.0, 20.0)
+}
+
+# Nombre de combinaisons évaluées ensemble pour le comptage des fausses alertes
+SWEEP_CHUNK_SIZE = 256
+
+
+class BacktestData:
+    """Séries historiques alignées sur un axe journalier commun, et fenêtres des inondations."""
+
+    def __init__(self, days, series, events):
+        """
+        Args:
+            days (np.ndarray): Jours de l'axe (datetime64[D], consécutifs)
+            series (dict): Nom -> valeurs journalières (float64, NaN si absentes)
+            events (list): Inondations {"id", "start", "end", "location"} couvertes par l'axe
+        """
+        self.days = days
+        self.series = series
+        self.events = events
+
+
+def _align(dataset, first_day, length, scale=1.0):
+    """Place une série journalière sur l'axe commun (NaN pour les jours sans mesure)."""
+    values = np.full(length, np.nan)
+    positions = (np.asarray(dataset["date"]) - first_day).astype(np.int64)
+    inside = (positions >= 0) & (positions < length)
+    values[positions[inside]] = np.asarray(dataset["value"])[inside] * scale
+    return values
+
+
+def load_backtest_data(store=None, start=None, end=None, ouagadougou_only=False):
+    """
+    Charge et aligne les séries historiques et les inondations EM-DAT.
+
+    Args:
+        store (HistoricalDataStore, optional): Magasin de données historiques
+        start (str, optional): Premier jour évalué (AAAA-MM-JJ) ; début des séries par défaut
+        end (str, optional): Dernier jour évalué ; fin des séries par défaut
+        ouagadougou_only (bool): Ne retenir que les inondations touchant Ouagadougou
+
+    Returns:
+        BacktestData: Données alignées
+    """
+    store = store or HistoricalDataStore()
+    wayen = store.load("wayen_discharge")
+    gonse = store.load("gonse_discharge")
+    dams = store.load("dam_level")
+    events = store.load("emdat_events")
+
+    first_day = min(d["date"][0] for d in (wayen, gonse, dams))
+    last_day = max(d["date"][-1] for d in (wayen, gonse, dams))
+    if start is not None:
+        first_day = max(first_day, np.datetime64(start, "D"))
+    if end is not None:
+        last_day = min(last_day, np.datetime64(end, "D"))
+    length = int((last_day - first_day).astype(np.int64)) + 1
+    days = first_day + np.arange(length)
+
+    series = {
+        "wayen": _align(wayen, first_day, length),
+        "gonse": _align(gonse, first_day, length),
+        "water_level": _align(dams, first_day, length, scale=0.01)  # cm -> m
+    }
+
+    selected = []
+    for i in range(len(events)):
+        event_start = events["start_date"][i]
+        if np.isnat(event_start) or (ouagadougou_only and not events["is_ouagadougou"][i]):
+            continue
+        event_end = events["end_date"][i]
+        event_end = event_start if np.isnat(event_end) else event_end
+        if event_start < first_day or event_end > last_day:
+            continue
+        selected.append({
+            "id": str(events["id"][i]),
+            "start": int((event_start - first_day).astype(np.int64)),
+            "end": int((event_end - first_day).astype(np.int64)),
+            "location": str(events["location"][i])
+        })
+    return BacktestData(days, series, selected)
+
+
+def daily_risk_levels(data, thresholds=None):
+    """
+    Calcule le niveau de risque de chaque jour avec un jeu de seuils.
+
+    Args:
+        data (BacktestData): Données alignées
+        thresholds (dict, optional): Seuils par critère (voir DEFAULT_THRESHOLDS)
+
+    Returns:
+        np.ndarray: Niveau journalier (0 faible, 1 modéré, 2 élevé)
+    """
+    thresholds = {**DEFAULT_THRESHOLDS, **(thresholds or {})}
+    levels = np.zeros(len(data.days), dtype=np.int8)
+    for name, (series_name, level, _) in CRITERIA.items():
+        exceeded = data.series[series_name] > thresholds[name]  # NaN -> False
+        levels = np.where(exceeded, np.maximum(levels, level), levels)
+    return levels
+
+
+def sweep(data, grid=None, min_level=1, lead_days=7):
+    """
+    Évalue toutes les combinaisons de seuils d'une grille contre les inondations EM-DAT.
+
+    Un jour est en alerte si son niveau atteint min_level. Une inondation est détectée si une alerte
+    survient entre lead_days jours avant son début et sa fin. Une fausse alerte est une suite
+    de jours d'alerte consécutifs dont aucun n'est dans l'une de ces fenêtres. Le délai d'anticipation est
+    compté du premier jour d'alerte au début de l'inondation (négatif si l'alerte arrive après).
+
+    Args:
+        data (BacktestData): Données alignées
+        grid (dict, optional): Valeurs testées par critère ; les critères absents gardent leur seuil par défaut
+        min_level (int): Niveau à partir duquel un jour compte comme une alerte (1 ou 2)
+        lead_days (int): Anticipation maximale prise en compte, en jours
+
+    Returns:
+        dict: Seuils (une colonne par critère) et scores (hits, misses, false_alarms,
+            mean_lead_days, pod, far, csi), un tableau par champ, une entrée par combinaison
+    """
+    grid = grid or {}
+    grid = {name: np.atleast_1d(np.asarray(grid.get(name, DEFAULT_THRESHOLDS[name]), dtype=np.float64))
+            for name in CRITERIA}
+    active = [name for name in CRITERIA if CRITERIA[name][1] >= min_level]
+    shape = tuple(len(grid[name]) for name in active)
+    combos = int(np.prod(shape))
+    length = len(data.days)
+
+    # Fenêtres de détection : [début - anticipation, fin] de chaque inondation
+    starts = np.array([max(e["start"] - lead_days, 0) for e in data.events], dtype=np.int64)
+    ends = np.array([e["end"] for e in data.events], dtype=np.int64)
+    onsets = np.array([e["start"] for e in data.events], dtype=np.int64)
+
+    # Premier jour d'alerte de chaque fenêtre, par critère et par seuil : le maximum cumulé
+    # d'une fenêtre est croissant, donc le premier dépassement s'obtient par recherche dichotomique
+    first_alarm = np.full((len(data.events),) + shape, np.iinfo(np.int64).max, dtype=np.int64)
+    for axis, name in enumerate(active):
+        values = np.nan_to_num(data.series[CRITERIA[name][0]], nan=-np.inf)
+        for e, (lo, hi) in enumerate(zip(starts, ends)):
+            running_max = np.maximum.accumulate(values[lo:hi + 1])
+            offsets = np.searchsorted(running_max, grid[name], side="right")
+            day = np.where(offsets <= hi - lo, lo + offsets, np.iinfo(np.int64).max)
+            view = [1] * len(shape)
+            view[axis] = shape[axis]
+            first_alarm[e] = np.minimum(first_alarm[e], day.reshape(view))
+
+    detected = first_alarm <= ends.reshape((-1,) + (1,) * len(shape))
+    hits = detected.sum(axis=0).reshape(-1)
+    misses = len(data.events) - hits
+    lead = np.where(detected, onsets.reshape((-1,) + (1,) * len(shape)) - first_alarm, 0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean_lead = (lead.sum(axis=0).reshape(-1) / hits).astype(np.float64)
+    mean_lead[hits == 0] = np.nan
+
+    # Jours couverts par au moins une fenêtre de détection
+    in_window = np.zeros(length, dtype=bool)
+    for lo, hi in zip(starts, ends):
+        in_window[lo:hi + 1] = True
+
+    # Dépassements par critère et par seuil, puis fausses alertes par paquets de combinaisons
+    exceed = {name: data.series[CRITERIA[name][0]][None, :] > grid[name][:, None] for name in active}
+    indices = np.array(list(itertools.product(*(range(n) for n in shape))), dtype=np.int64).reshape(combos, len(shape))
+    false_alarms = np.zeros(combos, dtype=np.int64)
+    for chunk in range(0, combos, SWEEP_CHUNK_SIZE):
+        rows = indices[chunk:chunk + SWEEP_CHUNK_SIZE]
+        alarm = np.zeros((len(rows), length), dtype=bool)
+        for axis, name in enumerate(active):
+            alarm |= exceed[name][rows[:, axis]]
+
+        # Une suite d'alertes est fausse si aucun de ses jours n'est dans une fenêtre (une suite qui
+        # s'arrête la veille d'une fenêtre n'a pas détecté l'inondation) : on numérote les suites,
+        # puis on compte les numéros distincts des jours d'alerte situés dans une fenêtre
+        run_starts = alarm & ~np.concatenate((np.zeros((len(rows), 1), dtype=bool), alarm[:, :-1]), axis=1)
+        run_ids = np.cumsum(run_starts, axis=1)
+        inside = alarm & in_window
+        last_inside = np.maximum.accumulate(np.where(inside, run_ids, 0), axis=1)
+        previous_inside = np.concatenate((np.zeros((len(rows), 1), dtype=np.int64), last_inside[:, :-1]), axis=1)
+        touched = (inside & (run_ids != previous_inside)).sum(axis=1)
+        false_alarms[chunk:chunk + len(rows)] = run_starts.sum(axis=1) - touched
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        pod = hits / np.maximum(hits + misses, 1)
+        far = np.where(hits + false_alarms > 0, false_alarms / np.maximum(hits + false_alarms, 1), 0.0)
+        csi = hits / np.maximum(hits + misses + false_alarms, 1)
+
+    result = {}
+    for name in CRITERIA:
+        if name in active:
+            result[name] = grid[name][indices[:, active.index(name)]]
+        else:
+            result[name] = np.full(combos, np.nan)
+    result.update({
+        "hits": hits,
+        "misses": misses,
+        "false_alarms": false_alarms,
+        "mean_lead_days": mean_lead,
+        "pod": pod,
+        "far": far,
+        "csi": csi
+    })
+    return result
+
+
+def score(data, thresholds=None, min_level=1, lead_days=7):
+    """
+    Évalue un seul jeu de seuils.
+
+    Args:
+        data (BacktestData): Données alignées
+        thresholds (dict, optional): Seuils par critère ; ceux des règles par défaut
+        min_level (int): Niveau à partir duquel un jour compte comme une alerte
+        lead_days (int): Anticipation maximale prise en compte, en jours
+
+    Returns:
+        dict: Seuils et scores de ce jeu
+    """
+    thresholds = {**DEFAULT_THRESHOLDS, **(thresholds or {})}
+    result = sweep(data, {name: [value] for name, value in thresholds.items()}, min_level, lead_days)
+    return {name: _to_python(values[0]) for name, values in result.items()}
+
+
+def best(result, metric="csi", top=10):
+    """
+    Retourne les meilleures combinaisons d'un balayage.
+
+    Args:
+        result (dict): Résultat de sweep
+        metric (str): Score utilisé pour le classement (décroissant)
+        top (int): Nombre de combinaisons retournées
+
+    Returns:
+        list: Combinaisons (dict seuils et scores)
+    """
+    order = np.argsort(-np.nan_to_num(result[metric], nan=-np.inf), kind="stable")[:top]
+    return [{name: _to_python(values[i]) for name, values in result.items()} for i in order]
+
+
+def _to_python(value):
+    """Convertit un scalaire NumPy en valeur JSON (NaN -> None)."""
+    value = value.item() if hasattr(value, "item") else value
+    return None if isinstance(value, float) and np.isnan(value) else value
+
+
+def main():
+    """Évalue les seuils des règles, ou balaie une grille de seuils, sur l'historique."""
+    parser = argparse.ArgumentParser(description="Rétro-évaluation des seuils de prédiction des inondations")
+    parser.add_argument("--start", help="Premier jour évalué (AAAA-MM-JJ)")
+    parser.add_argument("--end", help="Dernier jour évalué (AAAA-MM-JJ)")
+    parser.add_argument("--min-level", type=int, default=1, choices=[1, 2], help="Niveau d'alerte (1 modéré, 2 élevé)")
+    parser.add_argument("--lead-days", type=int, default=7, help="Anticipation maximale en jours")
+    parser.add_argument("--ouagadougou-only", action="store_true", help="Ne retenir que les inondations de Ouagadougou")
+    parser.add_argument("--sweep", action="store_true", help="Balayer la grille de seuils par défaut")
+    parser.add_argument("--top", type=int, default=10, help="Nombre de combinaisons affichées après balayage")
+    parser.add_argument("--cache-dir", help="Répertoire du cache des séries historiques")
+    args = parser.parse_args()
+
+    store = HistoricalDataStore(cache_dir=args.cache_dir) if args.cache_dir else HistoricalDataStore()
+    data = load_backtest_data(store, args.start, args.end, args.ouagadougou_only)
+    levels = daily_risk_levels(data)
+
+    output = {
+        "period": {"start": str(data.days[0]), "end": str(data.days[-1]), "days": len(data.days)},
+        "events": len(data.events),
+        "daily_levels": {RISK_LABELS[level]: int((levels == level).sum()) for level in RISK_LABELS},
+        "rules": score(data, min_level=args.min_level, lead_days=args.lead_days)
+    }
+    if args.sweep:
+        result = sweep(data, DEFAULT_GRID, args.min_level, args.lead_days)
+        output["combinations"] = len(result["csi"])
+        output["best"] = best(result, top=args.top)
+    print(json.dumps(output, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Comparaison de deux exécutions du benchmark (fichiers JSON de run.py).
+Pour chaque mesure présente dans les deux fichiers (scénario, concurrence, route), affiche le p95
+et le débit de référence et candidats avec leur écart relatif, et signale les régressions au-delà
+d'un seuil. Le code de sortie vaut 1 en cas de régression, pour un usage en intégration continue.
+
+Exemple :
+    python benchmarks/compare.py reference.json candidat.json --threshold 10
+"""
+
+import argparse
+import json
+import sys
+
+
+def load_results(path):
+    """
+    Charge un fichier de résultats indexé par mesure.
+
+    Returns:
+        tuple: (métadonnées, dict (scénario, concurrence, route) -> résultat)
+    """
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    results = {(entry["scenario"], entry["concurrency"], entry["route"]): entry for entry in data["results"]}
+    return data["meta"], results
+
+
+def relative_change(before, after):
+    """Écart relatif en pourcentage (None si non calculable)."""
+    if before is None or after is None or before == 0:
+        return None
+    return round((after - before) / before * 100, 1)
+
+
+def compare(baseline, candidate, threshold):
+    """
+    Compare deux ensembles de résultats.
+
+    Args:
+        baseline (dict): Résultats de référence (voir load_results)
+        candidate (dict): Résultats candidats
+        threshold (float): Écart (%) au-delà duquel une hausse du p95 ou une baisse du débit est une régression
+
+    Returns:
+        list: Une ligne par mesure commune, avec p95, débit, écarts et indicateur de régression
+    """
+    rows = []
+    for key in sorted(set(baseline) & set(candidate)):
+        before, after = baseline[key], candidate[key]
+        p95_change = relative_change(before["latency_ms"]["p95"], after["latency_ms"]["p95"])
+        throughput_change = relative_change(before["throughput_rps"], after["throughput_rps"])
+        rows.append({
+            "scenario": key[0],
+            "concurrency": key[1],
+            "route": key[2],
+            "p95_ms": (before["latency_ms"]["p95"], after["latency_ms"]["p95"]),
+            "p95_change": p95_change,
+            "throughput_rps": (before["throughput_rps"], after["throughput_rps"]),
+            "throughput_change": throughput_change,
+            "errors": (before["errors"], after["errors"]),
+            "regression": ((p95_change is not None and p95_change > threshold)
+                           or (throughput_change is not None and throughput_change < -threshold)
+                           or after["errors"] > before["errors"])
+        })
+    return rows
+
+
+def _format_change(change):
+    return "n/a" if change is None else f"{change:+.1f}%"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Comparaison de deux exécutions du benchmark")
+    parser.add_argument("baseline", help="Résultats de référence (JSON)")
+    parser.add_argument("candidate", help="Résultats à comparer (JSON)")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Seuil de régression en pourcentage")
+    parser.add_argument("--json", action="store_true", help="Écrire la comparaison en JSON")
+    args = parser.parse_args()
+
+    baseline_meta, baseline = load_results(args.baseline)
+    candidate_meta, candidate = load_results(args.candidate)
+    rows = compare(baseline, candidate, args.threshold)
+
+    if args.json:
+        print(json.dumps({
+            "baseline": baseline_meta.get("git_commit"),
+            "candidate": candidate_meta.get("git_commit"),
+            "threshold": args.threshold,
+            "rows": rows
+        }, ensure_ascii=False, indent=2))
+    else:
+        print(f"Référence {baseline_meta.get('git_commit')} -> candidat {candidate_meta.get('git_commit')}")
+        for row in rows:
+            marker = "REGRESSION" if row["regression"] else ""
+            print(f"{row['scenario']:>8} c={row['concurrency']:<3} {row['route']:<32} "
+                  f"p95 {row['p95_ms'][0]} -> {row['p95_ms'][1]} ms ({_format_change(row['p95_change'])})  "
+                  f"débit {row['throughput_rps'][0]} -> {row['throughput_rps'][1]} req/s "
+                  f"({_format_change(row['throughput_change'])})  {marker}")
+        only = set(baseline) ^ set(candidate)
+        if only:
+            print(f"{len(only)} mesure(s) présente(s) dans un seul des deux fichiers, ignorée(s)")
+
+    return 1 if any(row["regression"] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,455 @@
+"""
+Benchmark des routes de l'API face à des APIs externes simulées.
+Chaque route /api/v1 et /api/ontology est sollicitée à plusieurs niveaux de concurrence dans
+trois scénarios :
+    cold      application neuve pour chaque route et niveau : caches vides au premier appel
+    warm      caches remplis par un premier appel avant la mesure
+    degraded  application neuve avec des APIs externes en échec ou lentes (voir --degrade)
+Pour chaque mesure sont relevés le débit, les latences (moyenne, p50, p95, p99, maximum), les
+codes HTTP et le nombre d'appels reçus par chaque API simulée. Les résultats sont écrits en JSON
+pour comparer des exécutions (voir compare.py). Une route qui ne renvoie que des erreurs hors
+scénario dégradé fait terminer le script avec le code 1.
+
+Exemple :
+    python benchmarks/run.py --concurrency 1,8,32 --requests 200 --output results.json
+"""
+
+from collections import Counter
+from datetime import datetime, timezone
+import argparse
+import itertools
+import json
+import math
+import os
+import platform
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import requests
+
+from stub_server import StubServer, UPSTREAMS, MODES
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SERVE_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "serve.py")
+# Ontologie réduite utilisée par défaut : l'ontologie de production n'est pas versionnée, et sans
+# ontologie les routes de prédiction et /api/ontology ne mesureraient que leur réponse d'erreur
+FIXTURE_ONTOLOGY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "ontology.owl")
+
+SCENARIOS = ("cold", "warm", "degraded")
+DEFAULT_DEGRADE = "wigos=failing,fanfar=slow"
+
+# Délai maximal de démarrage de l'application (chargement de l'ontologie compris)
+STARTUP_TIMEOUT = 120
+# Délai d'attente d'une requête de mesure (secondes)
+REQUEST_TIMEOUT = 60
+
+BATCH_ZONES = [
+    {"name": "Ouagadougou"},
+    {"name": "Ouagadougou-Nord", "latitude": 12.43, "longitude": -1.52},
+    {"name": "Ouagadougou-Sud", "latitude": 12.33, "longitude": -1.53}
+]
+
+# Routes mesurées : (nom, méthode, chemin avec paramètres, corps JSON)
+ROUTES = [
+    ("health", "GET", "/api/v1/health", None),
+    ("meteo_current", "GET", "/api/v1/meteo/current", None),
+    ("meteo_history", "GET", "/api/v1/meteo/history?days_before=5&days_after=5", None),
+    ("hydro_current", "GET", "/api/v1/hydro/current", None),
+    ("hydro_history", "GET", "/api/v1/hydro/history", None),
+    ("hydro_history_downsampled", "GET", "/api/v1/hydro/history?points=100&method=lttb", None),
+    ("prediction_flood", "GET", "/api/v1/prediction/flood", None),
+    ("prediction_flood_batch", "POST", "/api/v1/prediction/flood/batch", {"zones": BATCH_ZONES}),
+    ("ontology_statistics", "GET", "/api/ontology/statistics", None),
+    ("ontology_description", "GET", "/api/ontology/description", None),
+    ("ontology_classes", "GET", "/api/ontology/classes", None),
+    ("ontology_object_properties", "GET", "/api/ontology/object-properties", None),
+    ("ontology_data_properties", "GET", "/api/ontology/data-properties", None),
+    ("ontology_individuals", "GET", "/api/ontology/individuals", None),
+    ("ontology_inferred", "GET", "/api/ontology/inferred", None),
+    ("ontology_visualization", "GET", "/api/ontology/visualization", None),
+    ("ontology_rules", "GET", "/api/ontology/rules", None),
+    # Zone de l'ontologie de benchmark (fixtures/ontology.owl) dont le risque élevé est inféré au chargement
+    ("ontology_inference_explanation", "GET",
+     "/api/ontology/inference-explanation?zone=Zone_Pissy&property=HighRisk", None)
+]
+
+# Routes non mesurées, avec la raison
+SKIPPED_ROUTES = {
+    "/api/v1/stream": "flux SSE de longue durée : pas de latence de réponse à mesurer",
+    "/api/ontology/reload": "recharge l'ontologie et les règles : fausserait les autres mesures"
+}
+
+
+def percentile(sorted_values, p):
+    """Percentile par rang le plus proche d'une liste triée (None si vide)."""
+    if not sorted_values:
+        return None
+    rank = max(math.ceil(p / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+def latency_summary(latencies):
+    """
+    Résume des latences.
+
+    Args:
+        latencies (list): Latences en secondes
+
+    Returns:
+        dict: mean, p50, p95, p99 et max en millisecondes (None si aucune latence)
+    """
+    values = sorted(latency * 1000 for latency in latencies)
+    if not values:
+        return {"mean": None, "p50": None, "p95": None, "p99": None, "max": None}
+    return {
+        "mean": round(sum(values) / len(values), 2),
+        "p50": round(percentile(values, 50), 2),
+        "p95": round(percentile(values, 95), 2),
+        "p99": round(percentile(values, 99), 2),
+        "max": round(values[-1], 2)
+    }
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=REPO_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class AppProcess:
+    """Application servie dans un processus séparé, avec des caches neufs."""
+
+    def __init__(self, env, work_dir):
+        """
+        Args:
+            env (dict): Variables d'environnement ajoutées (APIs simulées, répertoire des instantanés)
+            work_dir (str): Répertoire de travail du benchmark (caches et journaux)
+        """
+        self.port = _free_port()
+        self.base_url = f"http://127.0.0.1:{self.port}"
+        self.cache_dir = tempfile.mkdtemp(prefix="cache-", dir=work_dir)
+        self.log_path = os.path.join(work_dir, f"app-{self.port}.log")
+        self.env = dict(os.environ, **env, SHARED_CACHE_DIR=self.cache_dir)
+        self.process = None
+
+    def start(self):
+        """
+        Démarre l'application et attend qu'elle réponde.
+
+        Raises:
+            RuntimeError: Si l'application s'arrête ou ne répond pas à temps
+        """
+        self._log = open(self.log_path, "w")
+        self.process = subprocess.Popen(
+            [sys.executable, SERVE_SCRIPT, "--port", str(self.port)],
+            cwd=REPO_DIR, env=self.env, stdout=self._log, stderr=subprocess.STDOUT
+        )
+        deadline = time.monotonic() + STARTUP_TIMEOUT
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                self.stop()
+                raise RuntimeError(f"L'application s'est arrêtée au démarrage:\n{self._log_tail()}")
+            try:
+                requests.get(f"{self.base_url}/api/v1/health", timeout=1)
+                return self
+            except requests.exceptions.RequestException:
+                time.sleep(0.2)
+        self.stop()
+        raise RuntimeError(f"L'application ne répond pas après {STARTUP_TIMEOUT} s:\n{self._log_tail()}")
+
+    def _log_tail(self, lines=20):
+        """Retourne les dernières lignes du journal de l'application."""
+        with open(self.log_path, encoding="utf-8", errors="replace") as f:
+            return "".join(f.readlines()[-lines:])
+
+    def stop(self):
+        """Arrête l'application et supprime ses caches."""
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+        self._log.close()
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+
+def run_load(base_url, route, concurrency, total):
+    """
+    Envoie des requêtes à une route depuis `concurrency` threads, chacun avec sa session.
+
+    Args:
+        base_url (str): URL de l'application
+        route (tuple): (nom, méthode, chemin, corps JSON)
+        concurrency (int): Nombre de requêtes simultanées
+        total (int): Nombre total de requêtes
+
+    Returns:
+        dict: Durée totale et, par requête dans l'ordre d'envoi, (latence, code HTTP ou erreur)
+    """
+    _, method, path, body = route
+    url = f"{base_url}{path}"
+    results = [None] * total
+    counter = itertools.count()
+    barrier = threading.Barrier(concurrency + 1)
+
+    def worker():
+        session = requests.Session()
+        barrier.wait()
+        while True:
+            index = next(counter)  # itertools.count est sûr entre threads sous le GIL
+            if index >= total:
+                break
+            started = time.perf_counter()
+            try:
+                response = session.request(method, url, json=body, timeout=REQUEST_TIMEOUT)
+                outcome = response.status_code
+            except requests.exceptions.RequestException as e:
+                outcome = type(e).__name__
+            results[index] = (time.perf_counter() - started, outcome)
+        session.close()
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    return {"duration": time.perf_counter() - started, "results": results}
+
+
+def probe_error(base_url, route):
+    """
+    Envoie une requête de contrôle et retourne l'erreur qu'elle signale, le cas échéant.
+    Les routes /api/ontology répondent 200 avec {"error": ...} quand l'ontologie est absente :
+    le code HTTP seul ne suffit pas à repérer une mesure du chemin d'erreur.
+
+    Returns:
+        str: Code HTTP ou message d'erreur, None si la réponse est valide
+    """
+    _, method, path, body = route
+    try:
+        response = requests.request(method, f"{base_url}{path}", json=body, timeout=REQUEST_TIMEOUT)
+    except requests.exceptions.RequestException as e:
+        return type(e).__name__
+    if response.status_code >= 500:
+        return str(response.status_code)
+    try:
+        payload = response.json()
+    except ValueError:
+        return None
+    if isinstance(payload, dict) and "error" in payload:
+        return str(payload["error"])
+    return None
+
+
+def summarize(load, concurrency):
+    """
+    Calcule le débit et les latences d'une mesure.
+
+    Args:
+        load (dict): Résultat de run_load
+        concurrency (int): Nombre de requêtes simultanées
+
+    Returns:
+        dict: Compteurs, débit (requêtes/s), latences de toutes les requêtes et de la première
+            vague (les `concurrency` premières, seules à trouver les caches vides à froid)
+    """
+    results = load["results"]
+    statuses = Counter(str(outcome) for _, outcome in results)
+    errors = sum(1 for _, outcome in results if not isinstance(outcome, int) or outcome >= 500)
+    return {
+        "requests": len(results),
+        "errors": errors,
+        "status_counts": dict(sorted(statuses.items())),
+        "duration_s": round(load["duration"], 3),
+        "throughput_rps": round(len(results) / load["duration"], 2) if load["duration"] > 0 else None,
+        "latency_ms": latency_summary([latency for latency, _ in results]),
+        "first_wave_ms": latency_summary([latency for latency, _ in results[:concurrency]])
+    }
+
+
+def parse_degrade(value):
+    """
+    Lit les modes des APIs du scénario dégradé ("wigos=failing,fanfar=slow").
+
+    Raises:
+        argparse.ArgumentTypeError: Si une API ou un mode est inconnu
+    """
+    modes = {}
+    for item in filter(None, value.split(",")):
+        upstream, _, mode = item.partition("=")
+        if upstream not in UPSTREAMS or mode not in MODES:
+            raise argparse.ArgumentTypeError(f"Attendu api=mode avec api parmi {UPSTREAMS} et mode parmi {MODES}: {item}")
+        modes[upstream] = mode
+    return modes
+
+
+class BenchmarkRunner:
+    """Enchaîne les scénarios, niveaux de concurrence et routes."""
+
+    def __init__(self, routes, levels, total, degrade, work_dir):
+        self.routes = routes
+        self.levels = levels
+        self.total = total
+        self.degrade = degrade
+        self.work_dir = work_dir
+        self.stub = StubServer()
+        # L'instantané de l'ontologie fait partie du déploiement, pas des caches mesurés :
+        # il est partagé par les applications successives pour accélérer leur démarrage
+        self.env = dict(self.stub.upstream_env(),
+                        ONTOLOGY_PATH=os.environ.get("ONTOLOGY_PATH", FIXTURE_ONTOLOGY),
+                        ONTOLOGY_SNAPSHOT_DIR=os.path.join(work_dir, "snapshots"))
+        self.results = []
+        self.failed_routes = []
+
+    def _measure(self, scenario, app, route, concurrency):
+        """Mesure une route sur une application démarrée et enregistre le résultat."""
+        before = self.stub.state.stats()["requests"]
+        load = run_load(app.base_url, route, concurrency, self.total)
+        after = self.stub.state.stats()["requests"]
+        entry = {
+            "scenario": scenario,
+            "concurrency": concurrency,
+            "route": route[0],
+            "method": route[1],
+            "path": route[2],
+            "upstream_requests": {upstream: after[upstream] - before[upstream] for upstream in UPSTREAMS}
+        }
+        entry.update(summarize(load, concurrency))
+        # Une route qui ne renvoie que des erreurs ne mesure que son chemin d'erreur. Attendu en
+        # scénario dégradé, c'est ailleurs un défaut de configuration (ontologie, APIs simulées)
+        error = None if entry["errors"] < entry["requests"] else "codes " + ", ".join(entry["status_counts"])
+        error = error or probe_error(app.base_url, route)
+        entry["only_errors"] = error is not None
+        self.results.append(entry)
+        latency = entry["latency_ms"]
+        print(f"{scenario:>8} c={concurrency:<3} {route[0]:<32} {entry['throughput_rps']:>9} req/s  "
+              f"p50 {latency['p50']:>9} ms  p95 {latency['p95']:>9} ms  p99 {latency['p99']:>9} ms  "
+              f"erreurs {entry['errors']}", flush=True)
+        if error is not None:
+            print(f"ATTENTION: {route[0]} ne renvoie que des erreurs ({error}), la mesure ne porte que "
+                  f"sur le chemin d'erreur. Fin du journal de l'application:\n{app._log_tail(5)}",
+                  file=sys.stderr, flush=True)
+            if scenario != "degraded":
+                self.failed_routes.append(f"{scenario} c={concurrency} {route[0]}")
+
+    def run_fresh(self, scenario, modes):
+        """Application neuve pour chaque route et niveau (scénarios cold et degraded)."""
+        for concurrency in self.levels:
+            for route in self.routes:
+                self.stub.reset()
+                with AppProcess(self.env, self.work_dir) as app:
+                    for upstream, mode in modes.items():
+                        self.stub.set_mode(upstream, mode)
+                    self._measure(scenario, app, route, concurrency)
+
+    def run_warm(self):
+        """Une application par niveau, chaque route appelée une fois avant sa mesure."""
+        for concurrency in self.levels:
+            self.stub.reset()
+            with AppProcess(self.env, self.work_dir) as app:
+                for route in self.routes:
+                    run_load(app.base_url, route, 1, 1)
+                    self._measure("warm", app, route, concurrency)
+
+    def run(self, scenarios):
+        self.stub.start()
+        try:
+            for scenario in scenarios:
+                if scenario == "warm":
+                    self.run_warm()
+                else:
+                    self.run_fresh(scenario, self.degrade if scenario == "degraded" else {})
+        finally:
+            self.stub.shutdown()
+            self.stub.server_close()
+        return self.results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark des routes de l'API avec APIs externes simulées")
+    parser.add_argument("--concurrency", default="1,8,32", help="Niveaux de concurrence, séparés par des virgules")
+    parser.add_argument("--requests", type=int, default=200, help="Nombre de requêtes par route et niveau")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="Scénarios parmi cold, warm, degraded")
+    parser.add_argument("--routes", help="Noms des routes mesurées, séparés par des virgules (par défaut toutes)")
+    parser.add_argument("--degrade", type=parse_degrade, default=parse_degrade(DEFAULT_DEGRADE),
+                        help=f"Modes des APIs du scénario dégradé (par défaut {DEFAULT_DEGRADE})")
+    parser.add_argument("--output", default="benchmark-results.json", help="Fichier JSON des résultats")
+    args = parser.parse_args()
+
+    levels = [int(level) for level in args.concurrency.split(",")]
+    scenarios = [scenario for scenario in args.scenarios.split(",") if scenario]
+    unknown = [scenario for scenario in scenarios if scenario not in SCENARIOS]
+    if unknown:
+        parser.error(f"Scénarios inconnus: {', '.join(unknown)}")
+    routes = ROUTES
+    if args.routes:
+        names = args.routes.split(",")
+        routes = [route for route in ROUTES if route[0] in names]
+        unknown = sorted(set(names) - {route[0] for route in routes})
+        if unknown:
+            parser.error(f"Routes inconnues: {', '.join(unknown)}")
+    if min(levels) < 1 or args.requests < max(levels):
+        parser.error("Chaque niveau de concurrence doit être compris entre 1 et --requests")
+
+    work_dir = tempfile.mkdtemp(prefix="bf-flood-benchmark-")
+    try:
+        runner = BenchmarkRunner(routes, levels, args.requests, args.degrade, work_dir)
+        started = datetime.now(timezone.utc)
+        results = runner.run(scenarios)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    output = {
+        "meta": {
+            "started_at": started.isoformat(),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "server": "werkzeug (threaded)",
+            "config": {
+                "concurrency": levels,
+                "requests": args.requests,
+                "scenarios": scenarios,
+                "degrade": args.degrade,
+                "routes": [route[0] for route in routes]
+            },
+            "skipped_routes": SKIPPED_ROUTES
+        },
+        "results": results
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(output, f, ensure_ascii=False, indent=2)
+    print(f"Résultats écrits dans {args.output}")
+    if runner.failed_routes:
+        print(f"{len(runner.failed_routes)} mesure(s) hors scénario dégradé sans aucune réponse valide:\n  "
+              + "\n  ".join(runner.failed_routes), file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,33 @@
+"""
+Démarre l'application pour les benchmarks, sans le thread de rafraîchissement.
+Sans rafraîchissement périodique, les caches ne se remplissent qu'au fil des requêtes : le
+scénario « cache froid » mesure bien le premier remplissage. Les APIs externes et les répertoires
+de cache se configurent par variables d'environnement (voir run.py).
+"""
+
+import argparse
+import os
+import sys
+
+# Le module app se trouve à la racine du dépôt
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Application Flask servie pour les benchmarks")
+    parser.add_argument("--host", default="127.0.0.1", help="Adresse d'écoute")
+    parser.add_argument("--port", type=int, default=5000, help="Port d'écoute")
+    parser.add_argument("--with-refresh", action="store_true", help="Démarrer aussi le thread de rafraîchissement")
+    args = parser.parse_args()
+
+    import app as application
+
+    if args.with_refresh:
+        application.start_refresh_thread()
+    # Serveur de développement multi-thread de Werkzeug : gunicorn n'est pas requis pour mesurer
+    # les routes, mais les chiffres absolus ne valent pas ceux d'un déploiement gunicorn
+    application.app.run(host=args.host, port=args.port, threaded=True, debug=False, use_reloader=False)
+
+
+if __name__ == "__main__":
+    main()
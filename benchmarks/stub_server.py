@@ -0,0 +1,345 @@
+"""
+Serveur local remplaçant les APIs externes (WIGOS, Open-Meteo, FANFAR) pendant les benchmarks.
+Les réponses rejouent des données enregistrées (répertoire fixtures) recalées sur la période
+demandée, pour que l'application les traite comme des données actuelles. Chaque API peut être
+basculée en mode lent ou en échec pour mesurer le comportement de l'application dégradée.
+Chaque API écoute sur son propre port : l'application garde un disjoncteur par hôte (adresse et
+port), une API en échec ne doit pas ouvrir celui des deux autres.
+
+Pilotage (sur n'importe lequel des ports) :
+    GET /__mode?upstream=wigos&value=slow   mode d'une API (normal, slow ou failing)
+    GET /__stats                            nombre de requêtes reçues par API et modes courants
+"""
+
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+import argparse
+import json
+import os
+import threading
+import time
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+UPSTREAMS = ("wigos", "open-meteo", "fanfar")
+MODES = ("normal", "slow", "failing")
+
+# Latence ajoutée en mode lent (secondes) : inférieure au délai d'attente par défaut (10 s), les
+# requêtes aboutissent mais occupent les connexions et les workers de l'application
+SLOW_DELAY = float(os.environ.get("STUB_SLOW_DELAY", 3.0))
+
+WIGOS_TIME_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+DAY_MS = 86400000
+
+
+def _load_fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _parse_wigos_time(value):
+    return datetime.strptime(value, WIGOS_TIME_FORMAT).replace(tzinfo=timezone.utc)
+
+
+class UpstreamReplay:
+    """Réponses rejouées des trois APIs, recalées sur la période demandée."""
+
+    def __init__(self):
+        # Valeurs enregistrées de chaque paramètre WIGOS par heure de la journée
+        self.wigos = {}
+        for feature in _load_fixture("wigos_items.json")["features"]:
+            props = feature["properties"]
+            hour = _parse_wigos_time(props["phenomenonTime"]).hour
+            self.wigos.setdefault(props["name"], {})[hour] = (props["value"], props["units"])
+        self.wigos_geometry = feature["geometry"]
+
+        self.openmeteo = _load_fixture("openmeteo_forecast.json")
+        self.fanfar = _load_fixture("fanfar_point.json")
+
+    def wigos_items(self, query):
+        """
+        Génère les observations horaires d'une station WIGOS.
+
+        Args:
+            query (dict): Paramètres de la requête (datetime "début/fin" ou "début/..", name, limit)
+
+        Returns:
+            dict: FeatureCollection GeoJSON
+        """
+        now = datetime.now(timezone.utc)
+        start_str, _, end_str = query.get("datetime", "..").partition("/")
+        start = _parse_wigos_time(start_str) if start_str not in ("", "..") else now - timedelta(days=1)
+        # Une station ne publie pas d'observation future
+        end = min(_parse_wigos_time(end_str), now) if end_str not in ("", "..") else now
+        names = [query["name"]] if "name" in query else list(self.wigos)
+        limit = int(query.get("limit", 10))
+        station = query.get("wigos_station_identifier", "0-854-0-090")
+
+        features = []
+        hour = start.replace(minute=0, second=0, microsecond=0)
+        if hour < start:
+            hour += timedelta(hours=1)
+        while hour <= end and len(features) < limit:
+            stamp = hour.strftime(WIGOS_TIME_FORMAT)
+            report_id = f"WIGOS_{station}_{hour.strftime('%Y%m%dT%H%M%S')}"
+            for name in names:
+                if len(features) >= limit:
+                    break
+                value, units = self.wigos.get(name, {}).get(hour.hour, (None, None))
+                features.append({
+                    "type": "Feature",
+                    "id": f"{report_id}-{name}",
+                    "geometry": self.wigos_geometry,
+                    "properties": {
+                        "reportId": report_id,
+                        "phenomenonTime": stamp,
+                        "reportTime": stamp,
+                        "wigos_station_identifier": station,
+                        "name": name,
+                        "value": value,
+                        "units": units
+                    }
+                })
+            hour += timedelta(hours=1)
+        return {"type": "FeatureCollection", "features": features,
+                "numberMatched": len(features), "numberReturned": len(features)}
+
+    def openmeteo_forecast(self, query):
+        """
+        Répète la journée enregistrée sur chaque jour de start_date à end_date.
+
+        Args:
+            query (dict): Paramètres de la requête (start_date, end_date, hourly)
+
+        Returns:
+            dict: Réponse Open-Meteo avec un bloc "hourly"
+        """
+        today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+        start = datetime.strptime(query.get("start_date", today), "%Y-%m-%d")
+        end = datetime.strptime(query.get("end_date", today), "%Y-%m-%d")
+        recorded = self.openmeteo["hourly"]
+        params = query["hourly"].split(",") if "hourly" in query else [p for p in recorded if p != "time"]
+
+        hourly = {"time": []}
+        hourly.update({param: [] for param in params})
+        day = start
+        while day <= end:
+            for index, stamp in enumerate(recorded["time"]):
+                hourly["time"].append(day.strftime("%Y-%m-%d") + stamp[10:])
+                for param in params:
+                    hourly[param].append(recorded[param][index] if param in recorded else None)
+            day += timedelta(days=1)
+
+        response = {key: value for key, value in self.openmeteo.items() if key != "hourly"}
+        response["hourly"] = hourly
+        return response
+
+    def fanfar_point(self, query):
+        """
+        Décale les séries FANFAR enregistrées pour que la prévision commence aujourd'hui.
+
+        Args:
+            query (dict): Paramètres de la requête (subid)
+
+        Returns:
+            dict: Réponse FANFAR (station, poiCenter, chartData)
+        """
+        today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+        shift = int(today.timestamp() * 1000) - self.fanfar["recorded_at"]
+        chart = self.fanfar["chartData"]
+        response = {
+            "station": dict(self.fanfar["station"], subid=int(query.get("subid", self.fanfar["station"]["subid"]))),
+            "poiCenter": self.fanfar["poiCenter"],
+            "chartData": {
+                "hindcast": [[stamp + shift, value] for stamp, value in chart["hindcast"]],
+                "forecast": [[stamp + shift, value] for stamp, value in chart["forecast"]],
+                "hq2": chart["hq2"],
+                "hq5": chart["hq5"],
+                "hq30": chart["hq30"],
+                "scaleticks": [[stamp + shift, datetime.fromtimestamp((stamp + shift) / 1000, timezone.utc)
+                                .strftime("%d %b")] for stamp, _ in chart["scaleticks"]]
+            }
+        }
+        return response
+
+
+class StubState:
+    """Modes courants des APIs et compteurs de requêtes, partagés par les threads du serveur."""
+
+    def __init__(self):
+        self.modes = {upstream: "normal" for upstream in UPSTREAMS}
+        self.requests = {upstream: 0 for upstream in UPSTREAMS}
+        self.lock = threading.Lock()
+
+    def hit(self, upstream):
+        """Compte une requête et retourne le mode courant de l'API."""
+        with self.lock:
+            self.requests[upstream] += 1
+            return self.modes[upstream]
+
+    def stats(self):
+        with self.lock:
+            return {"modes": dict(self.modes), "requests": dict(self.requests)}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Routes des APIs simulées et de pilotage."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        replay, state = self.server.replay, self.server.state
+
+        if url.path == "/__mode":
+            upstream, mode = query.get("upstream"), query.get("value")
+            if upstream not in UPSTREAMS or mode not in MODES:
+                return self._send_json(400, {"error": f"upstream parmi {UPSTREAMS}, value parmi {MODES}"})
+            with state.lock:
+                state.modes[upstream] = mode
+            return self._send_json(200, state.stats())
+        if url.path == "/__stats":
+            return self._send_json(200, state.stats())
+
+        if url.path == "/wigos":
+            upstream, build = "wigos", replay.wigos_items
+        elif url.path == "/openmeteo":
+            upstream, build = "open-meteo", replay.openmeteo_forecast
+        elif url.path.startswith("/fanfar/"):
+            upstream, build = "fanfar", replay.fanfar_point
+        else:
+            return self._send_json(404, {"error": f"Route inconnue: {url.path}"})
+
+        mode = state.hit(upstream)
+        if mode == "failing":
+            return self._send_json(503, {"error": "Service Unavailable"})
+        if mode == "slow":
+            time.sleep(SLOW_DELAY)
+        self._send_json(200, build(query))
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Journal d'accès désactivé : il fausserait les mesures sous charge
+        pass
+
+
+class UpstreamHTTPServer(ThreadingHTTPServer):
+    """Serveur HTTP multi-thread d'une API simulée, avec les réponses et l'état partagés."""
+
+    daemon_threads = True
+
+    def __init__(self, address, replay, state):
+        super().__init__(address, StubHandler)
+        self.replay = replay
+        self.state = state
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+class StubServer:
+    """APIs simulées, chacune sur son port, avec des modes et compteurs communs."""
+
+    def __init__(self, host="127.0.0.1", port=0):
+        """
+        Args:
+            host (str): Adresse d'écoute
+            port (int): Premier port d'écoute, les APIs suivantes prennent les ports consécutifs
+                (0 = ports libres choisis par le système)
+        """
+        self.replay = UpstreamReplay()
+        self.state = StubState()
+        self.servers = {}
+        try:
+            for index, upstream in enumerate(UPSTREAMS):
+                self.servers[upstream] = UpstreamHTTPServer((host, port + index if port else 0),
+                                                            self.replay, self.state)
+        except OSError:
+            self.server_close()
+            raise
+
+    @property
+    def base_url(self):
+        """URL de pilotage (/__mode, /__stats), celle du serveur de la première API."""
+        return self.servers[UPSTREAMS[0]].base_url
+
+    def upstream_env(self):
+        """
+        Retourne les variables d'environnement pointant l'application vers ces serveurs.
+
+        Returns:
+            dict: METEO_API_BASE_URL, OPENMETEO_API_URL et FANFAR_API_BASE_URL
+        """
+        return {
+            "METEO_API_BASE_URL": f"{self.servers['wigos'].base_url}/wigos",
+            "OPENMETEO_API_URL": f"{self.servers['open-meteo'].base_url}/openmeteo",
+            "FANFAR_API_BASE_URL": f"{self.servers['fanfar'].base_url}/fanfar"
+        }
+
+    def set_mode(self, upstream, mode):
+        """Change le mode d'une API (normal, slow ou failing)."""
+        if upstream not in UPSTREAMS or mode not in MODES:
+            raise ValueError(f"API ou mode inconnu: {upstream}={mode}")
+        with self.state.lock:
+            self.state.modes[upstream] = mode
+
+    def reset(self):
+        """Remet toutes les APIs en mode normal et les compteurs à zéro."""
+        with self.state.lock:
+            for upstream in UPSTREAMS:
+                self.state.modes[upstream] = "normal"
+                self.state.requests[upstream] = 0
+
+    def start(self):
+        """Démarre chaque serveur dans un thread d'arrière-plan."""
+        threads = [threading.Thread(target=server.serve_forever, name=f"upstream-stub-{upstream}", daemon=True)
+                   for upstream, server in self.servers.items()]
+        for thread in threads:
+            thread.start()
+        return threads
+
+    def serve_forever(self):
+        """Sert les APIs jusqu'à l'interruption du processus (utilisation manuelle)."""
+        self.start()
+        threading.Event().wait()
+
+    def shutdown(self):
+        for server in self.servers.values():
+            server.shutdown()
+
+    def server_close(self):
+        for server in self.servers.values():
+            server.server_close()
+
+
+def main():
+    """Démarre les APIs simulées au premier plan (utilisation manuelle)."""
+    parser = argparse.ArgumentParser(description="APIs externes simulées pour les benchmarks")
+    parser.add_argument("--host", default="127.0.0.1", help="Adresse d'écoute")
+    parser.add_argument("--port", type=int, default=8900, help="Premier port d'écoute (un port par API)")
+    args = parser.parse_args()
+
+    server = StubServer(args.host, args.port)
+    for name, value in server.upstream_env().items():
+        print(f"{name}={value}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
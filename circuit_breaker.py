@@ -0,0 +1,150 @@
+"""
+Module de disjoncteurs (circuit breakers) pour les APIs externes.
+Chaque hôte a son disjoncteur, alimenté par le résultat et la durée de ses dernières requêtes :
+fermé, il laisse passer les requêtes ; ouvert, après un taux d'erreurs ou de lenteurs trop élevé,
+il les refuse immédiatement pour que l'appelant bascule sans attendre vers une source de secours ;
+semi-ouvert, à l'issue du délai d'ouverture, il laisse passer une seule requête de sonde dont le
+résultat referme ou rouvre le circuit.
+"""
+
+from collections import deque
+import threading
+import time
+import requests
+import logging
+
+# Configuration du logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# États du disjoncteur
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Requête refusée sans appel réseau : le disjoncteur de l'hôte est ouvert."""
+
+
+class CircuitBreaker:
+    """Disjoncteur d'un hôte, piloté par le taux d'erreurs et de requêtes lentes récentes."""
+
+    def __init__(self, name, window_size=20, min_calls=5, failure_rate_threshold=0.5,
+                 slow_call_fraction=0.8, slow_call_rate_threshold=0.8, open_duration=30, max_open_duration=300):
+        """
+        Args:
+            name (str): Nom de l'hôte surveillé
+            window_size (int): Nombre de requêtes récentes prises en compte
+            min_calls (int): Nombre minimal de requêtes avant de pouvoir ouvrir le circuit
+            failure_rate_threshold (float): Taux d'erreurs à partir duquel le circuit s'ouvre
+            slow_call_fraction (float): Fraction du délai d'attente au-delà de laquelle une requête est lente
+            slow_call_rate_threshold (float): Taux de requêtes lentes à partir duquel le circuit s'ouvre
+            open_duration (float): Durée d'ouverture avant la première sonde (secondes)
+            max_open_duration (float): Durée d'ouverture maximale, doublée à chaque sonde en échec
+        """
+        self.name = name
+        self.window_size = window_size
+        self.min_calls = min_calls
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_fraction = slow_call_fraction
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.open_duration = open_duration
+        self.max_open_duration = max_open_duration
+
+        self.state = CLOSED
+        self._calls = deque(maxlen=window_size)  # (échec, lente)
+        self._opened_at = None
+        self._current_open_duration = open_duration
+        self._probe_in_flight = False
+        self._rejected = 0
+        self._opened = 0
+        self._lock = threading.Lock()
+
+    def before_request(self):
+        """
+        Autorise ou refuse une requête vers l'hôte.
+
+        Returns:
+            bool: True si la requête est la sonde du circuit semi-ouvert
+
+        Raises:
+            CircuitOpenError: Si le circuit est ouvert ou si une sonde est déjà en cours
+        """
+        with self._lock:
+            if self.state == CLOSED:
+                return False
+            if self.state == OPEN and time.monotonic() - self._opened_at >= self._current_open_duration:
+                self.state = HALF_OPEN
+            if self.state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                logger.info(f"Disjoncteur {self.name} semi-ouvert : envoi d'une requête de sonde")
+                return True
+            self._rejected += 1
+            retry_in = max(self._current_open_duration - (time.monotonic() - self._opened_at), 0)
+        raise CircuitOpenError(f"Disjoncteur ouvert pour {self.name} (nouvelle sonde dans {retry_in:.0f} s)")
+
+    def record(self, success, duration, timeout, probe=False):
+        """
+        Enregistre le résultat d'une requête autorisée.
+
+        Args:
+            success (bool): False pour une erreur réseau, un délai dépassé ou un code 5xx/429
+            duration (float): Durée de la requête en secondes
+            timeout (float): Délai d'attente de la requête, référence des requêtes lentes
+            probe (bool): True pour la requête de sonde (voir before_request)
+        """
+        slow = timeout is not None and duration > timeout * self.slow_call_fraction
+        with self._lock:
+            if probe:
+                self._probe_in_flight = False
+                if success:
+                    self._close()
+                else:
+                    self._open(min(self._current_open_duration * 2, self.max_open_duration))
+                return
+            # Requêtes envoyées avant l'ouverture du circuit : leur résultat est déjà pris en compte
+            if self.state != CLOSED:
+                return
+            self._calls.append((not success, slow))
+            if len(self._calls) < self.min_calls:
+                return
+            failure_rate = sum(1 for failed, _ in self._calls if failed) / len(self._calls)
+            slow_rate = sum(1 for _, is_slow in self._calls if is_slow) / len(self._calls)
+            if failure_rate >= self.failure_rate_threshold or slow_rate >= self.slow_call_rate_threshold:
+                logger.warning(f"Ouverture du disjoncteur {self.name} (erreurs {failure_rate:.0%}, "
+                               f"requêtes lentes {slow_rate:.0%})")
+                self._open(self.open_duration)
+
+    def _open(self, duration):
+        """Ouvre le circuit pour une durée donnée (verrou déjà acquis)."""
+        self.state = OPEN
+        self._opened_at = time.monotonic()
+        self._current_open_duration = duration
+        self._calls.clear()
+        self._opened += 1
+
+    def _close(self):
+        """Referme le circuit après une sonde réussie (verrou déjà acquis)."""
+        logger.info(f"Disjoncteur {self.name} refermé : hôte rétabli")
+        self.state = CLOSED
+        self._opened_at = None
+        self._current_open_duration = self.open_duration
+        self._calls.clear()
+
+    def stats(self):
+        """Retourne l'état du disjoncteur et ses statistiques."""
+        with self._lock:
+            calls = len(self._calls)
+            retry_in = None
+            if self.state != CLOSED:
+                retry_in = round(max(self._current_open_duration - (time.monotonic() - self._opened_at), 0), 1)
+            return {
+                "state": self.state,
+                "recent_calls": calls,
+                "failure_rate": round(sum(1 for failed, _ in self._calls if failed) / calls, 3) if calls else None,
+                "slow_rate": round(sum(1 for _, slow in self._calls if slow) / calls, 3) if calls else None,
+                "probe_in": retry_in,
+                "times_opened": self._opened,
+                "rejected": self._rejected
+            }
@@ -0,0 +1,219 @@
+"""
+Module de diffusion des mises à jour aux clients par Server-Sent Events (SSE).
+Les événements publiés par la boucle de rafraîchissement sont numérotés dans le journal
+du cache partagé ; chaque worker en garde les plus récents en mémoire et les distribue
+à ses abonnés, qui peuvent reprendre le flux après le dernier identifiant reçu (Last-Event-ID).
+"""
+
+from collections import deque
+import json
+import threading
+import time
+import logging
+
+# Configuration du logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def format_sse(data, event=None, event_id=None):
+    """
+    Formate un message SSE.
+
+    Args:
+        data (str): Données (JSON sur une seule ligne)
+        event (str, optional): Type d'événement
+        event_id (int, optional): Identifiant de l'événement
+
+    Returns:
+        str: Message terminé par une ligne vide
+    """
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    if event is not None:
+        lines.append(f"event: {event}")
+    lines.append(f"data: {data}")
+    return "\n".join(lines) + "\n\n"
+
+
+class EventBroker:
+    """Publication d'événements et distribution aux abonnés SSE d'un worker."""
+
+    def __init__(self, backend=None, history_size=256, poll_interval=1.0, max_subscribers=100):
+        """
+        Initialise le diffuseur.
+
+        Args:
+            backend (SQLiteCacheBackend, optional): Journal partagé entre les workers ;
+                sans journal, les événements ne sont diffusés que dans ce processus
+            history_size (int): Nombre d'événements gardés en mémoire pour la reprise
+            poll_interval (float): Intervalle en secondes de lecture du journal partagé
+            max_subscribers (int): Nombre maximal d'abonnés simultanés dans ce worker
+        """
+        self.backend = backend
+        self.history_size = history_size
+        self.poll_interval = poll_interval
+        self.max_subscribers = max_subscribers
+        self.subscribers = 0
+        self._events = deque(maxlen=history_size)  # (identifiant, type, données JSON)
+        self._latest = {}  # type -> dernier événement de ce type
+        self._last_id = 0
+        self._last_sync = 0.0
+        self._condition = threading.Condition()
+
+    @property
+    def last_id(self):
+        return self._last_id
+
+    def _deliver(self, items):
+        """Ajoute des événements au tampon et réveille les abonnés (verrou déjà acquis)."""
+        for item in items:
+            if item[0] <= self._last_id:
+                continue
+            self._events.append(item)
+            self._latest[item[1]] = item
+            self._last_id = item[0]
+        if items:
+            self._condition.notify_all()
+
+    def _sync(self, force=False):
+        """Lit les nouveaux événements du journal partagé (verrou déjà acquis)."""
+        if self.backend is None:
+            return
+        now = time.monotonic()
+        if not force and now - self._last_sync < self.poll_interval:
+            return
+        self._last_sync = now
+        while True:
+            rows = self.backend.events_after(self._last_id, self.history_size)
+            self._deliver([tuple(row) for row in rows])
+            if len(rows) < self.history_size:
+                break
+
+    def publish(self, event, data):
+        """
+        Publie un événement pour les abonnés de tous les workers.
+
+        Args:
+            event (str): Type d'événement (ex: "prediction")
+            data: Données sérialisables en JSON
+
+        Returns:
+            int: Identifiant de l'événement, ou None si le journal partagé est indisponible
+        """
+        payload = json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+        with self._condition:
+            if self.backend is None:
+                event_id = self._last_id + 1
+                self._deliver([(event_id, event, payload)])
+                return event_id
+            event_id = self.backend.append_event(event, payload, time.time(), keep=self.history_size * 4)
+            self._sync(force=True)
+            return event_id
+
+    def replay(self, after_id):
+        """
+        Retourne les événements postérieurs à un identifiant, pour la reprise d'un flux.
+
+        Args:
+            after_id (int): Dernier identifiant reçu par le client
+
+        Returns:
+            tuple: (événements, complet) ; complet vaut False si des événements ne sont plus disponibles
+        """
+        with self._condition:
+            self._sync(force=True)
+            if after_id > self._last_id:
+                # Identifiant inconnu (journal réinitialisé) : le client doit se resynchroniser
+                return [], False
+            if not self._events or after_id >= self._events[0][0] - 1:
+                return [item for item in self._events if item[0] > after_id], True
+
+        # Au-delà du tampon mémoire, relire le journal partagé
+        rows = self.backend.events_after(after_id, self.history_size * 4) if self.backend is not None else []
+        items = [tuple(row) for row in rows]
+        return items, bool(items) and items[0][0] == after_id + 1
+
+    def latest(self):
+        """Retourne le dernier événement de chaque type, dans l'ordre de publication."""
+        with self._condition:
+            self._sync()
+            return sorted(self._latest.values())
+
+    def wait(self, after_id, timeout):
+        """
+        Attend des événements postérieurs à un identifiant.
+
+        Args:
+            after_id (int): Dernier identifiant reçu
+            timeout (float): Attente maximale en secondes
+
+        Returns:
+            list: Événements reçus (vide à l'expiration du délai)
+        """
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while True:
+                self._sync()
+                if self._last_id > after_id:
+                    return [item for item in self._events if item[0] > after_id]
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return []
+                # Les abonnés se relaient pour lire le journal partagé à chaque intervalle
+                self._condition.wait(min(remaining, self.poll_interval) if self.backend is not None else remaining)
+
+    def try_subscribe(self):
+        """Réserve une place d'abonné ; retourne False si le worker a atteint sa limite."""
+        with self._condition:
+            if self.subscribers >= self.max_subscribers:
+                return False
+            self.subscribers += 1
+            return True
+
+    def unsubscribe(self):
+        """Libère la place d'un abonné (à la fermeture de sa réponse)."""
+        with self._condition:
+            self.subscribers = max(self.subscribers - 1, 0)
+
+    def stream(self, last_event_id=None, events=None, heartbeat=15, retry_ms=5000):
+        """
+        Génère le flux SSE d'un abonné.
+
+        Sans Last-Event-ID, le flux commence par le dernier événement de chaque type ; avec,
+        il reprend après cet identifiant, précédé d'un événement "resync" si des événements
+        ont été perdus entre-temps.
+
+        Args:
+            last_event_id (int, optional): Dernier identifiant reçu par le client
+            events (set, optional): Types d'événements transmis (tous par défaut)
+            heartbeat (float): Intervalle en secondes des commentaires de maintien de connexion
+            retry_ms (int): Délai de reconnexion conseillé au client
+
+        Yields:
+            str: Messages SSE
+        """
+        yield f"retry: {int(retry_ms)}\n\n"
+        if last_event_id is None:
+            backlog = self.latest()
+            cursor = self.last_id
+        else:
+            backlog, complete = self.replay(last_event_id)
+            cursor = max([last_event_id] + [item[0] for item in backlog])
+            if not complete:
+                # Le client doit relire l'état courant ; suivent les derniers événements connus
+                yield format_sse(json.dumps({"last_event_id": last_event_id}), event="resync")
+                backlog = self.latest()
+                cursor = max(cursor, self.last_id)
+
+        while True:
+            for event_id, event, data in backlog:
+                if events is None or event in events:
+                    yield format_sse(data, event=event, event_id=event_id)
+            backlog = self.wait(cursor, heartbeat)
+            if backlog:
+                cursor = backlog[-1][0]
+            else:
+                # Commentaire ignoré par les clients, qui maintient la connexion et détecte les déconnexions
+                yield ": heartbeat\n\n"
@@ -0,0 +1,330 @@
+"""
+Module de caractéristiques glissantes hydro-météorologiques.
+Pour chaque série (précipitations d'une station météo, débit d'une station hydrologique),
+des fenêtres de temps glissantes (24 h, 72 h) maintiennent cumul, maximum, moyenne et pente
+au fil des observations : chaque nouvelle observation met à jour les fenêtres en temps
+constant amorti, et leur lecture ne parcourt pas les données.
+"""
+
+from collections import OrderedDict, deque
+from datetime import datetime, timezone
+import math
+import threading
+import time
+import logging
+
+# Configuration du logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+MS_PER_HOUR = 3600 * 1000
+
+# Fenêtres glissantes par défaut (nom -> durée en heures)
+DEFAULT_WINDOWS = {"24h": 24, "72h": 72}
+
+
+class RollingWindow:
+    """
+    Fenêtre glissante sur une série temporelle, ancrée sur la dernière observation.
+
+    Le maximum est tenu par une file monotone décroissante ; le cumul et les sommes
+    de la régression linéaire (pente) sont mis à jour à l'entrée et à la sortie de chaque point.
+    """
+
+    def __init__(self, span_ms, origin):
+        """
+        Args:
+            span_ms (int): Durée de la fenêtre en millisecondes
+            origin (int): Horodatage de référence (ms) des sommes de la régression
+        """
+        self.span_ms = span_ms
+        self.origin = origin
+        self.points = deque()  # (horodatage, valeur) dans l'ordre chronologique
+        self._maxima = deque()  # (horodatage, valeur), valeurs décroissantes
+        self.sum = 0.0
+        self._sum_t = 0.0
+        self._sum_tt = 0.0
+        self._sum_tv = 0.0
+
+    def __len__(self):
+        return len(self.points)
+
+    def push(self, timestamp, value):
+        """Ajoute une observation postérieure à toutes celles de la fenêtre et retire les plus anciennes."""
+        t = (timestamp - self.origin) / MS_PER_HOUR
+        self.points.append((timestamp, value))
+        self.sum += value
+        self._sum_t += t
+        self._sum_tt += t * t
+        self._sum_tv += t * value
+        while self._maxima and self._maxima[-1][1] <= value:
+            self._maxima.pop()
+        self._maxima.append((timestamp, value))
+
+        # La fenêtre couvre ]dernière observation - durée, dernière observation]
+        start = timestamp - self.span_ms
+        while self.points[0][0] <= start:
+            old_timestamp, old_value = self.points.popleft()
+            t = (old_timestamp - self.origin) / MS_PER_HOUR
+            self.sum -= old_value
+            self._sum_t -= t
+            self._sum_tt -= t * t
+            self._sum_tv -= t * old_value
+        while self._maxima[0][0] <= start:
+            self._maxima.popleft()
+
+    def rebuild(self, points):
+        """
+        Reconstruit la fenêtre à partir d'observations triées (correction ou observation tardive).
+
+        Args:
+            points (list): Paires (horodatage, valeur) triées ; seules les plus récentes sont conservées
+        """
+        self.points.clear()
+        self._maxima.clear()
+        self.sum = self._sum_t = self._sum_tt = self._sum_tv = 0.0
+        if points:
+            # Repartir d'une origine proche réinitialise aussi l'erreur d'arrondi accumulée
+            self.origin = points[-1][0]
+        for timestamp, value in points:
+            self.push(timestamp, value)
+
+    @property
+    def maximum(self):
+        return self._maxima[0][1] if self._maxima else None
+
+    @property
+    def slope(self):
+        """Pente de la régression linéaire des valeurs sur le temps, en unités par heure."""
+        n = len(self.points)
+        if n < 2:
+            return None
+        denominator = n * self._sum_tt - self._sum_t * self._sum_t
+        if denominator <= 1e-9:
+            return None
+        return (n * self._sum_tv - self._sum_t * self.sum) / denominator
+
+    def summary(self):
+        """Retourne les caractéristiques de la fenêtre."""
+        n = len(self.points)
+        slope = self.slope
+        return {
+            "count": n,
+            "sum": round(self.sum, 3) if n else None,
+            "max": self.maximum,
+            "mean": round(self.sum / n, 3) if n else None,
+            "slope_per_hour": round(slope, 4) if slope is not None else None
+        }
+
+
+class RollingSeries:
+    """Série observée au fil de l'eau, avec ses fenêtres glissantes."""
+
+    def __init__(self, windows=DEFAULT_WINDOWS):
+        """
+        Args:
+            windows (dict): Nom de fenêtre -> durée en heures
+        """
+        self.spans = {name: int(hours * MS_PER_HOUR) for name, hours in windows.items()}
+        self.windows = None  # Créées à la première observation
+        self.latest = None  # (horodatage, valeur) de la dernière observation
+        self._summary = None  # Caractéristiques mémorisées jusqu'à la prochaine modification
+
+    def observe(self, points):
+        """
+        Intègre des observations à la série.
+
+        Les observations postérieures à la dernière connue sont ajoutées incrémentalement ;
+        les observations tardives (ou corrigées) encore couvertes par une fenêtre entraînent
+        une seule reconstruction des fenêtres ; les plus anciennes sont ignorées.
+
+        Args:
+            points (iterable): Paires (horodatage en ms, valeur) ; les valeurs manquantes sont ignorées
+
+        Returns:
+            int: Nombre d'observations prises en compte
+        """
+        # Une seule valeur par horodatage (la dernière reçue)
+        points = sorted({int(t): float(v) for t, v in points
+                         if t is not None and v is not None and not math.isnan(float(v))}.items())
+        if not points:
+            return 0
+
+        if self.windows is None:
+            self.windows = {name: RollingWindow(span, points[0][0]) for name, span in self.spans.items()}
+
+        latest = self.latest[0] if self.latest is not None else None
+        fresh = [p for p in points if latest is None or p[0] > latest]
+        late = [p for p in points if latest is not None and p[0] <= latest]
+
+        accepted = 0
+        if late:
+            # Fusion avec les points de la plus grande fenêtre, les nouvelles valeurs remplaçant les anciennes
+            widest = max(self.windows.values(), key=lambda w: w.span_ms)
+            horizon = latest - widest.span_ms
+            merged = dict(widest.points)
+            for timestamp, value in late:
+                if timestamp > horizon and merged.get(timestamp) != value:
+                    merged[timestamp] = value
+                    accepted += 1
+            if accepted:
+                ordered = sorted(merged.items())
+                for window in self.windows.values():
+                    window.rebuild(ordered)
+                self.latest = ordered[-1]
+
+        for timestamp, value in fresh:
+            for window in self.windows.values():
+                window.push(timestamp, value)
+            self.latest = (timestamp, value)
+            accepted += 1
+
+        if accepted:
+            self._summary = None
+        return accepted
+
+    def summary(self):
+        """
+        Retourne la dernière observation et les caractéristiques de chaque fenêtre.
+
+        Returns:
+            dict: {"latest": {...}, "windows": {nom: {...}}}, ou None si la série est vide
+        """
+        if self.latest is None:
+            return None
+        if self._summary is None:
+            timestamp, value = self.latest
+            self._summary = {
+                "latest": {
+                    "timestamp": timestamp,
+                    "datetime": datetime.fromtimestamp(timestamp / 1000, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+                    "value": value
+                },
+                "windows": {name: window.summary() for name, window in self.windows.items()}
+            }
+        return self._summary
+
+
+class FeatureStore:
+    """Séries glissantes par clé (type de mesure, station), partagées par les prédictions."""
+
+    def __init__(self, windows=DEFAULT_WINDOWS, maxsize=256, seed_retry=60, max_seed_retry=3600):
+        """
+        Args:
+            windows (dict): Nom de fenêtre -> durée en heures
+            maxsize (int): Nombre maximal de séries conservées
+            seed_retry (float): Délai avant une nouvelle tentative d'amorçage après un échec (secondes)
+            max_seed_retry (float): Délai maximal entre deux tentatives, doublé à chaque échec
+        """
+        self.windows = windows
+        self.maxsize = maxsize
+        self.seed_retry = seed_retry
+        self.max_seed_retry = max_seed_retry
+        self._series = OrderedDict()  # clé -> RollingSeries
+        self._sources = {}  # (clé, source) -> dernière donnée observée
+        self._seed_failures = {}  # (clé, source) -> (échecs consécutifs, prochaine tentative sur l'horloge monotone)
+        self._lock = threading.Lock()
+
+    def _get_series(self, key):
+        """Retourne la série d'une clé, créée si nécessaire (verrou déjà acquis)."""
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = RollingSeries(self.windows)
+            while len(self._series) > self.maxsize:
+                evicted, _ = self._series.popitem(last=False)
+                self._sources = {k: v for k, v in self._sources.items() if k[0] != evicted}
+                self._seed_failures = {k: v for k, v in self._seed_failures.items() if k[0] != evicted}
+        self._series.move_to_end(key)
+        return series
+
+    def observe(self, key, points):
+        """
+        Intègre des observations à la série d'une clé.
+
+        Args:
+            key (tuple): Identifiant de la série (ex: ("discharge", subid, y))
+            points (iterable): Paires (horodatage en ms, valeur)
+
+        Returns:
+            int: Nombre d'observations prises en compte
+        """
+        with self._lock:
+            return self._get_series(key).observe(points)
+
+    def observe_source(self, key, source, data, extract):
+        """
+        Intègre les observations d'une donnée, sauf si cette même donnée a déjà été observée.
+
+        Les données servies par le cache sont partagées et jamais modifiées : leur identité
+        suffit à éviter de les parcourir à chaque lecture.
+
+        Args:
+            key (tuple): Identifiant de la série
+            source (str): Nom de la source (ex: "current", "history")
+            data: Donnée en cache dont les observations sont extraites
+            extract (callable): Fonction retournant les paires (horodatage en ms, valeur) de la donnée
+
+        Returns:
+            int: Nombre d'observations prises en compte
+        """
+        with self._lock:
+            if self._sources.get((key, source)) is data:
+                return 0
+        points = list(extract(data))
+        with self._lock:
+            self._sources[(key, source)] = data
+            return self._get_series(key).observe(points)
+
+    def observed(self, key, source):
+        """Indique si une donnée d'une source a déjà été observée pour une clé."""
+        with self._lock:
+            return (key, source) in self._sources
+
+    def seed(self, key, source, load):
+        """
+        Amorce la série d'une clé par une source, si elle ne l'a pas encore été.
+
+        Un échec est mémorisé : la source n'est sollicitée de nouveau qu'après un délai doublé
+        à chaque échec consécutif, au lieu de l'être à chaque prédiction.
+
+        Args:
+            key (tuple): Identifiant de la série
+            source (str): Nom de la source d'amorçage (ex: "history")
+            load (callable): Fonction sans argument qui observe la source (via observe_source)
+                et retourne False en cas d'échec
+
+        Returns:
+            bool: True si la série est amorcée par cette source
+        """
+        with self._lock:
+            if (key, source) in self._sources:
+                return True
+            failure = self._seed_failures.get((key, source))
+            if failure is not None and time.monotonic() < failure[1]:
+                return False
+
+        success = bool(load())
+        with self._lock:
+            if success:
+                self._seed_failures.pop((key, source), None)
+            else:
+                failures = (self._seed_failures.get((key, source), (0, 0))[0]) + 1
+                delay = min(self.max_seed_retry, self.seed_retry * 2 ** (failures - 1))
+                self._seed_failures[(key, source)] = (failures, time.monotonic() + delay)
+                logger.warning(f"Échec de l'amorçage de la série {key} par {source} ({failures} consécutif(s)), "
+                               f"nouvelle tentative dans {delay:.0f} s")
+        return success
+
+    def features(self, key):
+        """
+        Retourne les caractéristiques glissantes d'une série.
+
+        Args:
+            key (tuple): Identifiant de la série
+
+        Returns:
+            dict: Dernière observation et caractéristiques par fenêtre, ou None si la série est vide
+        """
+        with self._lock:
+            series = self._series.get(key)
+            return series.summary() if series is not None else None
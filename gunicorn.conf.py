@@ -0,0 +1,27 @@
+"""
+Configuration gunicorn du backend de prédiction des inondations.
+Chaque worker démarre la boucle de rafraîchissement ; un seul, élu par verrou de fichier,
+interroge réellement les APIs et les autres lisent ses résultats dans le cache partagé.
+"""
+
+import os
+
+bind = f"{os.environ.get('HOST', '0.0.0.0')}:{os.environ.get('PORT', '5000')}"
+workers = int(os.environ.get("WEB_CONCURRENCY", 2))
+threads = int(os.environ.get("GUNICORN_THREADS", 4))
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "gthread")
+timeout = 60
+
+# Chaque abonné au flux SSE occupe un thread du worker pendant toute sa connexion. Avec les workers
+# à threads, le nombre d'abonnés par worker est plafonné au quart des threads pour que les routes de
+# l'API gardent des threads libres (1 abonné avec 4 threads, aucun en dessous de 4). Un worker
+# asynchrone (GUNICORN_WORKER_CLASS=gevent) sert de nombreux abonnés sans cette limite.
+ASYNC_WORKER_CLASSES = ("gevent", "eventlet")
+if worker_class not in ASYNC_WORKER_CLASSES:
+    os.environ.setdefault("SSE_MAX_SUBSCRIBERS", str(threads // 4 if worker_class == "gthread" else 0))
+
+
+def post_worker_init(worker):
+    """Démarre le thread de rafraîchissement une fois l'application chargée dans le worker."""
+    from app import start_refresh_thread
+    start_refresh_thread()
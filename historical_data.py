@@ -0,0 +1,275 @@
+"""
+Module d'accès aux séries historiques fournies dans data/ (débits de Wayen et de Gonsé,
+hauteurs d'eau des barrages 2 et 3, inondations EM-DAT).
+Les fichiers Excel sont convertis une seule fois en colonnes NumPy (.npy), identifiées par
+l'empreinte du fichier source ; les lectures suivantes projettent ces colonnes en mémoire
+(mmap) sans copie ni analyse du classeur. Comme l'instantané de l'ontologie, le cache n'est relu
+que dans un répertoire réservé à l'utilisateur courant.
+"""
+
+import numpy as np
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import argparse
+import logging
+from shared_cache import private_directory
+
+# Configuration du logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Incrémenter si la conversion des classeurs change
+CACHE_FORMAT_VERSION = 1
+
+DEFAULT_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+DEFAULT_CACHE_DIR = os.environ.get(
+    "HISTORICAL_CACHE_DIR", os.path.join(tempfile.gettempdir(), "bf-flood-prediction", "historical")
+)
+
+# Jeux de données : fichier source et colonnes retenues (colonne du classeur -> (nom, type))
+# Les dates sont stockées en datetime64[D], les textes en chaînes de largeur fixe
+DATASETS = {
+    "wayen_discharge": {
+        "file": "Nakanbe_Wayen_Debit_hydrométrique_filtré.xlsx",
+        "description": "Débit journalier du Nakanbé à Wayen (m³/s)",
+        "columns": {"Date": ("date", "datetime64[D]"), "Debit_m3/s": ("value", "float64")}
+    },
+    "gonse_discharge": {
+        "file": "Massili_Gonse_Debit_hydrométrique_filtré.xlsx",
+        "description": "Débit journalier du Massili à Gonsé (m³/s)",
+        "columns": {"Date": ("date", "datetime64[D]"), "Qjr_m3/s": ("value", "float64")}
+    },
+    "dam_level": {
+        "file": "Hauteur_eau_barrage_2_et_3_Ouaga_filtré.xlsx",
+        "description": "Cote journalière des barrages 2 et 3 de Ouagadougou (cm)",
+        "columns": {"Date": ("date", "datetime64[D]"), "Cote_cm": ("value", "float64")}
+    },
+    "emdat_events": {
+        "file": "emdat_flood_burkina_filtered.xlsx",
+        "description": "Inondations recensées au Burkina Faso (EM-DAT)",
+        "columns": {
+            "DisNo.": ("id", "str"),
+            "Location": ("location", "str"),
+            "start_date": ("start_date", "datetime64[D]"),
+            "end_date": ("end_date", "datetime64[D]"),
+            "duration_days": ("duration_days", "float64"),
+            "Total Deaths": ("total_deaths", "float64"),
+            "Total Affected": ("total_affected", "float64"),
+            "is_ouagadougou": ("is_ouagadougou", "bool")
+        }
+    }
+}
+
+
+class Dataset:
+    """Jeu de données historique en colonnes (tableaux NumPy projetés en mémoire, en lecture seule)."""
+
+    def __init__(self, name, columns, source_digest):
+        """
+        Args:
+            name (str): Nom du jeu de données
+            columns (dict): Nom de colonne -> tableau NumPy
+            source_digest (str): Empreinte du fichier source
+        """
+        self.name = name
+        self.columns = columns
+        self.source_digest = source_digest
+
+    def __getitem__(self, column):
+        return self.columns[column]
+
+    def __len__(self):
+        return len(next(iter(self.columns.values()))) if self.columns else 0
+
+    def between(self, start=None, end=None, column="date"):
+        """
+        Retourne les lignes dont la date est comprise entre deux bornes incluses (vues sans copie).
+
+        Les séries journalières sont triées par date à la conversion.
+
+        Args:
+            start (str ou np.datetime64, optional): Date de début
+            end (str ou np.datetime64, optional): Date de fin
+            column (str): Colonne de date utilisée
+
+        Returns:
+            dict: Nom de colonne -> vue sur le tableau
+        """
+        dates = self.columns[column]
+        lo = 0 if start is None else np.searchsorted(dates, np.datetime64(start, "D"), side="left")
+        hi = len(dates) if end is None else np.searchsorted(dates, np.datetime64(end, "D"), side="right")
+        return {name: values[lo:hi] for name, values in self.columns.items()}
+
+
+def file_digest(path):
+    """Calcule l'empreinte SHA-256 d'un fichier source et de la version du format."""
+    sha = hashlib.sha256(f"{CACHE_FORMAT_VERSION}".encode())
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def convert_workbook(path, spec):
+    """
+    Lit un classeur Excel et le convertit en colonnes NumPy typées.
+
+    Args:
+        path (str): Chemin du classeur
+        spec (dict): Description du jeu de données (voir DATASETS)
+
+    Returns:
+        dict: Nom de colonne -> tableau NumPy
+    """
+    import pandas as pd  # Uniquement nécessaire à la conversion
+
+    frame = pd.read_excel(path, usecols=list(spec["columns"]))
+    if "date" in {name for name, _ in spec["columns"].values()}:
+        date_source = next(src for src, (name, _) in spec["columns"].items() if name == "date")
+        frame = frame.dropna(subset=[date_source]).sort_values(date_source, kind="stable")
+
+    columns = {}
+    for source, (name, dtype) in spec["columns"].items():
+        series = frame[source]
+        if dtype == "datetime64[D]":
+            columns[name] = pd.to_datetime(series).to_numpy().astype("datetime64[D]")
+        elif dtype == "str":
+            columns[name] = series.fillna("").astype(str).to_numpy().astype(np.str_)
+        elif dtype == "bool":
+            columns[name] = series.fillna(False).astype(bool).to_numpy()
+        else:
+            columns[name] = pd.to_numeric(series, errors="coerce").to_numpy(dtype=np.float64)
+    return columns
+
+
+class HistoricalDataStore:
+    """Accès aux jeux de données historiques via un cache de colonnes .npy projetées en mémoire."""
+
+    def __init__(self, data_dir=DEFAULT_DATA_DIR, cache_dir=DEFAULT_CACHE_DIR):
+        """
+        Initialise le magasin de données historiques.
+
+        Args:
+            data_dir (str): Répertoire des classeurs Excel
+            cache_dir (str): Répertoire du cache de colonnes
+        """
+        self.data_dir = data_dir
+        self.cache_dir = cache_dir
+        self._cache_dir_checked = False
+        self._datasets = {}  # nom -> (signature du fichier source, Dataset)
+        self._lock = threading.Lock()
+
+    def _cache_path(self, name, digest):
+        return os.path.join(self.cache_dir, f"{name}-{digest[:16]}")
+
+    def _check_cache_dir(self):
+        """Crée le répertoire du cache en mode 0700, ou le remplace par un répertoire privé s'il ne l'est pas."""
+        if not self._cache_dir_checked:
+            self.cache_dir = private_directory(self.cache_dir, prefix="bf-flood-historical-")
+            self._cache_dir_checked = True
+
+    def ingest(self, name, force=False):
+        """
+        Convertit un classeur en colonnes .npy si le cache correspondant à son empreinte est absent.
+
+        Args:
+            name (str): Nom du jeu de données (clé de DATASETS)
+            force (bool): Reconvertit même si le cache existe
+
+        Returns:
+            str: Répertoire du cache de ce jeu de données
+
+        Raises:
+            KeyError: Si le jeu de données est inconnu
+            OSError: Si le classeur est introuvable
+        """
+        spec = DATASETS[name]
+        source = os.path.join(self.data_dir, spec["file"])
+        digest = file_digest(source)
+        self._check_cache_dir()
+        path = self._cache_path(name, digest)
+        if os.path.exists(os.path.join(path, "manifest.json")) and not force:
+            return path
+
+        logger.info(f"Conversion de {spec['file']} en colonnes NumPy...")
+        columns = convert_workbook(source, spec)
+
+        # Écriture dans un répertoire temporaire puis renommage, pour ne jamais exposer un cache partiel
+        tmp_path = tempfile.mkdtemp(prefix=f".{name}-", dir=self.cache_dir)
+        for column, values in columns.items():
+            np.save(os.path.join(tmp_path, f"{column}.npy"), values, allow_pickle=False)
+        with open(os.path.join(tmp_path, "manifest.json"), 'w', encoding='utf-8') as f:
+            json.dump({"name": name, "source": spec["file"], "digest": digest,
+                       "rows": len(next(iter(columns.values()))), "columns": list(columns)}, f)
+
+        if os.path.exists(path):
+            shutil.rmtree(path, ignore_errors=True)
+        try:
+            os.replace(tmp_path, path)
+        except OSError:
+            # Un autre processus a publié le même cache entre-temps
+            shutil.rmtree(tmp_path, ignore_errors=True)
+
+        # Supprimer les caches des versions précédentes du classeur
+        for entry in os.listdir(self.cache_dir):
+            if entry.startswith(f"{name}-") and os.path.join(self.cache_dir, entry) != path:
+                shutil.rmtree(os.path.join(self.cache_dir, entry), ignore_errors=True)
+        return path
+
+    def load(self, name):
+        """
+        Retourne un jeu de données dont les colonnes sont projetées en mémoire.
+
+        Le classeur est converti au premier appel si nécessaire ; les appels suivants
+        réutilisent les mêmes tableaux tant que le fichier source ne change pas.
+
+        Args:
+            name (str): Nom du jeu de données (clé de DATASETS)
+
+        Returns:
+            Dataset: Colonnes en lecture seule
+        """
+        source = os.path.join(self.data_dir, DATASETS[name]["file"])
+        stat = os.stat(source)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            # Le fichier n'est rehaché que si sa date de modification ou sa taille a changé
+            entry = self._datasets.get(name)
+            if entry is not None and entry[0] == signature:
+                return entry[1]
+
+            path = self.ingest(name)
+            with open(os.path.join(path, "manifest.json"), 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            columns = {column: np.load(os.path.join(path, f"{column}.npy"), mmap_mode='r', allow_pickle=False)
+                       for column in manifest["columns"]}
+            dataset = Dataset(name, columns, manifest["digest"])
+            self._datasets[name] = (signature, dataset)
+            return dataset
+
+
+def main():
+    """Convertit les classeurs de data/ en colonnes NumPy (étape d'ingestion)."""
+    parser = argparse.ArgumentParser(description="Conversion des séries historiques Excel en colonnes NumPy")
+    parser.add_argument("datasets", nargs="*", help=f"Jeux de données parmi {', '.join(DATASETS)} (tous par défaut)")
+    parser.add_argument("--data-dir", default=DEFAULT_DATA_DIR, help="Répertoire des classeurs Excel")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="Répertoire du cache de colonnes")
+    parser.add_argument("--force", action="store_true", help="Reconvertir même si le cache est à jour")
+    args = parser.parse_args()
+    unknown = [name for name in args.datasets if name not in DATASETS]
+    if unknown:
+        parser.error(f"Jeux de données inconnus: {', '.join(unknown)}")
+
+    store = HistoricalDataStore(args.data_dir, args.cache_dir)
+    for name in args.datasets or DATASETS:
+        path = store.ingest(name, force=args.force)
+        dataset = store.load(name)
+        print(f"{name}: {len(dataset)} lignes -> {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Module de mise en cache HTTP des réponses JSON.
+Chaque donnée servie reçoit un ETag calculé sur son contenu ; les requêtes conditionnelles
+(If-None-Match) reçoivent un 304 sans nouvelle sérialisation, et les réponses volumineuses
+sont compressées (brotli si disponible, sinon gzip).
+"""
+
+from flask import Response, request, json
+from collections import OrderedDict
+import hashlib
+import gzip
+import threading
+import logging
+
+try:
+    import brotli
+except ImportError:  # Compression brotli optionnelle
+    brotli = None
+
+# Configuration du logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+class JSONResponseCache:
+    """Sérialisation mémorisée, ETags et compression des réponses JSON."""
+
+    def __init__(self, maxsize=256, min_compress_size=1024, compress_level=6):
+        """
+        Initialise le cache de réponses.
+
+        Args:
+            maxsize (int): Nombre maximal de données dont la sérialisation est mémorisée
+            min_compress_size (int): Taille minimale en octets d'une réponse compressée
+            compress_level (int): Niveau de compression gzip (1 à 9)
+        """
+        self.maxsize = maxsize
+        self.min_compress_size = min_compress_size
+        self.compress_level = compress_level
+        self._encoded = OrderedDict()  # id(donnée) -> (donnée, etag, json)
+        self._compressed = OrderedDict()  # (etag, encodage) -> corps compressé
+        self._lock = threading.Lock()
+
+    def _remember(self, entries, key, value):
+        """Enregistre une entrée mémorisée avec éviction LRU (verrou déjà acquis)."""
+        entries[key] = value
+        entries.move_to_end(key)
+        while len(entries) > self.maxsize:
+            entries.popitem(last=False)
+
+    def encode(self, data):
+        """
+        Sérialise une donnée et calcule son ETag, une seule fois par objet.
+
+        Les données en cache sont partagées et jamais modifiées : l'identité de l'objet
+        suffit à retrouver sa sérialisation.
+
+        Args:
+            data: Donnée sérialisable en JSON
+
+        Returns:
+            tuple: (ETag, JSON en octets)
+        """
+        with self._lock:
+            entry = self._encoded.get(id(data))
+            if entry is not None and entry[0] is data:
+                self._encoded.move_to_end(id(data))
+                return entry[1], entry[2]
+
+        body = json.dumps(data, separators=(",", ":")).encode("utf-8")
+        etag = hashlib.sha256(body).hexdigest()[:32]
+        with self._lock:
+            self._remember(self._encoded, id(data), (data, etag, body))
+        return etag, body
+
+    def _negotiate_encoding(self):
+        """Retourne l'encodage de compression accepté par le client, ou None."""
+        accepted = request.accept_encodings
+        if brotli is not None and accepted["br"]:
+            return "br"
+        if accepted["gzip"]:
+            return "gzip"
+        return None
+
+    def _compress(self, body, encoding):
+        if encoding == "br":
+            return brotli.compress(body, quality=5)
+        return gzip.compress(body, compresslevel=self.compress_level)
+
+    def respond(self, data, envelope=None, max_age=0):
+        """
+        Construit la réponse HTTP d'une donnée, ou un 304 si le client en a déjà la version courante.
+
+        L'ETag porte sur la donnée seule, l'enveloppe (statut, horodatage, âge du cache)
+        variant à chaque requête ; il est donc faible (W/).
+
+        Args:
+            data: Donnée sérialisable en JSON
+            envelope (dict, optional): Champs entourant la donnée, placée sous la clé "data"
+            max_age (int): Durée de validité côté client en secondes (Cache-Control)
+
+        Returns:
+            Response: Réponse Flask
+        """
+        etag, data_body = self.encode(data)
+        headers = {
+            "ETag": f'W/"{etag}"',
+            "Cache-Control": f"public, max-age={max(int(max_age), 0)}",
+            "Vary": "Accept-Encoding"
+        }
+
+        if request.if_none_match.contains_weak(etag):
+            return Response(status=304, headers=headers)
+
+        if envelope is None:
+            body = data_body
+        else:
+            # L'enveloppe est sérialisée à part pour réutiliser le JSON mémorisé de la donnée
+            parts = [f"{json.dumps(k)}:{json.dumps(v, separators=(',', ':'))}" for k, v in envelope.items()]
+            parts.append('"data":' + data_body.decode("utf-8"))
+            body = ("{" + ",".join(parts) + "}").encode("utf-8")
+
+        encoding = self._negotiate_encoding() if len(body) >= self.min_compress_size else None
+        if encoding is not None:
+            # Sans enveloppe, le corps compressé ne dépend que de la donnée et peut être réutilisé
+            key = (etag, encoding)
+            compressed = None
+            if envelope is None:
+                with self._lock:
+                    compressed = self._compressed.get(key)
+            if compressed is None:
+                compressed = self._compress(body, encoding)
+                if envelope is None:
+                    with self._lock:
+                        self._remember(self._compressed, key, compressed)
+            body = compressed
+            headers["Content-Encoding"] = encoding
+
+        return Response(body, status=200, mimetype="application/json", headers=headers)
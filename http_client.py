@@ -0,0 +1,134 @@
+"""
+Module fournissant la configuration des connexions aux APIs externes (WIGOS, Open-Meteo, FANFAR)
+et le client HTTP synchrone qui l'applique.
+La configuration (taille des pools, tentatives, temporisation, délais d'attente par hôte, en-têtes)
+est commune aux deux backends du client asynchrone (voir async_ingestion) : aiohttp s'il est
+installé, sinon ce client synchrone exécuté dans un pool de threads. Les sessions requests et leurs
+pools de connexions ne sont donc créés que sur ce chemin de repli.
+"""
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from urllib.parse import urlsplit
+import threading
+import logging
+
+# Configuration du logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Codes HTTP transitoires pour lesquels une nouvelle tentative est effectuée
+RETRY_STATUS_CODES = (429, 502, 503, 504)
+
+# En-têtes envoyés à toutes les APIs externes
+DEFAULT_HEADERS = {"Accept-Encoding": "gzip, deflate", "Accept": "application/json"}
+
+
+class UpstreamConnectionConfig:
+    """Paramètres de connexion aux APIs externes, partagés par les backends aiohttp et requests."""
+
+    def __init__(self, pool_size=10, retries=2, backoff_factor=0.5, default_timeout=10, timeouts=None):
+        """
+        Initialise la configuration des connexions.
+
+        Args:
+            pool_size (int): Nombre maximal de connexions conservées par hôte
+            retries (int): Nombre de nouvelles tentatives sur erreur de connexion ou code transitoire
+            backoff_factor (float): Facteur de temporisation exponentielle entre les tentatives
+            default_timeout (float): Délai d'attente par défaut en secondes
+            timeouts (dict, optional): Délai d'attente par hôte (ex: {"api.open-meteo.com": 10})
+        """
+        self.pool_size = pool_size
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.default_timeout = default_timeout
+        self.timeouts = timeouts or {}
+        self.headers = dict(DEFAULT_HEADERS)
+
+    def timeout_for(self, url):
+        """Retourne le délai d'attente configuré pour l'hôte d'une URL."""
+        return self.timeouts.get(urlsplit(url).hostname, self.default_timeout)
+
+
+class UpstreamHTTPClient:
+    """Client HTTP synchrone avec une session à connexions persistantes par hôte."""
+
+    def __init__(self, config):
+        """
+        Initialise le client HTTP.
+
+        Args:
+            config (UpstreamConnectionConfig): Paramètres de connexion
+        """
+        self.config = config
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def _create_session(self):
+        """Crée une session avec pool de connexions et politique de nouvelles tentatives."""
+        # Les délais de lecture ne sont pas retentés pour ne pas multiplier l'attente sur un hôte lent
+        retry = Retry(
+            total=self.config.retries,
+            connect=self.config.retries,
+            read=0,
+            status=self.config.retries,
+            backoff_factor=self.config.backoff_factor,
+            status_forcelist=RETRY_STATUS_CODES,
+            allowed_methods=frozenset(["GET"]),
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.config.pool_size, max_retries=retry)
+
+        session = requests.Session()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers.update(self.config.headers)
+        return session
+
+    def session_for(self, url):
+        """
+        Retourne la session associée à l'hôte d'une URL, en la créant au besoin.
+
+        Args:
+            url (str): URL de la requête
+
+        Returns:
+            requests.Session: Session dédiée à cet hôte
+        """
+        host = urlsplit(url).netloc
+        session = self._sessions.get(host)
+        if session is None:
+            with self._lock:
+                session = self._sessions.get(host)
+                if session is None:
+                    logger.info(f"Création d'un pool de connexions HTTP pour {host} (taille {self.config.pool_size})")
+                    session = self._create_session()
+                    self._sessions[host] = session
+        return session
+
+    def get(self, url, params=None, timeout=None):
+        """
+        Effectue une requête GET via la session de l'hôte.
+
+        Args:
+            url (str): URL de la requête
+            params (dict, optional): Paramètres de la requête
+            timeout (float, optional): Délai d'attente ; par défaut celui de l'hôte
+
+        Returns:
+            requests.Response: Réponse HTTP
+
+        Raises:
+            requests.exceptions.RequestException: En cas d'échec de la requête
+        """
+        if timeout is None:
+            timeout = self.config.timeout_for(url)
+        return self.session_for(url).get(url, params=params, timeout=timeout)
+
+    def close(self):
+        """Ferme toutes les sessions et leurs connexions."""
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
@@ -0,0 +1,220 @@
+"""
+Module de raisonnement OWL-RL incrémental.
+Les nouveaux triplets (observations d'une prédiction, conclusions des règles SWRL) sont
+raisonnés contre une ontologie de base déjà fermée : seules leurs conséquences sont dérivées,
+sans refaire la fermeture complète du graphe.
+"""
+
+from rdflib import Graph, Literal, RDF, RDFS, OWL
+from collections import defaultdict, deque
+from swrl_engine import FactIndex
+import logging
+
+# Configuration du logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+class IncrementalReasoner:
+    """
+    Dérive les conséquences OWL-RL d'un ensemble de triplets ajoutés à une base fermée.
+
+    Le schéma (hiérarchies, domaines, portées, propriétés inverses, symétriques et transitives,
+    restrictions owl:hasValue) est lu une fois dans la base. Les règles appliquées aux nouveaux
+    triplets sont cax-sco, prp-dom, prp-rng, prp-spo1, prp-inv, prp-symp, prp-trp, cls-hv1/2,
+    eq-sym et eq-rep. Les ajouts au schéma lui-même demandent une fermeture complète.
+    """
+
+    def __init__(self, base):
+        """
+        Initialise le raisonneur à partir de la base.
+
+        Args:
+            base (Graph): Ontologie déjà fermée par le raisonnement OWL-RL
+        """
+        self.base = base
+        self.superclasses = defaultdict(set)
+        self.superproperties = defaultdict(set)
+        self.domains = defaultdict(set)
+        self.ranges = defaultdict(set)
+        self.inverses = defaultdict(set)
+        self.symmetric = set()
+        self.transitive = set()
+        self.has_value = defaultdict(set)  # classe -> {(propriété, valeur)}
+        self.value_restrictions = defaultdict(set)  # (propriété, valeur) -> {classe}
+        self.same_as = defaultdict(set)
+        self._load_schema()
+
+    def _load_schema(self):
+        """Indexe les axiomes de la base utilisés par les règles incrémentales."""
+        base = self.base
+        # La base est fermée : les hiérarchies sont déjà transitives
+        for sub, sup in base.subject_objects(RDFS.subClassOf):
+            if sub != sup and not isinstance(sup, Literal):
+                self.superclasses[sub].add(sup)
+        for sub, sup in base.subject_objects(RDFS.subPropertyOf):
+            if sub != sup:
+                self.superproperties[sub].add(sup)
+        for prop, cls in base.subject_objects(RDFS.domain):
+            self.domains[prop].add(cls)
+        for prop, cls in base.subject_objects(RDFS.range):
+            self.ranges[prop].add(cls)
+        for p1, p2 in base.subject_objects(OWL.inverseOf):
+            self.inverses[p1].add(p2)
+            self.inverses[p2].add(p1)
+        self.symmetric.update(base.subjects(RDF.type, OWL.SymmetricProperty))
+        self.transitive.update(base.subjects(RDF.type, OWL.TransitiveProperty))
+
+        for restriction, value in base.subject_objects(OWL.hasValue):
+            for prop in base.objects(restriction, OWL.onProperty):
+                self.has_value[restriction].add((prop, value))
+                self.value_restrictions[(prop, value)].add(restriction)
+
+        for x, y in base.subject_objects(OWL.sameAs):
+            if x != y:
+                self.same_as[x].add(y)
+                self.same_as[y].add(x)
+
+    def _known(self, triple, graph):
+        """Indique si un triplet est déjà présent dans la base ou dans le graphe courant."""
+        return triple in self.base or triple in graph
+
+    def _objects(self, subject, predicate, graph):
+        yield from self.base.objects(subject, predicate)
+        yield from graph.objects(subject, predicate)
+
+    def _subjects(self, predicate, obj, graph):
+        yield from self.base.subjects(predicate, obj)
+        yield from graph.subjects(predicate, obj)
+
+    def _triples(self, pattern, graph):
+        yield from self.base.triples(pattern)
+        yield from graph.triples(pattern)
+
+    def _consequences(self, triple, graph):
+        """Applique les règles OWL-RL dont ce triplet est une prémisse."""
+        s, p, o = triple
+
+        if p == RDF.type:
+            # cax-sco
+            for sup in self.superclasses.get(o, ()):
+                yield (s, RDF.type, sup)
+            # cls-hv1
+            for prop, value in self.has_value.get(o, ()):
+                yield (s, prop, value)
+        else:
+            # prp-spo1
+            for sup in self.superproperties.get(p, ()):
+                yield (s, sup, o)
+            # prp-dom / prp-rng
+            for cls in self.domains.get(p, ()):
+                yield (s, RDF.type, cls)
+            if not isinstance(o, Literal):
+                for cls in self.ranges.get(p, ()):
+                    yield (o, RDF.type, cls)
+                # prp-inv
+                for inv in self.inverses.get(p, ()):
+                    yield (o, inv, s)
+                # prp-symp
+                if p in self.symmetric:
+                    yield (o, p, s)
+            # prp-trp, dans les deux sens de jointure
+            if p in self.transitive:
+                for y in list(self._objects(o, p, graph)):
+                    yield (s, p, y)
+                for x in list(self._subjects(p, s, graph)):
+                    yield (x, p, o)
+            # cls-hv2
+            for cls in self.value_restrictions.get((p, o), ()):
+                yield (s, RDF.type, cls)
+
+        if p == OWL.sameAs:
+            # eq-sym et eq-rep pour la nouvelle égalité
+            yield (o, OWL.sameAs, s)
+            for alias in list(self.same_as.get(s, ())) + [s]:
+                for t in list(self._triples((alias, None, None), graph)):
+                    yield (o, t[1], t[2])
+                for t in list(self._triples((None, None, alias), graph)):
+                    yield (t[0], t[1], o)
+        else:
+            # eq-rep-s / eq-rep-o pour les individus déjà déclarés identiques dans la base
+            for alias in self.same_as.get(s, ()):
+                yield (alias, p, o)
+            for alias in self.same_as.get(o, ()):
+                yield (s, p, alias)
+
+    def derive(self, delta, graph=None):
+        """
+        Calcule les conséquences d'un ensemble de triplets ajoutés.
+
+        Les triplets de delta et leurs conséquences sont ajoutés à graph. Une superposition laisse la base
+        intacte ; passer la base elle-même comme graph la complète sur place.
+
+        Args:
+            delta (iterable): Triplets nouvellement assertés
+            graph (Graph, optional): Graphe recevant les ajouts (superposition) ; un graphe vide par défaut
+
+        Returns:
+            list: Triplets dérivés absents de la base et de graph avant l'appel, hors delta
+        """
+        if graph is None:
+            graph = Graph()
+
+        queue = deque()
+        asserted = set()
+        for triple in delta:
+            asserted.add(triple)
+            if not self._known(triple, graph):
+                queue.append(triple)
+            graph.add(triple)
+
+        derived = []
+        while queue:
+            triple = queue.popleft()
+            for new in self._consequences(triple, graph):
+                if isinstance(new[0], Literal) or self._known(new, graph):
+                    continue
+                graph.add(new)
+                queue.append(new)
+                if new not in asserted:
+                    derived.append(new)
+        return derived
+
+
+def materialize_rules(graph, rule_engine, reasoner, facts=None):
+    """
+    Ajoute à un graphe fermé les conclusions des règles SWRL et leurs conséquences OWL-RL.
+
+    Les règles sont réappliquées tant que le raisonnement incrémental produit de nouveaux faits.
+
+    Args:
+        graph (Graph): Graphe fermé, complété sur place
+        rule_engine (SWRLRuleEngine): Moteur de règles SWRL
+        reasoner (IncrementalReasoner): Raisonneur adossé à ce graphe
+        facts (FactIndex, optional): Index des faits du graphe, tenu à jour ; construit au besoin
+
+    Returns:
+        list: Déclenchements distincts des règles
+    """
+    if facts is None:
+        facts = FactIndex.from_graph(graph)
+
+    derivations = []
+    fired = set()
+    while True:
+        delta = []
+        for derivation in rule_engine.run(facts):
+            key = (derivation["rule_id"], frozenset(derivation["bindings"].items()))
+            if key in fired:
+                continue
+            fired.add(key)
+            derivations.append(derivation)
+            delta.extend(t for t in derivation["triples"] if t not in graph)
+        if not delta:
+            return derivations
+
+        derived = reasoner.derive(delta, graph)
+        for triple in derived:
+            facts.add(*triple)
+        if not derived:
+            return derivations
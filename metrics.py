@@ -0,0 +1,248 @@
+"""
+Module de métriques au format d'exposition texte de Prometheus.
+Les compteurs et histogrammes sont mis à jour en mémoire (une recherche dichotomique et une addition
+sous verrou par observation) ; les valeurs déjà tenues ailleurs (statistiques des caches, taille des
+graphes) sont lues par des fonctions de collecte au moment de l'export seulement.
+Chaque processus (worker gunicorn) expose ses propres métriques.
+"""
+
+from bisect import bisect_left
+import threading
+import time
+
+# Type MIME du format d'exposition texte
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Bornes par défaut des histogrammes de durée (secondes)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra is not None:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    """Métrique à étiquettes : une valeur (enfant) par combinaison de valeurs d'étiquettes."""
+
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values):
+        """
+        Retourne l'enfant d'une combinaison de valeurs d'étiquettes, créé au besoin.
+
+        Args:
+            *values: Valeurs des étiquettes, dans l'ordre de labelnames (converties en texte à l'export)
+
+        Raises:
+            ValueError: Si le nombre de valeurs ne correspond pas aux étiquettes
+        """
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name}: {len(self.labelnames)} étiquette(s) attendue(s)")
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def _samples(self):
+        """Retourne les lignes d'échantillons de la métrique."""
+        raise NotImplementedError
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return lines
+
+    def _sorted_children(self):
+        """Enfants triés par valeurs d'étiquettes, pour un export stable."""
+        with self._lock:
+            children = list(self._children.items())
+        return sorted(children, key=lambda item: tuple(str(v) for v in item[0]))
+
+
+class _CounterChild:
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+
+class Counter(_Metric):
+    """Compteur croissant (le nom se termine par _total)."""
+
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount=1):
+        """Incrémente le compteur sans étiquette."""
+        self.labels().inc(amount)
+
+    def _samples(self):
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(child.value)}"
+                for key, child in self._sorted_children()]
+
+
+class _HistogramChild:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # dernier intervalle : au-delà de la plus grande borne
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+    def time(self):
+        """Gestionnaire de contexte observant la durée du bloc."""
+        return _Timer(self)
+
+    def snapshot(self):
+        with self._lock:
+            return list(self.counts), self.sum
+
+
+class _Timer:
+    def __init__(self, child):
+        self.child = child
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.child.observe(time.perf_counter() - self.start)
+        return False
+
+
+class Histogram(_Metric):
+    """Histogramme à intervalles cumulés (_bucket, _sum, _count)."""
+
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value):
+        """Enregistre une observation sans étiquette."""
+        self.labels().observe(value)
+
+    def time(self):
+        """Gestionnaire de contexte observant la durée du bloc (sans étiquette)."""
+        return self.labels().time()
+
+    def _samples(self):
+        lines = []
+        for key, child in self._sorted_children():
+            counts, total = child.snapshot()
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, ("le", _format_value(float(bound))))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class CallbackMetric(_Metric):
+    """Métrique lue au moment de l'export par une fonction de collecte."""
+
+    def __init__(self, name, documentation, kind, labelnames, collect):
+        """
+        Args:
+            kind (str): Type Prometheus ("gauge" ou "counter")
+            collect (callable): Fonction retournant des paires (valeurs d'étiquettes, valeur)
+        """
+        super().__init__(name, documentation, labelnames)
+        self.kind = kind
+        self.collect = collect
+
+    def _samples(self):
+        return [f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(value)}"
+                for values, value in self.collect() if value is not None]
+
+
+class MetricsRegistry:
+    """Ensemble des métriques d'un processus, exportées dans l'ordre d'enregistrement."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            # Un module rechargé retrouve sa métrique au lieu d'en créer une seconde
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+                    raise ValueError(f"Métrique déjà enregistrée avec une autre définition: {metric.name}")
+                if isinstance(existing, CallbackMetric):
+                    existing.collect = metric.collect
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def callback(self, name, documentation, kind, labelnames, collect):
+        return self._register(CallbackMetric(name, documentation, kind, labelnames, collect))
+
+    def render(self):
+        """
+        Exporte toutes les métriques au format texte de Prometheus.
+
+        Returns:
+            str: Texte d'exposition (CONTENT_TYPE)
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Registre par défaut, partagé par les modules instrumentés
+registry = MetricsRegistry()
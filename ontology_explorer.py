@@ -5,13 +5,14 @@ Ce module fournit des fonctions pour extraire des informations de l'ontologie et
 
 from rdflib import Graph, Namespace, URIRef, Literal, RDF, RDFS, OWL
 from rdflib.namespace import XSD
-import owlrl
 import os
 import json
 import re
 import logging
 from datetime import datetime
 from inference_explainer import InferenceExplainer
+from swrl_engine import SWRLRuleEngine
+from ontology_snapshot import OntologySnapshot, build_closed_graph
 
 # Configuration du logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -20,23 +21,31 @@ logger = logging.getLogger(__name__)
 # Namespace de l'ontologie des inondations
 FLOOD_NS = Namespace("http://www.semanticweb.org/ontologies/2025/ouagadougou-flood-prediction#")
 
+# Nombre de variantes de la visualisation (paramètres de taille) conservées en mémoire
+VISUALIZATION_CACHE_SIZE = 32
+
 class OntologyExplorer:
     """Classe pour explorer l'ontologie des inondations à Ouagadougou."""
     
-    def __init__(self, ontology_path, swrl_rules_path):
+    def __init__(self, ontology_path, swrl_rules_path, snapshot_dir=None):
         """
         Initialise l'explorateur d'ontologie.
         
         Args:
             ontology_path (str): Chemin vers le fichier d'ontologie OWL
             swrl_rules_path (str): Chemin vers le fichier de règles SWRL
+            snapshot_dir (str, optional): Répertoire des instantanés du graphe fermé
         """
         self.ontology_path = ontology_path
         self.swrl_rules_path = swrl_rules_path
+        self.snapshot = OntologySnapshot(ontology_path, swrl_rules_path, snapshot_dir) if snapshot_dir else None
         self.graph = None
+        self.index = None
+        self.payloads = None
         self.rules = None
         self.last_loaded = None
         self.inference_explainer = None
+        self.rule_engine = SWRLRuleEngine(swrl_rules_path)
     
     def load_ontology(self, force_reload=False):
         """
@@ -50,17 +59,26 @@ class OntologyExplorer:
         """
         if self.graph is not None and not force_reload:
             return True
+        
+        # Les règles et leurs explications sont relues avec l'ontologie
+        if force_reload:
+            self.rules = None
             
         try:
             start_time = datetime.now()
             logger.info(f"Chargement de l'ontologie depuis {self.ontology_path}...")
             
-            self.graph = Graph()
-            self.graph.parse(self.ontology_path, format="xml")
+            # Le graphe fermé (raisonnement OWL et règles SWRL) est relu depuis l'instantané
+            # tant que l'ontologie et les règles n'ont pas changé
+            if self.snapshot is not None:
+                graph = self.snapshot.load()
+            else:
+                logger.info("Application du raisonnement OWL...")
+                graph = build_closed_graph(self.ontology_path, self.swrl_rules_path)
             
-            # Appliquer le raisonnement OWL pour inférer des connaissances supplémentaires
-            logger.info("Application du raisonnement OWL...")
-            owlrl.DeductiveClosure(owlrl.OWLRL_Semantics).expand(self.graph)
+            # Réponses précalculées, publiées avant le graphe
+            self._build_payloads(graph)
+            self.graph = graph
             
             end_time = datetime.now()
             load_duration = (end_time - start_time).total_seconds()
@@ -99,19 +117,28 @@ class OntologyExplorer:
                     # La première ligne est la description
                     description = lines[0].strip()
                     
-                    # Les lignes suivantes jusqu'à la ligne vide constituent la règle
+                    # Les commentaires "# Explication:" qui suivent l'en-tête donnent l'explication,
+                    # les lignes suivantes jusqu'à la ligne vide constituent la règle
+                    explanation = []
                     rule_text = []
                     for line in lines[1:]:
-                        if line.strip():
-                            rule_text.append(line.strip())
-                        else:
+                        line = line.strip()
+                        if line.startswith('#'):
+                            comment = line.lstrip('#').strip()
+                            if comment.startswith("Explication:"):
+                                explanation.append(comment[len("Explication:"):].strip())
+                            elif explanation and not rule_text:
+                                explanation.append(comment)
+                        elif line:
+                            rule_text.append(line)
+                        elif rule_text:
                             break
                     
                     rule = {
                         "id": i,
                         "description": description,
                         "rule": " ".join(rule_text),
-                        "explanation": self.explain_rule(i, description, " ".join(rule_text))
+                        "explanation": self.explain_rule(i, description, " ".join(explanation))
                     }
                     rules.append(rule)
             
@@ -122,44 +149,19 @@ class OntologyExplorer:
             logger.error(f"Erreur lors du chargement des règles SWRL: {str(e)}")
             return []
     
-    def explain_rule(self, rule_id, description, rule_text):
+    def explain_rule(self, rule_id, description, explanation):
         """
-        Génère une explication détaillée d'une règle SWRL.
+        Retourne l'explication d'une règle SWRL, écrite sous son en-tête dans le fichier de règles.
         
         Args:
             rule_id (int): Identifiant de la règle
             description (str): Description de la règle
-            rule_text (str): Texte de la règle
+            explanation (str): Texte des lignes "# Explication:" de la règle (vide si absentes)
             
         Returns:
-            str: Explication détaillée de la règle
-        """
-        # Générer des explications en fonction du type de règle
-        if rule_id == 1:
-            return ("Cette règle identifie un risque élevé d'inondation lorsque des précipitations importantes (>30mm) "
-                    "coïncident avec des niveaux d'eau élevés (>2.5m) dans la même zone géographique. "
-                    "Les fortes pluies combinées à des niveaux d'eau déjà élevés sont un indicateur fiable de risque imminent d'inondation.")
-        elif rule_id == 2:
-            return ("Cette règle attribue un risque modéré aux zones protégées par des barrages dont la capacité dépasse 85%. "
-                    "Quand un barrage approche de sa capacité maximale, il peut être nécessaire de procéder à des lâchers d'eau, "
-                    "ce qui augmente le risque d'inondation dans les zones en aval.")
-        elif rule_id == 3:
-            return ("Cette règle identifie les zones à haut risque d'inondation en fonction de leurs caractéristiques géographiques. "
-                    "Les zones avec une faible pente (<1°) et des sols hydromorphes (qui retiennent l'eau) sont particulièrement "
-                    "vulnérables même avec des précipitations modérées (>15mm).")
-        elif rule_id == 4:
-            return ("Cette règle spécifique surveille le débit de la rivière Massili à la station de Gonse. "
-                    "Lorsque le débit dépasse 10m³/s, un risque modéré est attribué aux zones situées en aval de cette station, "
-                    "car l'eau mettra un certain temps à atteindre ces zones.")
-        elif rule_id == 5:
-            return ("Cette règle déclenche une alerte précoce pour la ville de Ouagadougou lorsque le débit du Nakanbé "
-                    "à la station de Wayen dépasse 50m³/s. La rivière Nakanbé est l'un des principaux cours d'eau "
-                    "influençant le régime hydrologique de la région de Ouagadougou.")
-        elif rule_id == 6:
-            return ("Cette règle classifie automatiquement comme inondables toutes les zones dont l'altitude est inférieure à 290m. "
-                    "Ces zones basses sont naturellement plus susceptibles de recevoir et d'accumuler l'eau en cas de précipitations importantes.")
-        else:
-            return f"Règle {rule_id}: {description}"
+            str: Explication de la règle, ou sa description à défaut
+        """
+        return explanation or f"Règle {rule_id}: {description}"
     
     def get_classes(self):
         """
@@ -170,24 +172,7 @@ class OntologyExplorer:
         """
         if not self.load_ontology():
             return []
-            
-        classes = []
-        for cls in self.graph.subjects(RDF.type, OWL.Class):
-            if isinstance(cls, URIRef) and cls.startswith(FLOOD_NS):
-                class_info = {
-                    "uri": str(cls),
-                    "name": str(cls).split('#')[-1],
-                    "label": self._get_label(cls),
-                    "comment": self._get_comment(cls),
-                    "subClassOf": [str(parent) for parent in self.graph.objects(cls, RDFS.subClassOf) 
-                                  if isinstance(parent, URIRef)],
-                    "individuals_count": len(list(self.graph.subjects(RDF.type, cls)))
-                }
-                classes.append(class_info)
-        
-        # Trier par nom
-        classes.sort(key=lambda x: x["name"])
-        return classes
+        return self.payloads["classes"]
     
     def get_object_properties(self):
         """
@@ -198,27 +183,7 @@ class OntologyExplorer:
         """
         if not self.load_ontology():
             return []
-            
-        properties = []
-        for prop in self.graph.subjects(RDF.type, OWL.ObjectProperty):
-            if isinstance(prop, URIRef) and prop.startswith(FLOOD_NS):
-                domains = [str(d) for d in self.graph.objects(prop, RDFS.domain) if isinstance(d, URIRef)]
-                ranges = [str(r) for r in self.graph.objects(prop, RDFS.range) if isinstance(r, URIRef)]
-                
-                prop_info = {
-                    "uri": str(prop),
-                    "name": str(prop).split('#')[-1],
-                    "label": self._get_label(prop),
-                    "comment": self._get_comment(prop),
-                    "domain": domains,
-                    "range": ranges,
-                    "usage_count": len(list(self.graph.subject_objects(prop)))
-                }
-                properties.append(prop_info)
-        
-        # Trier par nom
-        properties.sort(key=lambda x: x["name"])
-        return properties
+        return self.payloads["object_properties"]
     
     def get_data_properties(self):
         """
@@ -229,27 +194,7 @@ class OntologyExplorer:
         """
         if not self.load_ontology():
             return []
-            
-        properties = []
-        for prop in self.graph.subjects(RDF.type, OWL.DatatypeProperty):
-            if isinstance(prop, URIRef) and prop.startswith(FLOOD_NS):
-                domains = [str(d) for d in self.graph.objects(prop, RDFS.domain) if isinstance(d, URIRef)]
-                ranges = [str(r) for r in self.graph.objects(prop, RDFS.range) if isinstance(r, URIRef)]
-                
-                prop_info = {
-                    "uri": str(prop),
-                    "name": str(prop).split('#')[-1],
-                    "label": self._get_label(prop),
-                    "comment": self._get_comment(prop),
-                    "domain": domains,
-                    "range": ranges,
-                    "usage_count": len(list(self.graph.subject_objects(prop)))
-                }
-                properties.append(prop_info)
-        
-        # Trier par nom
-        properties.sort(key=lambda x: x["name"])
-        return properties
+        return self.payloads["data_properties"]
     
     def get_individuals(self, class_uri=None):
         """
@@ -263,27 +208,10 @@ class OntologyExplorer:
         """
         if not self.load_ontology():
             return []
-            
-        individuals = []
         
         if class_uri:
-            # Filtrer par classe spécifique
-            class_ref = URIRef(class_uri)
-            for indiv in self.graph.subjects(RDF.type, class_ref):
-                if isinstance(indiv, URIRef) and indiv.startswith(FLOOD_NS):
-                    indiv_info = self._get_individual_info(indiv)
-                    individuals.append(indiv_info)
-        else:
-            # Tous les individus, en excluant les classes
-            for indiv in self.graph.subjects(RDF.type, None):
-                if (isinstance(indiv, URIRef) and indiv.startswith(FLOOD_NS) and 
-                    (indiv, RDF.type, OWL.Class) not in self.graph):
-                    indiv_info = self._get_individual_info(indiv)
-                    individuals.append(indiv_info)
-        
-        # Trier par nom
-        individuals.sort(key=lambda x: x["name"])
-        return individuals
+            return self.payloads["individuals_by_type"].get(class_uri, [])
+        return self.payloads["individuals"]
     
     def get_inferred_knowledge(self):
         """
@@ -294,56 +222,7 @@ class OntologyExplorer:
         """
         if not self.load_ontology():
             return {"error": "Impossible de charger l'ontologie"}
-        
-        # Exemples de types de connaissances inférées à rechercher
-        inferred_flood_risks = []
-        inferred_flood_prone = []
-        inferred_early_warnings = []
-        
-        # Rechercher les triplets inférés liés aux risques d'inondation
-        for subj, pred, obj in self.graph.triples((None, FLOOD_NS.hasFloodRisk, None)):
-            if isinstance(subj, URIRef) and isinstance(obj, URIRef):
-                risk_info = {
-                    "area": str(subj).split('#')[-1],
-                    "risk_level": str(obj).split('#')[-1]
-                }
-                inferred_flood_risks.append(risk_info)
-        
-        # Rechercher les zones classifiées comme inondables
-        for subj, pred, obj in self.graph.triples((None, FLOOD_NS.isFloodProne, Literal(True))):
-            if isinstance(subj, URIRef):
-                area_info = {
-                    "area": str(subj).split('#')[-1]
-                }
-                inferred_flood_prone.append(area_info)
-        
-        # Rechercher les alertes précoces
-        for subj, pred, obj in self.graph.triples((None, FLOOD_NS.hasEarlyWarningStatus, None)):
-            if isinstance(subj, URIRef) and isinstance(obj, URIRef):
-                alert_info = {
-                    "entity": str(subj).split('#')[-1],
-                    "status": str(obj).split('#')[-1]
-                }
-                inferred_early_warnings.append(alert_info)
-        
-        # Construire le résultat
-        result = {
-            "flood_risks": {
-                "count": len(inferred_flood_risks),
-                "examples": inferred_flood_risks[:10]  # Limiter à 10 exemples
-            },
-            "flood_prone_areas": {
-                "count": len(inferred_flood_prone),
-                "examples": inferred_flood_prone[:10]
-            },
-            "early_warnings": {
-                "count": len(inferred_early_warnings),
-                "examples": inferred_early_warnings[:10]
-            },
-            "total_inferences": len(inferred_flood_risks) + len(inferred_flood_prone) + len(inferred_early_warnings)
-        }
-        
-        return result
+        return self.payloads["inferred"]
     
     def get_ontology_statistics(self):
         """
@@ -355,33 +234,12 @@ class OntologyExplorer:
         if not self.load_ontology():
             return {"error": "Impossible de charger l'ontologie"}
         
-        # Compter les différents éléments de l'ontologie
-        class_count = len(list(self.graph.subjects(RDF.type, OWL.Class)))
-        obj_prop_count = len(list(self.graph.subjects(RDF.type, OWL.ObjectProperty)))
-        data_prop_count = len(list(self.graph.subjects(RDF.type, OWL.DatatypeProperty)))
-        individual_count = len(list(self.graph.subjects(RDF.type, OWL.NamedIndividual)))
-        
-        # Compter les assertions
-        obj_prop_assertions = 0
-        data_prop_assertions = 0
-        
-        for s, p, o in self.graph:
-            if p != RDF.type and isinstance(p, URIRef):
-                if isinstance(o, URIRef):
-                    obj_prop_assertions += 1
-                elif isinstance(o, Literal):
-                    data_prop_assertions += 1
-        
-        return {
-            "classes": class_count,
-            "object_properties": obj_prop_count,
-            "data_properties": data_prop_count,
-            "individuals": individual_count,
-            "object_property_assertions": obj_prop_assertions,
-            "data_property_assertions": data_prop_assertions,
-            "total_triples": len(self.graph),
-            "last_loaded": self.last_loaded.strftime("%Y-%m-%d %H:%M:%S") if self.last_loaded else None
-        }
+        statistics = self.payloads.get("statistics_response")
+        if statistics is None:
+            statistics = dict(self.payloads["statistics"])
+            statistics["last_loaded"] = self.last_loaded.strftime("%Y-%m-%d %H:%M:%S") if self.last_loaded else None
+            self.payloads["statistics_response"] = statistics
+        return statistics
         
     def get_inference_explanation(self, zone_name, inferred_property):
         """
@@ -401,10 +259,8 @@ class OntologyExplorer:
         if self.inference_explainer is None:
             self.inference_explainer = InferenceExplainer(self)
         
-        # Appliquer les règles d'inférence pour s'assurer que toutes les inférences sont disponibles
-        self._apply_rules()
-        
-        # Obtenir l'explication
+        # Les conclusions des règles sont matérialisées dans le graphe au chargement (ou dans
+        # l'instantané) : l'explication n'est qu'une lecture du graphe partagé
         return self.inference_explainer.explain_inference(zone_name, inferred_property)
     
     def get_ontology_description(self):
@@ -416,246 +272,441 @@ class OntologyExplorer:
         """
         if not self.load_ontology():
             return {"error": "Impossible de charger l'ontologie"}
+        return self.payloads["description"]
         
-        # Récupérer les informations de l'ontologie elle-même
-        ontology_uri = None
-        for s, p, o in self.graph.triples((None, RDF.type, OWL.Ontology)):
-            if isinstance(s, URIRef):
-                ontology_uri = s
-                break
-        
-        if not ontology_uri:
-            return {"error": "Informations sur l'ontologie non trouvées"}
-        
-        # Récupérer les métadonnées
-        title = self._get_label(ontology_uri) or "Ontologie des inondations à Ouagadougou"
-        description = self._get_comment(ontology_uri) or "Cette ontologie modélise les connaissances relatives aux inondations à Ouagadougou, Burkina Faso."
-        
-        # Description détaillée de l'ontologie
-        details = (
-            "Cette ontologie a été développée pour le système de prédiction des inondations à Ouagadougou. "
-            "Elle modélise les connaissances sur les facteurs contribuant aux inondations, incluant les données "
-            "météorologiques, hydrologiques et géographiques. L'ontologie permet d'intégrer ces informations "
-            "et d'appliquer un raisonnement sémantique pour évaluer les risques d'inondation dans différentes "
-            "zones de la ville et ses environs.\n\n"
-            
-            "Les principaux concepts modélisés comprennent:\n"
-            "- Les entités géographiques (quartiers, zones à risque, cours d'eau)\n"
-            "- Les phénomènes météorologiques (précipitations, humidité)\n"
-            "- Les données hydrologiques (débits, niveaux d'eau)\n"
-            "- Les infrastructures hydrauliques (barrages, stations de mesure)\n"
-            "- Les niveaux de risque et les alertes d'inondation\n\n"
-            
-            "Cette ontologie est enrichie par un ensemble de règles SWRL qui permettent d'inférer "
-            "automatiquement les niveaux de risque d'inondation en fonction des données disponibles."
-        )
-        
-        return {
-            "uri": str(ontology_uri),
-            "title": title,
-            "description": description,
-            "details": details,
-            "version": "1.0",
-            "created": "2025-05-24"
-        }
-        
-    def get_ontology_visualization_data(self):
+    def get_ontology_visualization_data(self, max_individuals=30, depth=1, classes=None):
         """
         Génère des données pour visualiser l'ontologie sous forme de graphe interactif.
         Inclut les classes, propriétés, individus et leurs relations.
         
+        Args:
+            max_individuals (int): Nombre maximal d'individus affichés
+            depth (int): Voisinage conservé autour des classes filtrées (sous-classes, super-classes
+                et classes reliées par une propriété d'objet), en nombre de sauts
+            classes (list, optional): Noms ou URIs des classes à afficher ; toutes par défaut
+            
         Returns:
             dict: Données pour la visualisation (nœuds et liens)
         """
         if not self.load_ontology():
             return {"error": "Impossible de charger l'ontologie"}
         
-        nodes = []
-        links = []
-        node_ids = {}  # Pour éviter les doublons
-        
-        # Calculer l'importance des classes (pour la taille des nœuds)
-        class_importance = {}
-        for cls in self.graph.subjects(RDF.type, OWL.Class):
-            if isinstance(cls, URIRef) and cls.startswith(FLOOD_NS):
-                # Compter les sous-classes et les individus
-                subclass_count = len(list(self.graph.subjects(RDFS.subClassOf, cls)))
-                instances_count = len(list(self.graph.subjects(RDF.type, cls)))
-                prop_count = len(list(self.graph.subjects(RDFS.domain, cls))) + len(list(self.graph.subjects(RDFS.range, cls)))
-                
-                # Calculer un score d'importance
-                class_importance[cls] = 1 + (subclass_count * 0.5) + (instances_count * 0.3) + (prop_count * 0.2)
-        
-        # Ajouter les classes comme nœuds
-        for cls in self.graph.subjects(RDF.type, OWL.Class):
-            if isinstance(cls, URIRef) and cls.startswith(FLOOD_NS):
-                class_name = str(cls).split('#')[-1]
-                node_id = f"class_{class_name}"
-                
-                if node_id not in node_ids:
-                    # Récupérer les informations supplémentaires
-                    label = self._get_label(cls) or class_name
-                    comment = self._get_comment(cls) or f"Classe {class_name}"
-                    
-                    # Déterminer l'importance (pour la taille visuelle)
-                    importance = class_importance.get(cls, 1)
-                    
-                    nodes.append({
-                        "id": node_id,
-                        "name": class_name,
-                        "label": label,
-                        "description": comment,
-                        "type": "class",
-                        "value": importance  # Pour la taille du nœud
-                    })
-                    node_ids[node_id] = True
+        # La clé ne retient que les paramètres effectifs : une profondeur au-delà de la dernière classe
+        # atteinte ou un nombre d'individus au-delà de ceux de l'ontologie ne crée pas de nouvelle variante
+        base = self._visualization_base()
+        selected, depth = self._select_classes(base, classes, depth)
+        max_individuals = min(max(max_individuals, 0), len(base["individual_order"]))
+        key = (max_individuals, depth if classes else None, tuple(sorted(classes)) if classes else None)
+        cache = self.payloads["visualization"]
+        data = cache.get(key)
+        if data is None:
+            data = self._build_visualization(max_individuals, selected, bool(classes))
+            # Borner le nombre de variantes conservées
+            if len(cache) >= VISUALIZATION_CACHE_SIZE:
+                cache.pop(next(iter(cache)))
+            cache[key] = data
+        return data
+    
+    def _visualization_base(self):
+        """
+        Construit une fois par chargement les nœuds et les cartes d'adjacence de la visualisation.
         
-        # Ajouter les propriétés d'objet comme nœuds
-        for prop in self.graph.subjects(RDF.type, OWL.ObjectProperty):
-            if isinstance(prop, URIRef) and prop.startswith(FLOOD_NS):
-                prop_name = str(prop).split('#')[-1]
-                node_id = f"prop_{prop_name}"
-                
-                if node_id not in node_ids:
-                    # Récupérer les informations supplémentaires
-                    label = self._get_label(prop) or prop_name
-                    comment = self._get_comment(prop) or f"Propriété d'objet {prop_name}"
-                    
-                    nodes.append({
-                        "id": node_id,
-                        "name": prop_name,
-                        "label": label,
-                        "description": comment,
-                        "type": "property",
-                        "value": 0.7  # Taille plus petite que les classes
-                    })
-                    node_ids[node_id] = True
+        Returns:
+            dict: Nœuds des classes, propriétés et individus, et relations entre eux
+        """
+        base = self.payloads.get("visualization_base")
+        if base is not None:
+            return base
+        
+        graph = self.graph
+        index = self.index
+        types = index["types"]
+        class_set = set(index["classes"])
+        prop_set = set(index["object_properties"])
+        
+        subclass_of = {cls: [parent for parent in graph.objects(cls, RDFS.subClassOf)
+                             if parent in class_set and parent != cls]
+                       for cls in class_set}
+        domains = {prop: [d for d in graph.objects(prop, RDFS.domain) if d in class_set] for prop in prop_set}
+        ranges = {prop: [r for r in graph.objects(prop, RDFS.range) if r in class_set] for prop in prop_set}
+        
+        # Importance des classes (pour la taille des nœuds)
+        subclass_counts = {}
+        for parents in subclass_of.values():
+            for parent in parents:
+                subclass_counts[parent] = subclass_counts.get(parent, 0) + 1
+        prop_counts = {}
+        for mapping in (domains, ranges):
+            for classes_of_prop in mapping.values():
+                for cls in classes_of_prop:
+                    prop_counts[cls] = prop_counts.get(cls, 0) + 1
+        
+        class_nodes = {}
+        for cls in class_set:
+            class_name = str(cls).split('#')[-1]
+            class_nodes[cls] = {
+                "id": f"class_{class_name}",
+                "name": class_name,
+                "label": self._get_label(cls) or class_name,
+                "description": self._get_comment(cls) or f"Classe {class_name}",
+                "type": "class",
+                "value": (1 + subclass_counts.get(cls, 0) * 0.5
+                          + len(index["instances"].get(cls, [])) * 0.3
+                          + prop_counts.get(cls, 0) * 0.2)  # Pour la taille du nœud
+            }
+        
+        prop_nodes = {}
+        for prop in prop_set:
+            prop_name = str(prop).split('#')[-1]
+            prop_nodes[prop] = {
+                "id": f"prop_{prop_name}",
+                "name": prop_name,
+                "label": self._get_label(prop) or prop_name,
+                "description": self._get_comment(prop) or f"Propriété d'objet {prop_name}",
+                "type": "property",
+                "value": 0.7  # Taille plus petite que les classes
+            }
+        
+        # Individus ayant au moins un type de l'ontologie, avec leurs relations vers d'autres individus
+        named_individuals = set(index["instances"].get(OWL.NamedIndividual, []))
+        individual_types = {}
+        individual_nodes = {}
+        for indiv in named_individuals:
+            if not (isinstance(indiv, URIRef) and indiv.startswith(FLOOD_NS)):
+                continue
+            indiv_types = [t for t in types.get(indiv, ()) if t in class_set]
+            if not indiv_types:
+                continue
+            indiv_name = str(indiv).split('#')[-1]
+            individual_types[indiv] = indiv_types
+            individual_nodes[indiv] = {
+                "id": f"indiv_{indiv_name}",
+                "name": indiv_name,
+                "label": self._get_label(indiv) or indiv_name,
+                "description": self._get_comment(indiv) or f"Individu {indiv_name}",
+                "type": "individual",
+                "value": 0.5  # Plus petit que les classes et propriétés
+            }
+        
+        assertions = {}
+        for s, p, o in index["flood_links"]:
+            if p in prop_set and s in individual_nodes and o in individual_nodes:
+                assertions.setdefault(s, []).append((p, o))
+        
+        # Voisinage des classes : hiérarchie dans les deux sens et propriétés d'objet
+        neighbours = {cls: set() for cls in class_set}
+        for cls, parents in subclass_of.items():
+            for parent in parents:
+                neighbours[cls].add(parent)
+                neighbours[parent].add(cls)
+        for prop in prop_set:
+            for d in domains[prop]:
+                for r in ranges[prop]:
+                    neighbours[d].add(r)
+                    neighbours[r].add(d)
+        
+        base = {
+            "class_nodes": class_nodes,
+            "prop_nodes": prop_nodes,
+            "individual_nodes": individual_nodes,
+            "individual_order": sorted(individual_nodes, key=lambda x: individual_nodes[x]["name"]),
+            "individual_types": individual_types,
+            "subclass_of": subclass_of,
+            "domains": domains,
+            "ranges": ranges,
+            "assertions": assertions,
+            "neighbours": neighbours
+        }
+        self.payloads["visualization_base"] = base
+        return base
+    
+    @staticmethod
+    def _select_classes(base, classes, depth):
+        """
+        Sélectionne les classes filtrées et leur voisinage.
+        
+        Args:
+            base (dict): Données de base de la visualisation (voir _visualization_base)
+            classes (list): Noms ou URIs des classes filtrées ; toutes les classes si vide
+            depth (int): Nombre de sauts demandé
+        
+        Returns:
+            tuple: (classes sélectionnées, nombre de sauts ayant ajouté des classes)
+        """
+        class_nodes = base["class_nodes"]
+        if not classes:
+            return set(class_nodes), 0
+        wanted = set(classes)
+        frontier = {cls for cls, node in class_nodes.items() if node["name"] in wanted or str(cls) in wanted}
+        selected = set(frontier)
+        hops = 0
+        # Le voisinage cesse de croître dès qu'un saut n'ajoute plus de classe
+        while frontier and hops < depth:
+            frontier = {n for cls in frontier for n in base["neighbours"][cls]} - selected
+            if not frontier:
+                break
+            selected |= frontier
+            hops += 1
+        return selected, hops
+    
+    def _build_visualization(self, max_individuals, selected, filtered):
+        """Construit les nœuds et liens de la visualisation pour les classes sélectionnées."""
+        base = self._visualization_base()
+        class_nodes = base["class_nodes"]
+        
+        if filtered:
+            props = [prop for prop in base["prop_nodes"]
+                     if any(c in selected for c in base["domains"][prop] + base["ranges"][prop])]
+        else:
+            props = list(base["prop_nodes"])
+        
+        nodes = [class_nodes[cls] for cls in sorted(selected, key=lambda c: class_nodes[c]["name"])]
+        nodes.extend(base["prop_nodes"][prop] for prop in sorted(props, key=lambda p: base["prop_nodes"][p]["name"]))
+        prop_set = set(props)
+        links = []
         
         # Ajouter un sous-ensemble d'individus (limiter pour éviter une surcharge visuelle)
-        individuals_added = 0
-        max_individuals = 30  # Limiter le nombre d'individus pour éviter un graphe trop dense
+        individuals = []
+        for indiv in base["individual_order"]:
+            if len(individuals) >= max_individuals:
+                break
+            indiv_types = [t for t in base["individual_types"][indiv] if t in selected]
+            if not indiv_types:
+                continue
+            individuals.append(indiv)
+            node = base["individual_nodes"][indiv]
+            nodes.append(node)
+            for type_uri in indiv_types:
+                links.append({
+                    "source": node["id"],
+                    "target": class_nodes[type_uri]["id"],
+                    "type": "instanceOf",
+                    "label": "est une instance de",
+                    "value": 1  # Épaisseur du lien
+                })
         
-        for indiv in self.graph.subjects(RDF.type, OWL.NamedIndividual):
-            if isinstance(indiv, URIRef) and indiv.startswith(FLOOD_NS) and individuals_added < max_individuals:
-                indiv_name = str(indiv).split('#')[-1]
-                node_id = f"indiv_{indiv_name}"
-                
-                if node_id not in node_ids:
-                    # Trouver les types (classes) de cet individu
-                    indiv_types = []
-                    for type_uri in self.graph.objects(indiv, RDF.type):
-                        if isinstance(type_uri, URIRef) and type_uri != OWL.NamedIndividual and type_uri.startswith(FLOOD_NS):
-                            indiv_types.append(type_uri)
-                    
-                    # Ne l'ajouter que s'il a au moins un type intéressant
-                    if indiv_types:
-                        label = self._get_label(indiv) or indiv_name
-                        comment = self._get_comment(indiv) or f"Individu {indiv_name}"
-                        
-                        nodes.append({
-                            "id": node_id,
-                            "name": indiv_name,
-                            "label": label,
-                            "description": comment,
-                            "type": "individual",
-                            "value": 0.5  # Plus petit que les classes et propriétés
-                        })
-                        node_ids[node_id] = True
-                        individuals_added += 1
-                        
-                        # Ajouter les liens vers les classes (types)
-                        for type_uri in indiv_types:
-                            type_name = str(type_uri).split('#')[-1]
-                            target_id = f"class_{type_name}"
-                            
-                            if target_id in node_ids:
-                                links.append({
-                                    "source": node_id,
-                                    "target": target_id,
-                                    "type": "instanceOf",
-                                    "label": "est une instance de",
-                                    "value": 1  # Épaisseur du lien
-                                })
-        
-        # Ajouter les relations de sous-classe
-        for cls, parent in self.graph.subject_objects(RDFS.subClassOf):
-            if (isinstance(cls, URIRef) and isinstance(parent, URIRef) and 
-                cls.startswith(FLOOD_NS) and parent.startswith(FLOOD_NS)):
-                
-                source_id = f"class_{str(cls).split('#')[-1]}"
-                target_id = f"class_{str(parent).split('#')[-1]}"
-                
-                if source_id in node_ids and target_id in node_ids:
+        # Relations de sous-classe
+        for cls in selected:
+            for parent in base["subclass_of"][cls]:
+                if parent in selected:
                     links.append({
-                        "source": source_id,
-                        "target": target_id,
+                        "source": class_nodes[cls]["id"],
+                        "target": class_nodes[parent]["id"],
                         "type": "subClassOf",
                         "label": "est un sous-type de",
                         "value": 2  # Lien plus épais pour les relations de hiérarchie
                     })
         
-        # Ajouter les propriétés d'objet comme liens entre classes
-        for prop in self.graph.subjects(RDF.type, OWL.ObjectProperty):
-            if isinstance(prop, URIRef) and prop.startswith(FLOOD_NS):
-                prop_name = str(prop).split('#')[-1]
-                prop_id = f"prop_{prop_name}"
-                
-                # Trouver le domaine et la plage de la propriété
-                domains = list(self.graph.objects(prop, RDFS.domain))
-                ranges = list(self.graph.objects(prop, RDFS.range))
-                
-                # Ajouter des liens du domaine à la propriété et de la propriété à la plage
-                for domain in domains:
-                    if isinstance(domain, URIRef) and domain.startswith(FLOOD_NS):
-                        domain_id = f"class_{str(domain).split('#')[-1]}"
-                        if domain_id in node_ids and prop_id in node_ids:
-                            links.append({
-                                "source": domain_id,
-                                "target": prop_id,
-                                "type": "hasDomain",
-                                "label": "a pour domaine",
-                                "value": 1.5
-                            })
-                
-                for range_cls in ranges:
-                    if isinstance(range_cls, URIRef) and range_cls.startswith(FLOOD_NS):
-                        range_id = f"class_{str(range_cls).split('#')[-1]}"
-                        if prop_id in node_ids and range_id in node_ids:
-                            links.append({
-                                "source": prop_id,
-                                "target": range_id,
-                                "type": "hasRange",
-                                "label": "a pour co-domaine",
-                                "value": 1.5
-                            })
-        
-        # Ajouter des liens entre individus basés sur les propriétés d'objet
-        for s, p, o in self.graph.triples((None, None, None)):
-            if (isinstance(s, URIRef) and isinstance(p, URIRef) and isinstance(o, URIRef) and
-                s.startswith(FLOOD_NS) and p.startswith(FLOOD_NS) and o.startswith(FLOOD_NS)):
-                
-                # Vérifier si s et o sont des individus et p est une propriété d'objet
-                # Utiliser graph.triples() au lieu de graph.value() pour éviter l'erreur UnboundLocalError
-                is_s_individual = len(list(self.graph.triples((s, RDF.type, OWL.NamedIndividual)))) > 0
-                is_o_individual = len(list(self.graph.triples((o, RDF.type, OWL.NamedIndividual)))) > 0
-                is_p_property = len(list(self.graph.triples((p, RDF.type, OWL.ObjectProperty)))) > 0
-                
-                if is_s_individual and is_o_individual and is_p_property:
-                    
-                    source_id = f"indiv_{str(s).split('#')[-1]}"
-                    target_id = f"indiv_{str(o).split('#')[-1]}"
-                    prop_name = str(p).split('#')[-1]
-                    
-                    if source_id in node_ids and target_id in node_ids:
-                        links.append({
-                            "source": source_id,
-                            "target": target_id,
-                            "type": "objectPropertyAssertion",
-                            "label": prop_name,
-                            "value": 1
-                        })
-        
-        for s, p, o in self.graph.triples((None, RDF.type, OWL.Ontology)):
+        # Propriétés d'objet comme liens entre classes
+        for prop in props:
+            prop_id = base["prop_nodes"][prop]["id"]
+            for domain in base["domains"][prop]:
+                if domain in selected:
+                    links.append({
+                        "source": class_nodes[domain]["id"],
+                        "target": prop_id,
+                        "type": "hasDomain",
+                        "label": "a pour domaine",
+                        "value": 1.5
+                    })
+            for range_cls in base["ranges"][prop]:
+                if range_cls in selected:
+                    links.append({
+                        "source": prop_id,
+                        "target": class_nodes[range_cls]["id"],
+                        "type": "hasRange",
+                        "label": "a pour co-domaine",
+                        "value": 1.5
+                    })
+        
+        # Liens entre individus basés sur les propriétés d'objet
+        shown = set(individuals)
+        for indiv in individuals:
+            for prop, obj in base["assertions"].get(indiv, ()):
+                if obj in shown:
+                    links.append({
+                        "source": base["individual_nodes"][indiv]["id"],
+                        "target": base["individual_nodes"][obj]["id"],
+                        "type": "objectPropertyAssertion",
+                        "label": str(prop).split('#')[-1],
+                        "value": 1
+                    })
+        
+        return {"nodes": nodes, "links": links}
+    
+    def _build_payloads(self, graph):
+        """
+        Construit les index du graphe et les réponses précalculées des endpoints de lecture.
+        
+        Le graphe n'est parcouru qu'une fois ; les réponses restent valides jusqu'au prochain
+        rechargement.
+        
+        Args:
+            graph (Graph): Graphe fermé de l'ontologie
+        """
+        types = {}  # sujet -> ensemble de ses types
+        predicate_counts = {}
+        flood_links = []  # relations entre ressources de l'ontologie
+        obj_prop_assertions = 0
+        data_prop_assertions = 0
+        
+        for s, p, o in graph:
+            if p == RDF.type:
+                types.setdefault(s, set()).add(o)
+            else:
+                predicate_counts[p] = predicate_counts.get(p, 0) + 1
+                if isinstance(p, URIRef):
+                    if isinstance(o, URIRef):
+                        obj_prop_assertions += 1
+                        if (isinstance(s, URIRef) and s.startswith(FLOOD_NS) and
+                                p.startswith(FLOOD_NS) and o.startswith(FLOOD_NS)):
+                            flood_links.append((s, p, o))
+                    elif isinstance(o, Literal):
+                        data_prop_assertions += 1
+        
+        instances = {}  # type -> sujets
+        for subject, subject_types in types.items():
+            for type_uri in subject_types:
+                instances.setdefault(type_uri, []).append(subject)
+        
+        def flood_terms(type_uri):
+            return [t for t in instances.get(type_uri, []) if isinstance(t, URIRef) and t.startswith(FLOOD_NS)]
+        
+        classes = flood_terms(OWL.Class)
+        object_properties = flood_terms(OWL.ObjectProperty)
+        data_properties = flood_terms(OWL.DatatypeProperty)
+        class_set = set(instances.get(OWL.Class, []))
+        
+        self.index = {
+            "types": types,
+            "instances": instances,
+            "predicate_counts": predicate_counts,
+            "flood_links": flood_links,
+            "classes": classes,
+            "object_properties": object_properties,
+            "data_properties": data_properties
+        }
+        
+        # Fiches des individus, partagées entre la liste complète et les listes par type
+        individual_infos = {}
+        for subject, subject_types in types.items():
+            if isinstance(subject, URIRef) and subject.startswith(FLOOD_NS) and subject not in class_set:
+                individual_infos[subject] = self._get_individual_info(subject, graph)
+        
+        individuals_by_type = {}
+        for type_uri, subjects in instances.items():
+            infos = [individual_infos.get(subject) or self._get_individual_info(subject, graph)
+                     for subject in subjects if isinstance(subject, URIRef) and subject.startswith(FLOOD_NS)]
+            if infos:
+                infos.sort(key=lambda x: x["name"])
+                individuals_by_type[str(type_uri)] = infos
+        
+        self.payloads = {
+            "classes": sorted(
+                ({
+                    "uri": str(cls),
+                    "name": str(cls).split('#')[-1],
+                    "label": self._get_label(cls, graph),
+                    "comment": self._get_comment(cls, graph),
+                    "subClassOf": [str(parent) for parent in graph.objects(cls, RDFS.subClassOf)
+                                   if isinstance(parent, URIRef)],
+                    "individuals_count": len(instances.get(cls, []))
+                } for cls in classes),
+                key=lambda x: x["name"]
+            ),
+            "object_properties": self._build_property_payload(graph, object_properties, predicate_counts),
+            "data_properties": self._build_property_payload(graph, data_properties, predicate_counts),
+            "individuals": sorted(individual_infos.values(), key=lambda x: x["name"]),
+            "individuals_by_type": individuals_by_type,
+            "inferred": self._build_inferred_knowledge(graph),
+            "description": self._build_description(graph),
+            # Visualisation : structure construite à la première demande, variantes par paramètres
+            "visualization_base": None,
+            "visualization": {},
+            "statistics": {
+                "classes": len(instances.get(OWL.Class, [])),
+                "object_properties": len(instances.get(OWL.ObjectProperty, [])),
+                "data_properties": len(instances.get(OWL.DatatypeProperty, [])),
+                "individuals": len(instances.get(OWL.NamedIndividual, [])),
+                "object_property_assertions": obj_prop_assertions,
+                "data_property_assertions": data_prop_assertions,
+                "total_triples": len(graph)
+            }
+        }
+    
+    def _build_property_payload(self, graph, properties, predicate_counts):
+        """Construit la liste triée des propriétés avec domaine, co-domaine et nombre d'usages."""
+        payload = []
+        for prop in properties:
+            payload.append({
+                "uri": str(prop),
+                "name": str(prop).split('#')[-1],
+                "label": self._get_label(prop, graph),
+                "comment": self._get_comment(prop, graph),
+                "domain": [str(d) for d in graph.objects(prop, RDFS.domain) if isinstance(d, URIRef)],
+                "range": [str(r) for r in graph.objects(prop, RDFS.range) if isinstance(r, URIRef)],
+                "usage_count": predicate_counts.get(prop, 0)
+            })
+        payload.sort(key=lambda x: x["name"])
+        return payload
+    
+    def _build_inferred_knowledge(self, graph):
+        """Construit le résumé des connaissances inférées (risques, zones inondables, alertes)."""
+        # Exemples de types de connaissances inférées à rechercher
+        inferred_flood_risks = []
+        inferred_flood_prone = []
+        inferred_early_warnings = []
+        
+        # Rechercher les triplets inférés liés aux risques d'inondation
+        for subj, pred, obj in graph.triples((None, FLOOD_NS.hasFloodRisk, None)):
+            if isinstance(subj, URIRef) and isinstance(obj, URIRef):
+                risk_info = {
+                    "area": str(subj).split('#')[-1],
+                    "risk_level": str(obj).split('#')[-1]
+                }
+                inferred_flood_risks.append(risk_info)
+        
+        # Rechercher les zones classifiées comme inondables
+        for subj, pred, obj in graph.triples((None, FLOOD_NS.isFloodProne, Literal(True))):
+            if isinstance(subj, URIRef):
+                area_info = {
+                    "area": str(subj).split('#')[-1]
+                }
+                inferred_flood_prone.append(area_info)
+        
+        # Rechercher les alertes précoces
+        for subj, pred, obj in graph.triples((None, FLOOD_NS.hasEarlyWarningStatus, None)):
+            if isinstance(subj, URIRef) and isinstance(obj, URIRef):
+                alert_info = {
+                    "entity": str(subj).split('#')[-1],
+                    "status": str(obj).split('#')[-1]
+                }
+                inferred_early_warnings.append(alert_info)
+        
+        # Construire le résultat
+        result = {
+            "flood_risks": {
+                "count": len(inferred_flood_risks),
+                "examples": inferred_flood_risks[:10]  # Limiter à 10 exemples
+            },
+            "flood_prone_areas": {
+                "count": len(inferred_flood_prone),
+                "examples": inferred_flood_prone[:10]
+            },
+            "early_warnings": {
+                "count": len(inferred_early_warnings),
+                "examples": inferred_early_warnings[:10]
+            },
+            "total_inferences": len(inferred_flood_risks) + len(inferred_flood_prone) + len(inferred_early_warnings)
+        }
+        
+        return result
+    
+    def _build_description(self, graph):
+        """Construit la description générale de l'ontologie."""
+        # Récupérer les informations de l'ontologie elle-même
+        ontology_uri = None
+        for s, p, o in graph.triples((None, RDF.type, OWL.Ontology)):
             if isinstance(s, URIRef):
                 ontology_uri = s
                 break
@@ -664,8 +715,8 @@ class OntologyExplorer:
             return {"error": "Informations sur l'ontologie non trouvées"}
         
         # Récupérer les métadonnées
-        title = self._get_label(ontology_uri) or "Ontologie des inondations à Ouagadougou"
-        description = self._get_comment(ontology_uri) or "Cette ontologie modélise les connaissances relatives aux inondations à Ouagadougou, Burkina Faso."
+        title = self._get_label(ontology_uri, graph) or "Ontologie des inondations à Ouagadougou"
+        description = self._get_comment(ontology_uri, graph) or "Cette ontologie modélise les connaissances relatives aux inondations à Ouagadougou, Burkina Faso."
         
         # Description détaillée de l'ontologie
         details = (
@@ -695,53 +746,32 @@ class OntologyExplorer:
             "created": "2025-05-24"
         }
     
-    def _get_label(self, uri):
+    def _get_label(self, uri, graph=None):
         """Récupère le label d'un élément."""
-        for label in self.graph.objects(uri, RDFS.label):
+        graph = self.graph if graph is None else graph
+        for label in graph.objects(uri, RDFS.label):
             return str(label)
         return None
     
-    def _get_comment(self, uri):
+    def _get_comment(self, uri, graph=None):
         """Récupère le commentaire d'un élément."""
-        for comment in self.graph.objects(uri, RDFS.comment):
+        graph = self.graph if graph is None else graph
+        for comment in graph.objects(uri, RDFS.comment):
             return str(comment)
         return None
     
-    def _apply_rules(self):
-        """
-        Applique les règles SWRL pour inférer de nouvelles connaissances.
-        
-        Returns:
-            bool: True si les règles ont été appliquées avec succès, False sinon
-        """
-        try:
-            # Assurez-vous que l'ontologie est chargée
-            if not self.load_ontology():
-                return False
-            
-            # Applique le raisonnement OWL
-            logger.info("Application du raisonnement sur l'ontologie...")
-            owlrl.DeductiveClosure(owlrl.OWLRL_Semantics).expand(self.graph)
-            
-            # Ici, vous pourriez éventuellement implémenter un moteur de règles SWRL personnalisé
-            # Pour l'instant, nous nous reposons sur le raisonnement OWL de base
-            
-            return True
-        except Exception as e:
-            logger.error(f"Erreur lors de l'application des règles: {str(e)}")
-            return False
-    
-    def _get_individual_info(self, indiv):
+    def _get_individual_info(self, indiv, graph=None):
         """Récupère les informations d'un individu."""
+        graph = self.graph if graph is None else graph
         # Récupérer les types de l'individu
         types = []
-        for type_uri in self.graph.objects(indiv, RDF.type):
+        for type_uri in graph.objects(indiv, RDF.type):
             if isinstance(type_uri, URIRef) and type_uri != OWL.NamedIndividual:
                 types.append(str(type_uri))
         
         # Récupérer les propriétés de l'individu
         properties = []
-        for p, o in self.graph.predicate_objects(indiv):
+        for p, o in graph.predicate_objects(indiv):
             if isinstance(p, URIRef) and p not in [RDF.type, RDFS.label, RDFS.comment]:
                 prop_value = str(o)
                 if isinstance(o, Literal):
@@ -757,8 +787,8 @@ class OntologyExplorer:
         return {
             "uri": str(indiv),
             "name": str(indiv).split('#')[-1],
-            "label": self._get_label(indiv),
-            "comment": self._get_comment(indiv),
+            "label": self._get_label(indiv, graph),
+            "comment": self._get_comment(indiv, graph),
             "types": types,
             "properties": properties
         }
@@ -0,0 +1,240 @@
+"""
+Module de sauvegarde du graphe d'ontologie analysé et fermé par le raisonnement.
+Le graphe est écrit dans un instantané JSON identifié par l'empreinte du fichier OWL
+et du fichier de règles SWRL ; il n'est reconstruit que lorsque ces sources changent.
+L'instantané ne contient que des données (une table des termes RDF et les triplets qui s'y réfèrent) :
+sa lecture ne peut pas exécuter de code. La fermeture OWL-RL produit des triplets généralisés (littéral
+en sujet) qu'aucun format RDF standard ne représente, d'où ce format propre. L'instantané n'est relu
+que s'il appartient à l'utilisateur courant, dans un répertoire qu'il est seul à pouvoir modifier :
+le répertoire par défaut se trouve sous le répertoire temporaire partagé.
+"""
+
+from rdflib import Graph, URIRef, BNode, Literal
+import rdflib
+import owlrl
+import hashlib
+import json
+import os
+import glob
+import logging
+from datetime import datetime
+from swrl_engine import SWRLRuleEngine
+from incremental_reasoner import IncrementalReasoner, materialize_rules
+from shared_cache import is_private, is_private_directory
+import metrics
+
+# Configuration du logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Incrémenter si le contenu de l'instantané change de nature
+SNAPSHOT_FORMAT_VERSION = 3
+
+ONTOLOGY_STAGE_SECONDS = metrics.registry.histogram(
+    "bf_flood_ontology_stage_duration_seconds",
+    "Durée des étapes de chargement de l'ontologie (analyse, fermeture OWL-RL, règles, instantané)",
+    ("stage",),
+    buckets=(0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+)
+
+
+def build_closed_graph(ontology_path, swrl_rules_path):
+    """
+    Analyse l'ontologie, applique la fermeture OWL-RL puis matérialise les règles SWRL et leurs conséquences.
+
+    Args:
+        ontology_path (str): Chemin vers le fichier d'ontologie OWL
+        swrl_rules_path (str): Chemin vers le fichier de règles SWRL
+
+    Returns:
+        Graph: Graphe fermé
+    """
+    graph = Graph()
+    with ONTOLOGY_STAGE_SECONDS.labels("parse").time():
+        graph.parse(ontology_path, format="xml")
+    with ONTOLOGY_STAGE_SECONDS.labels("owlrl_closure").time():
+        owlrl.DeductiveClosure(owlrl.OWLRL_Semantics).expand(graph)
+
+    # Les conclusions des règles ne touchent que les individus : leurs conséquences
+    # OWL-RL sont dérivées incrémentalement, sans nouvelle fermeture complète
+    with ONTOLOGY_STAGE_SECONDS.labels("rule_materialization").time():
+        materialize_rules(graph, SWRLRuleEngine(swrl_rules_path), IncrementalReasoner(graph))
+    return graph
+
+
+def _encode_term(term):
+    """Encode un terme RDF en liste JSON : [type, valeur, type de donnée, langue]."""
+    if isinstance(term, Literal):
+        return ["l", str(term), str(term.datatype) if term.datatype else None, term.language]
+    return ["b" if isinstance(term, BNode) else "u", str(term)]
+
+
+def _decode_term(item):
+    """Reconstruit un terme RDF encodé par _encode_term."""
+    kind, value = item[0], item[1]
+    if kind == "u":
+        return URIRef(value)
+    if kind == "b":
+        return BNode(value)
+    if kind == "l":
+        return Literal(value, datatype=URIRef(item[2]) if item[2] else None, lang=item[3])
+    raise ValueError(f"Type de terme inconnu dans l'instantané: {kind}")
+
+
+def dump_graph(graph, f):
+    """
+    Écrit un graphe (triplets généralisés compris) dans un fichier texte JSON.
+
+    Args:
+        graph (Graph): Graphe à écrire
+        f: Fichier ouvert en écriture texte
+    """
+    index = {}
+    terms = []
+    triples = []
+    for triple in graph:
+        encoded = []
+        for term in triple:
+            position = index.get(term)
+            if position is None:
+                position = index[term] = len(terms)
+                terms.append(_encode_term(term))
+            encoded.append(position)
+        triples.append(encoded)
+    json.dump({"format": SNAPSHOT_FORMAT_VERSION, "terms": terms, "triples": triples}, f,
+              ensure_ascii=False, separators=(",", ":"))
+
+
+def load_graph(f):
+    """
+    Relit un graphe écrit par dump_graph.
+
+    Raises:
+        ValueError: Si le contenu n'est pas un instantané de ce format
+    """
+    data = json.load(f)
+    if not isinstance(data, dict) or data.get("format") != SNAPSHOT_FORMAT_VERSION:
+        raise ValueError("Format d'instantané inattendu")
+    terms = [_decode_term(item) for item in data["terms"]]
+    graph = Graph()
+    for s, p, o in data["triples"]:
+        graph.add((terms[s], terms[p], terms[o]))
+    return graph
+
+
+class OntologySnapshot:
+    """Instantané JSON du graphe fermé, indexé par l'empreinte de ses sources."""
+
+    def __init__(self, ontology_path, swrl_rules_path, snapshot_dir):
+        """
+        Initialise l'instantané.
+
+        Args:
+            ontology_path (str): Chemin vers le fichier d'ontologie OWL
+            swrl_rules_path (str): Chemin vers le fichier de règles SWRL
+            snapshot_dir (str): Répertoire des instantanés
+        """
+        self.ontology_path = ontology_path
+        self.swrl_rules_path = swrl_rules_path
+        self.snapshot_dir = snapshot_dir
+        self.prefix = os.path.splitext(os.path.basename(ontology_path))[0]
+
+    def digest(self):
+        """
+        Calcule l'empreinte des sources de l'instantané.
+
+        Les versions de rdflib, d'owlrl et du format sont incluses car elles déterminent le contenu du graphe.
+
+        Returns:
+            str: Empreinte SHA-256 hexadécimale
+        """
+        sha = hashlib.sha256()
+        sha.update(f"{SNAPSHOT_FORMAT_VERSION}:{rdflib.__version__}:{getattr(owlrl, '__version__', '')}".encode())
+        for path in (self.ontology_path, self.swrl_rules_path):
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1 << 20), b''):
+                    sha.update(chunk)
+        return sha.hexdigest()
+
+    def path_for(self, digest):
+        """Retourne le chemin de l'instantané correspondant à une empreinte."""
+        return os.path.join(self.snapshot_dir, f"{self.prefix}-{digest[:16]}.json")
+
+    def load(self):
+        """
+        Charge le graphe fermé depuis l'instantané, ou le construit et l'enregistre.
+
+        Returns:
+            Graph: Graphe fermé
+
+        Raises:
+            Exception: Si les sources ne peuvent pas être lues ou analysées
+        """
+        start_time = datetime.now()
+        digest = self.digest()
+        path = self.path_for(digest)
+
+        if os.path.exists(path):
+            try:
+                graph = self._read(path)
+                if graph is not None:
+                    duration = (datetime.now() - start_time).total_seconds()
+                    logger.info(f"Ontologie chargée depuis l'instantané {path} en {duration:.2f} secondes")
+                    return graph
+            except Exception as e:
+                logger.warning(f"Instantané illisible {path}, reconstruction: {str(e)}")
+
+        graph = build_closed_graph(self.ontology_path, self.swrl_rules_path)
+        saved = self._save(graph, path)
+        duration = (datetime.now() - start_time).total_seconds()
+        logger.info(f"Ontologie construite en {duration:.2f} secondes" + (f" et enregistrée dans {path}" if saved else ""))
+        return graph
+
+    def _read(self, path):
+        """
+        Relit un instantané s'il est digne de confiance.
+
+        Returns:
+            Graph: Graphe fermé, ou None si le répertoire ou le fichier n'appartient pas à l'utilisateur
+                courant ou est modifiable par d'autres
+        """
+        if not is_private_directory(self.snapshot_dir):
+            logger.warning(f"Répertoire d'instantanés {self.snapshot_dir} ignoré : il doit appartenir à "
+                           f"l'utilisateur courant et n'être modifiable que par lui")
+            return None
+        # Le fichier ouvert est celui dont on vérifie le propriétaire (pas de substitution entre les deux)
+        with open(path, encoding="utf-8") as f:
+            if not is_private(os.fstat(f.fileno())):
+                logger.warning(f"Instantané {path} ignoré : il n'appartient pas à l'utilisateur courant")
+                return None
+            with ONTOLOGY_STAGE_SECONDS.labels("snapshot_load").time():
+                return load_graph(f)
+
+    def _save(self, graph, path):
+        """
+        Écrit l'instantané de façon atomique et supprime les instantanés périmés.
+
+        Returns:
+            bool: True si l'instantané a été enregistré
+        """
+        try:
+            os.makedirs(self.snapshot_dir, mode=0o700, exist_ok=True)
+            if not is_private_directory(self.snapshot_dir):
+                logger.warning(f"Instantané non enregistré : le répertoire {self.snapshot_dir} n'appartient pas "
+                               f"à l'utilisateur courant ou est modifiable par d'autres")
+                return False
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_NOFOLLOW", 0), 0o600)
+            with os.fdopen(fd, 'w', encoding="utf-8") as f:
+                dump_graph(graph, f)
+            os.replace(tmp_path, path)
+
+            # Les instantanés pickle des versions précédentes sont aussi supprimés
+            for pattern in (f"{self.prefix}-*.json", f"{self.prefix}-*.pickle"):
+                for old_path in glob.glob(os.path.join(self.snapshot_dir, pattern)):
+                    if old_path != path:
+                        os.remove(old_path)
+            return True
+        except OSError as e:
+            logger.warning(f"Impossible d'enregistrer l'instantané de l'ontologie: {str(e)}")
+            return False
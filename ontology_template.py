@@ -0,0 +1,137 @@
+"""
+Module fournissant l'ontologie de base partagée pour les prédictions.
+L'ontologie est analysée et fermée par le raisonnement OWL une seule fois ; chaque prédiction
+ajoute ses individus dans un graphe de superposition léger posé au-dessus de cette base.
+"""
+
+from rdflib import Graph, Namespace
+from rdflib.graph import ReadOnlyGraphAggregate
+from swrl_engine import FactIndex
+from incremental_reasoner import IncrementalReasoner
+from ontology_snapshot import OntologySnapshot, build_closed_graph
+import threading
+import logging
+from datetime import datetime
+
+# Configuration du logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Espaces de noms utilisés par les prédictions
+FLOOD_NS = Namespace("http://www.semanticweb.org/ontologies/2025/ouagadougou-flood-prediction#")
+SWRLB_NS = Namespace("http://www.w3.org/2003/11/swrlb#")
+
+
+class OntologyTemplate:
+    """Ontologie de base chargée une seule fois et partagée en lecture seule."""
+
+    def __init__(self, ontology_path, swrl_rules_path, snapshot_dir=None):
+        """
+        Initialise le modèle d'ontologie.
+
+        Args:
+            ontology_path (str): Chemin vers le fichier d'ontologie OWL
+            swrl_rules_path (str): Chemin vers le fichier de règles SWRL
+            snapshot_dir (str, optional): Répertoire des instantanés du graphe fermé
+        """
+        self.ontology_path = ontology_path
+        self.swrl_rules_path = swrl_rules_path
+        self.snapshot = OntologySnapshot(ontology_path, swrl_rules_path, snapshot_dir) if snapshot_dir else None
+        self.graph = None
+        self.facts = None
+        self.reasoner = None
+        self.last_loaded = None
+        self._lock = threading.Lock()
+
+    def load(self, force_reload=False):
+        """
+        Charge l'ontologie fermée (OWL-RL et règles SWRL) une seule fois.
+
+        Args:
+            force_reload (bool): Force le rechargement même si l'ontologie est déjà chargée
+
+        Returns:
+            bool: True si l'ontologie de base est disponible, False sinon
+        """
+        if self.graph is not None and not force_reload:
+            return True
+
+        with self._lock:
+            # Un autre thread a pu terminer le chargement pendant l'attente du verrou
+            if self.graph is not None and not force_reload:
+                return True
+
+            try:
+                start_time = datetime.now()
+                logger.info(f"Chargement de l'ontologie de base depuis {self.ontology_path}...")
+
+                if self.snapshot is not None:
+                    graph = self.snapshot.load()
+                else:
+                    graph = build_closed_graph(self.ontology_path, self.swrl_rules_path)
+
+                load_duration = (datetime.now() - start_time).total_seconds()
+                logger.info(f"Ontologie de base prête en {load_duration:.2f} secondes. {len(graph)} triplets.")
+
+                # L'index et le raisonneur sont publiés avant le graphe, qui sert d'indicateur de chargement
+                self.facts = FactIndex.from_graph(graph)
+                self.reasoner = IncrementalReasoner(graph)
+                self.graph = graph
+                self.last_loaded = datetime.now()
+                return True
+
+            except Exception as e:
+                logger.error(f"Erreur lors du chargement de l'ontologie de base: {str(e)}")
+                return False
+
+    def new_overlay(self):
+        """
+        Crée un graphe de superposition vide pour une nouvelle prédiction.
+
+        Returns:
+            PredictionOverlay: Superposition adossée à l'ontologie de base
+
+        Raises:
+            RuntimeError: Si l'ontologie de base ne peut pas être chargée
+        """
+        if not self.load():
+            raise RuntimeError(f"Ontologie de base indisponible ({self.ontology_path})")
+        return PredictionOverlay(self.graph, self.facts, self.reasoner)
+
+
+class PredictionOverlay:
+    """Graphe léger contenant les individus d'une prédiction, au-dessus de l'ontologie de base."""
+
+    def __init__(self, base, base_facts, reasoner):
+        """
+        Initialise la superposition.
+
+        Args:
+            base (Graph): Ontologie de base déjà fermée, jamais modifiée
+            base_facts (FactIndex): Index des faits de la base pour le moteur de règles
+            reasoner (IncrementalReasoner): Raisonneur OWL-RL incrémental adossé à la base
+        """
+        self.base = base
+        self.reasoner = reasoner
+        self.facts = FactIndex(parent=base_facts)
+        self.graph = Graph()
+        self.graph.bind("flood", FLOOD_NS)
+        self.graph.bind("swrlb", SWRLB_NS)
+
+    def add(self, triple):
+        """
+        Ajoute un triplet à la superposition avec ses conséquences OWL-RL.
+
+        Seules les conséquences du nouveau triplet sont calculées, contre la base déjà fermée.
+
+        Args:
+            triple (tuple): Triplet (sujet, prédicat, objet) à ajouter
+        """
+        self.facts.add(*triple)
+        for derived in self.reasoner.derive([triple], self.graph):
+            self.facts.add(*derived)
+
+    @property
+    def view(self):
+        """Vue en lecture seule combinant la superposition et l'ontologie de base."""
+        return ReadOnlyGraphAggregate([self.graph, self.base])
@@ -0,0 +1,163 @@
+"""
+Module de cache des réponses Open-Meteo par journée.
+Open-Meteo renvoie les valeurs horaires d'une journée entière pour tous les paramètres demandés :
+chaque journée est conservée en mémoire sous forme d'un tableau NumPy de 24 valeurs par paramètre,
+dont on extrait ensuite une heure (donnée de secours de la météo actuelle) ou une plage d'heures
+(comblement des lacunes de l'historique WIGOS) sans nouvel appel à l'API.
+"""
+
+from collections import OrderedDict
+import threading
+import time
+import numpy as np
+import logging
+
+# Configuration du logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+HOURS_PER_DAY = 24
+
+
+class OpenMeteoDay:
+    """Valeurs horaires d'une journée (UTC), en colonnes par paramètre."""
+
+    def __init__(self, date_str, columns):
+        """
+        Args:
+            date_str (str): Date au format YYYY-MM-DD
+            columns (dict): Paramètre Open-Meteo -> tableau de 24 valeurs (float64, NaN si manquante)
+        """
+        self.date = date_str
+        self.columns = columns
+
+    def at(self, hour):
+        """
+        Retourne les valeurs d'une heure.
+
+        Args:
+            hour (int): Heure UTC (0 à 23)
+
+        Returns:
+            dict: Paramètre Open-Meteo -> valeur (None si manquante)
+        """
+        return {param: None if np.isnan(values[hour]) else float(values[hour])
+                for param, values in self.columns.items()}
+
+    def between(self, start_hour=0, end_hour=HOURS_PER_DAY - 1):
+        """
+        Retourne les valeurs d'une plage d'heures (bornes incluses).
+
+        Args:
+            start_hour (int): Première heure UTC
+            end_hour (int): Dernière heure UTC
+
+        Returns:
+            dict: Paramètre Open-Meteo -> vue sur les valeurs de la plage (sans copie)
+        """
+        return {param: values[start_hour:end_hour + 1] for param, values in self.columns.items()}
+
+
+class OpenMeteoDayCache:
+    """Journées Open-Meteo par (latitude, longitude, date), avec expiration et éviction LRU."""
+
+    def __init__(self, maxsize=64, ttl=900, past_ttl=86400):
+        """
+        Args:
+            maxsize (int): Nombre maximal de journées conservées
+            ttl (float): Durée de vie (secondes) des journées en cours ou futures, encore recalculées
+                par les modèles
+            past_ttl (float): Durée de vie (secondes) des journées passées, qui ne changent plus
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.past_ttl = past_ttl
+        self._days = OrderedDict()  # (latitude, longitude, date) -> (OpenMeteoDay, date d'expiration)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, latitude, longitude, date_str):
+        """
+        Retourne une journée en cache.
+
+        Args:
+            latitude (float): Latitude du point
+            longitude (float): Longitude du point
+            date_str (str): Date au format YYYY-MM-DD
+
+        Returns:
+            OpenMeteoDay: Journée en cache, ou None si absente ou expirée
+        """
+        key = (latitude, longitude, date_str)
+        with self._lock:
+            entry = self._days.get(key)
+            if entry is None or entry[1] <= time.time():
+                self.misses += 1
+                return None
+            self._days.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def missing(self, latitude, longitude, dates):
+        """
+        Retourne les dates absentes du cache (ou expirées), dans l'ordre donné.
+
+        Args:
+            latitude (float): Latitude du point
+            longitude (float): Longitude du point
+            dates (list): Dates au format YYYY-MM-DD
+        """
+        return [date_str for date_str in dates if self.get(latitude, longitude, date_str) is None]
+
+    def store(self, latitude, longitude, hourly, params):
+        """
+        Découpe une réponse Open-Meteo horaire par journée et met chaque journée en cache.
+
+        Args:
+            latitude (float): Latitude du point
+            longitude (float): Longitude du point
+            hourly (dict): Bloc "hourly" de la réponse ({"time": ["YYYY-MM-DDTHH:MM", ...], param: [...]})
+            params (iterable): Paramètres Open-Meteo à conserver
+
+        Returns:
+            dict: Date -> OpenMeteoDay pour chaque journée de la réponse
+        """
+        times = hourly.get("time", [])
+        columns = {param: np.array(hourly[param], dtype=np.float64) for param in params}  # None -> NaN
+
+        # Position de chaque heure de la réponse dans la journée, pour tolérer une journée incomplète
+        rows = {}
+        for index, stamp in enumerate(times):
+            rows.setdefault(stamp[:10], []).append((index, int(stamp[11:13])))
+
+        today = time.strftime("%Y-%m-%d", time.gmtime())
+        days = {}
+        with self._lock:
+            for date_str, positions in rows.items():
+                indices = np.array([index for index, _ in positions])
+                hours = np.array([hour for _, hour in positions])
+                day_columns = {}
+                for param, values in columns.items():
+                    day_values = np.full(HOURS_PER_DAY, np.nan)
+                    day_values[hours] = values[indices]
+                    day_columns[param] = day_values
+                day = days[date_str] = OpenMeteoDay(date_str, day_columns)
+
+                ttl = self.past_ttl if date_str < today else self.ttl
+                key = (latitude, longitude, date_str)
+                self._days[key] = (day, time.time() + ttl)
+                self._days.move_to_end(key)
+            while len(self._days) > self.maxsize:
+                self._days.popitem(last=False)
+        return days
+
+    def stats(self):
+        """Retourne la taille et les compteurs du cache."""
+        with self._lock:
+            return {
+                "size": len(self._days),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses
+            }
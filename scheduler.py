@@ -0,0 +1,227 @@
+"""
+Module de planification des rafraîchissements périodiques.
+Chaque source de données est une tâche indépendante avec son propre intervalle, une variation
+aléatoire (jitter) pour étaler les appels, une temporisation exponentielle après un échec et
+des dépendances : une tâche dépendante s'exécute après le succès des tâches dont elle dépend,
+une seule fois pour des succès rapprochés (regroupement).
+Les tâches prêtes s'exécutent en parallèle dans un pool de threads.
+"""
+
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import random
+import threading
+import time
+import logging
+
+import metrics
+
+# Configuration du logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Attente maximale de la boucle entre deux examens des tâches (secondes)
+MAX_IDLE_WAIT = 60
+
+JOB_SECONDS = metrics.registry.histogram(
+    "bf_flood_refresh_job_duration_seconds",
+    "Durée des tâches de rafraîchissement",
+    ("job", "outcome")
+)
+
+
+class Job:
+    """Tâche périodique et ses statistiques d'exécution."""
+
+    def __init__(self, name, func, interval, jitter=0.1, depends_on=(), backoff=30, max_backoff=None, coalesce=0):
+        """
+        Args:
+            name (str): Nom de la tâche
+            func (callable): Fonction exécutée sans argument ; une exception signale un échec
+            interval (float): Intervalle entre deux exécutions réussies (secondes)
+            jitter (float): Fraction de l'intervalle retranchée aléatoirement (0 à 1)
+            depends_on (tuple): Noms des tâches dont le succès déclenche celle-ci
+            backoff (float): Délai avant la première nouvelle tentative après un échec (secondes)
+            max_backoff (float, optional): Délai maximal entre deux tentatives ; par défaut l'intervalle
+            coalesce (float): Délai entre le premier succès d'une dépendance et l'exécution ; les succès
+                des autres dépendances dans ce délai ne déclenchent pas d'exécution supplémentaire (secondes)
+        """
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.jitter = jitter
+        self.depends_on = tuple(depends_on)
+        self.backoff = backoff
+        self.max_backoff = max_backoff if max_backoff is not None else interval
+        self.coalesce = coalesce
+
+        # Horloge monotone ; 0 = à exécuter au démarrage. Une tâche dépendante attend au démarrage
+        # d'être déclenchée par ses dépendances plutôt que de s'exécuter aussi de son côté
+        self.next_run = time.monotonic() + interval if self.depends_on else 0.0
+        self.pending = False  # déclenchée manuellement
+        self.triggered_at = None  # premier succès d'une dépendance depuis la dernière exécution
+        self.running = False
+        self.runs = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.last_started = None  # date (epoch)
+        self.last_duration = None
+        self.last_success = None  # date (epoch)
+        self.last_error = None
+
+    def due_at(self):
+        """Retourne l'échéance de la tâche (horloge monotone), en tenant compte d'un déclenchement par dépendance."""
+        if self.pending:
+            return 0.0
+        if self.triggered_at is not None:
+            return min(self.next_run, self.triggered_at + self.coalesce)
+        return self.next_run
+
+    def delay_after(self, success):
+        """Calcule le délai avant la prochaine exécution, avec temporisation exponentielle en cas d'échec."""
+        if success:
+            delay = self.interval
+        else:
+            delay = min(self.max_backoff, self.backoff * (2 ** (self.consecutive_failures - 1)))
+        # Variation vers le bas uniquement, pour ne jamais dépasser l'intervalle prévu
+        return delay * (1 - random.random() * self.jitter)
+
+    def stats(self, now):
+        """Retourne les statistiques de la tâche."""
+        return {
+            "interval": self.interval,
+            "depends_on": list(self.depends_on),
+            "running": self.running,
+            "runs": self.runs,
+            "failures": self.failures,
+            "consecutive_failures": self.consecutive_failures,
+            "last_started": self.last_started,
+            "last_duration": round(self.last_duration, 3) if self.last_duration is not None else None,
+            "last_success": self.last_success,
+            "last_error": self.last_error,
+            "next_run_in": round(max(self.due_at() - now, 0), 1)
+        }
+
+
+class RefreshScheduler:
+    """Planificateur de tâches périodiques avec dépendances, exécutées en parallèle."""
+
+    def __init__(self, max_workers=4):
+        """
+        Args:
+            max_workers (int): Nombre maximal de tâches exécutées simultanément
+        """
+        self.max_workers = max_workers
+        self._jobs = OrderedDict()
+        self._condition = threading.Condition()
+        self._executor = None
+        self._stopped = False
+
+    def add_job(self, name, func, interval, **options):
+        """
+        Enregistre une tâche (voir Job pour les options).
+
+        Raises:
+            ValueError: Si la tâche existe déjà ou dépend d'une tâche inconnue
+        """
+        with self._condition:
+            if name in self._jobs:
+                raise ValueError(f"Tâche déjà enregistrée: {name}")
+            job = Job(name, func, interval, **options)
+            # Les dépendances doivent être enregistrées avant, ce qui exclut les cycles
+            unknown = [dep for dep in job.depends_on if dep not in self._jobs]
+            if unknown:
+                raise ValueError(f"Dépendances inconnues pour {name}: {', '.join(unknown)}")
+            self._jobs[name] = job
+            self._condition.notify_all()
+            return job
+
+    def trigger(self, name):
+        """Demande l'exécution immédiate d'une tâche (après ses dépendances en cours)."""
+        with self._condition:
+            self._jobs[name].pending = True
+            self._condition.notify_all()
+
+    def _is_due(self, job, now):
+        return now >= job.due_at()
+
+    def _is_ready(self, job, now):
+        """Une tâche due est prête si aucune de ses dépendances n'est en cours ou due (verrou acquis)."""
+        if job.running or not self._is_due(job, now):
+            return False
+        return all(not self._jobs[dep].running and not self._is_due(self._jobs[dep], now)
+                   for dep in job.depends_on)
+
+    def _run(self, job):
+        """Exécute une tâche et planifie la suivante."""
+        started = time.monotonic()
+        job.last_started = time.time()
+        error = None
+        try:
+            job.func()
+        except Exception as e:
+            error = e
+
+        with self._condition:
+            now = time.monotonic()
+            job.running = False
+            job.runs += 1
+            job.last_duration = now - started
+            JOB_SECONDS.labels(job.name, "success" if error is None else "failure").observe(job.last_duration)
+            if error is None:
+                job.consecutive_failures = 0
+                job.last_success = time.time()
+                job.last_error = None
+                # Les tâches dépendantes s'exécutent après ce rafraîchissement, une seule fois pour
+                # les succès de leurs dépendances survenus pendant leur délai de regroupement
+                for other in self._jobs.values():
+                    if job.name in other.depends_on and other.triggered_at is None:
+                        other.triggered_at = now
+            else:
+                job.failures += 1
+                job.consecutive_failures += 1
+                job.last_error = str(error)
+            job.next_run = now + job.delay_after(error is None)
+            self._condition.notify_all()
+
+        if error is None:
+            logger.info(f"Tâche {job.name} exécutée en {job.last_duration:.2f} s")
+        else:
+            logger.error(f"Échec de la tâche {job.name} ({job.consecutive_failures} consécutif(s)), "
+                         f"nouvelle tentative dans {job.next_run - time.monotonic():.0f} s: {str(error)}")
+
+    def run_forever(self):
+        """Exécute les tâches à leur échéance jusqu'à l'arrêt du planificateur (bloquant)."""
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="refresh")
+        with self._condition:
+            while not self._stopped:
+                now = time.monotonic()
+                for job in self._jobs.values():
+                    if self._is_ready(job, now):
+                        job.running = True
+                        job.pending = False
+                        job.triggered_at = None
+                        self._executor.submit(self._run, job)
+
+                # Attendre la prochaine échéance ou la fin d'une tâche
+                waits = [job.due_at() - now for job in self._jobs.values()
+                         if not job.running and not self._is_due(job, now)]
+                self._condition.wait(min([MAX_IDLE_WAIT] + waits))
+        self._executor.shutdown(wait=False)
+
+    def stop(self):
+        """Arrête la boucle du planificateur (les tâches en cours se terminent)."""
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+
+    def stats(self):
+        """
+        Retourne les statistiques d'exécution de chaque tâche.
+
+        Returns:
+            dict: Nom de tâche -> statistiques
+        """
+        with self._condition:
+            now = time.monotonic()
+            return {name: job.stats(now) for name, job in self._jobs.items()}
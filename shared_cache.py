@@ -0,0 +1,284 @@
+"""
+Module de partage du cache entre les processus d'un même hôte (workers gunicorn).
+Les entrées sont stockées dans une base SQLite en mode WAL et un verrou de fichier
+désigne le seul processus chargé d'exécuter la boucle de rafraîchissement ; la même base
+contient le journal des événements diffusés aux clients de tous les workers.
+Le répertoire du cache se trouve par défaut sous le répertoire temporaire partagé : il n'est utilisé
+que s'il appartient à l'utilisateur courant et que lui seul peut le modifier.
+"""
+
+import sqlite3
+import json
+import os
+import stat
+import tempfile
+import threading
+import logging
+
+try:
+    import fcntl
+except ImportError:  # Windows : pas de verrou de fichier POSIX, un seul processus est supposé
+    fcntl = None
+
+# Configuration du logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def is_private(st):
+    """
+    Indique si un fichier ou un répertoire peut être relu sans risque.
+
+    Args:
+        st (os.stat_result): Informations du fichier
+
+    Returns:
+        bool: True s'il appartient à l'utilisateur courant et n'est modifiable ni par son groupe ni par les autres
+    """
+    if hasattr(os, "getuid") and st.st_uid != os.getuid():
+        return False
+    return not st.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+
+
+def is_private_directory(path):
+    """
+    Vérifie qu'un répertoire et ses parents ne peuvent pas être substitués par un autre utilisateur.
+
+    Les parents peuvent appartenir à root et être modifiables par tous s'ils portent le sticky bit
+    (cas de /tmp) : un autre utilisateur ne peut alors ni renommer ni supprimer les entrées.
+
+    Args:
+        path (str): Chemin du répertoire
+
+    Returns:
+        bool: True si le répertoire est privé et que ses parents sont sûrs
+    """
+    path = os.path.realpath(path)
+    try:
+        if not is_private(os.stat(path)):
+            return False
+        parent = os.path.dirname(path)
+        while True:
+            st = os.stat(parent)
+            if hasattr(os, "getuid") and st.st_uid not in (0, os.getuid()):
+                return False
+            if st.st_mode & (stat.S_IWGRP | stat.S_IWOTH) and not st.st_mode & stat.S_ISVTX:
+                return False
+            if os.path.dirname(parent) == parent:
+                return True
+            parent = os.path.dirname(parent)
+    except OSError:
+        return False
+
+
+def private_directory(path, prefix="bf-flood-prediction-"):
+    """
+    Crée au besoin un répertoire réservé à l'utilisateur courant (mode 0700).
+
+    Si le répertoire existe déjà sans être privé (créé d'avance par un autre utilisateur, droits trop
+    larges), un répertoire temporaire privé propre au processus est utilisé à la place : le cache n'est
+    alors plus partagé entre les workers, mais aucune donnée d'un autre utilisateur n'est relue.
+
+    Args:
+        path (str): Chemin du répertoire souhaité
+        prefix (str): Préfixe du répertoire temporaire de repli
+
+    Returns:
+        str: Chemin du répertoire à utiliser
+    """
+    try:
+        os.makedirs(path, mode=0o700, exist_ok=True)
+    except OSError as e:
+        logger.warning(f"Impossible de créer le répertoire {path}: {str(e)}")
+    if is_private_directory(path):
+        return path
+    fallback = tempfile.mkdtemp(prefix=prefix)
+    logger.warning(f"Répertoire {path} ignoré : il doit appartenir à l'utilisateur courant et n'être modifiable "
+                   f"que par lui ; utilisation de {fallback}, propre à ce processus")
+    return fallback
+
+
+class SQLiteCacheBackend:
+    """Stockage partagé des entrées de cache dans une base SQLite en mode WAL."""
+
+    def __init__(self, path):
+        """
+        Initialise le stockage partagé.
+
+        Args:
+            path (str): Chemin du fichier SQLite (créé au besoin)
+        """
+        self.path = path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(path) or ".", mode=0o700, exist_ok=True)
+        self._connection().execute(
+            "CREATE TABLE IF NOT EXISTS cache_entries ("
+            "slot TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, "
+            "stored_at REAL NOT NULL, expires_at REAL NOT NULL, "
+            "PRIMARY KEY (slot, key))"
+        )
+        self._connection().execute(
+            "CREATE TABLE IF NOT EXISTS events ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, event TEXT NOT NULL, data TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+
+    def _connection(self):
+        """Retourne la connexion SQLite du thread courant."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _encode_key(key):
+        return json.dumps(list(key) if isinstance(key, tuple) else key)
+
+    def get(self, slot, key):
+        """
+        Lit une entrée partagée.
+
+        Args:
+            slot (str): Type de données
+            key: Clé de l'entrée
+
+        Returns:
+            tuple: (valeur, date de stockage, date d'expiration) ou None si absente ou illisible
+        """
+        try:
+            row = self._connection().execute(
+                "SELECT value, stored_at, expires_at FROM cache_entries WHERE slot = ? AND key = ?",
+                (slot, self._encode_key(key))
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Lecture du cache partagé impossible ({slot}): {str(e)}")
+            return None
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1], row[2]
+
+    def set(self, slot, key, value, stored_at, expires_at):
+        """
+        Écrit une entrée partagée ; les valeurs doivent être sérialisables en JSON.
+
+        Args:
+            slot (str): Type de données
+            key: Clé de l'entrée
+            value: Valeur à stocker
+            stored_at (float): Date de stockage (epoch)
+            expires_at (float): Date d'expiration (epoch)
+        """
+        try:
+            self._connection().execute(
+                "INSERT OR REPLACE INTO cache_entries (slot, key, value, stored_at, expires_at) VALUES (?, ?, ?, ?, ?)",
+                (slot, self._encode_key(key), json.dumps(value), stored_at, expires_at)
+            )
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            logger.warning(f"Écriture du cache partagé impossible ({slot}): {str(e)}")
+
+    def append_event(self, event, data, created_at, keep=1000):
+        """
+        Ajoute un événement au journal partagé et supprime les plus anciens.
+
+        Args:
+            event (str): Type d'événement
+            data (str): Données de l'événement (JSON)
+            created_at (float): Date de l'événement (epoch)
+            keep (int): Nombre d'événements conservés
+
+        Returns:
+            int: Identifiant de l'événement (croissant entre tous les processus), ou None en cas d'échec
+        """
+        try:
+            conn = self._connection()
+            event_id = conn.execute(
+                "INSERT INTO events (event, data, created_at) VALUES (?, ?, ?)", (event, data, created_at)
+            ).lastrowid
+            conn.execute("DELETE FROM events WHERE id <= ?", (event_id - keep,))
+            return event_id
+        except sqlite3.Error as e:
+            logger.warning(f"Écriture du journal d'événements impossible ({event}): {str(e)}")
+            return None
+
+    def events_after(self, after_id, limit=256):
+        """
+        Lit les événements postérieurs à un identifiant.
+
+        Args:
+            after_id (int): Dernier identifiant déjà reçu
+            limit (int): Nombre maximal d'événements retournés
+
+        Returns:
+            list: Tuples (identifiant, type, données JSON) dans l'ordre croissant
+        """
+        try:
+            return self._connection().execute(
+                "SELECT id, event, data FROM events WHERE id > ? ORDER BY id LIMIT ?", (after_id, limit)
+            ).fetchall()
+        except sqlite3.Error as e:
+            logger.warning(f"Lecture du journal d'événements impossible: {str(e)}")
+            return []
+
+    def purge_expired(self, before):
+        """Supprime les entrées expirées avant la date donnée."""
+        try:
+            self._connection().execute("DELETE FROM cache_entries WHERE expires_at < ?", (before,))
+        except sqlite3.Error as e:
+            logger.warning(f"Purge du cache partagé impossible: {str(e)}")
+
+
+class LeaderLock:
+    """Verrou de fichier non bloquant désignant le processus leader."""
+
+    def __init__(self, path):
+        """
+        Args:
+            path (str): Chemin du fichier de verrou
+        """
+        self.path = path
+        self._fd = None
+
+    @property
+    def is_leader(self):
+        return self._fd is not None
+
+    def try_acquire(self):
+        """
+        Tente de devenir leader sans bloquer.
+
+        Le verrou est libéré par le système à la fin du processus, ce qui permet
+        à un autre worker de prendre le relais.
+
+        Returns:
+            bool: True si ce processus est leader
+        """
+        if self._fd is not None:
+            return True
+        if fcntl is None:
+            self._fd = -1
+            return True
+
+        os.makedirs(os.path.dirname(self.path) or ".", mode=0o700, exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT | getattr(os, "O_NOFOLLOW", 0), 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+
+        os.ftruncate(fd, 0)
+        os.write(fd, str(os.getpid()).encode())
+        self._fd = fd
+        logger.info(f"Processus {os.getpid()} élu leader pour le rafraîchissement du cache")
+        return True
+
+    def release(self):
+        """Libère le verrou si ce processus le détient."""
+        if self._fd is None:
+            return
+        if self._fd >= 0:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+        self._fd = None
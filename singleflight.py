@@ -0,0 +1,69 @@
+"""
+Module de regroupement des appels concurrents (single-flight).
+Lorsque plusieurs threads demandent la même clé au même moment, un seul exécute le calcul
+et les autres attendent puis partagent son résultat.
+"""
+
+import threading
+
+
+class _Call:
+    """Appel en cours pour une clé donnée."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Regroupe les appels concurrents portant sur une même clé."""
+
+    def __init__(self):
+        """Initialise le groupe d'appels."""
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn, *args, **kwargs):
+        """
+        Exécute fn une seule fois pour tous les appelants simultanés de la même clé.
+
+        Args:
+            key: Clé identifiant le calcul (hachable)
+            fn (callable): Fonction à exécuter
+            *args, **kwargs: Arguments transmis à fn
+
+        Returns:
+            Le résultat de fn, partagé entre tous les appelants de l'appel en cours
+
+        Raises:
+            Exception: L'exception levée par fn, propagée à tous les appelants
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def in_flight(self, key):
+        """Indique si un calcul est en cours pour la clé."""
+        with self._lock:
+            return key in self._calls
@@ -0,0 +1,496 @@
+"""
+Moteur de règles SWRL pour l'ontologie des inondations à Ouagadougou.
+Les règles du fichier data/swrl_rules_final.txt sont analysées en atomes (classes, propriétés,
+prédicats intégrés swrlb) puis compilées en plans de jointure évalués sur un index de faits,
+par chaînage avant jusqu'au point fixe.
+"""
+
+from rdflib import URIRef, Literal, RDF
+import re
+import logging
+import threading
+
+# Configuration du logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+SWRLB_URI = "http://www.w3.org/2003/11/swrlb#"
+
+# Prédicats intégrés swrlb pris en charge
+BUILTINS = {
+    "greaterThan": lambda a, b: a > b,
+    "greaterThanOrEqual": lambda a, b: a >= b,
+    "lessThan": lambda a, b: a < b,
+    "lessThanOrEqual": lambda a, b: a <= b,
+    "equal": lambda a, b: a == b,
+    "notEqual": lambda a, b: a != b,
+}
+
+ATOM_PATTERN = re.compile(r'([\w-]+):([\w-]+)\s*\(([^)]*)\)')
+PREFIX_PATTERN = re.compile(r'^\s*PREFIX\s+([\w-]*):\s*<([^>]+)>', re.MULTILINE)
+RULE_HEADER_PATTERN = re.compile(r'#\s*Règle\s+(\d+):(.*)')
+TYPED_LITERAL_PATTERN = re.compile(r'^"(.*)"\^\^([\w-]+):([\w-]+)$')
+
+
+def to_value(term):
+    """Normalise un terme RDF pour l'index de faits (les littéraux deviennent des valeurs Python)."""
+    if isinstance(term, Literal):
+        return term.toPython()
+    return term
+
+
+def to_term(value):
+    """Reconvertit une valeur de l'index de faits en terme RDF."""
+    if isinstance(value, (URIRef, Literal)):
+        return value
+    return Literal(value)
+
+
+class FactIndex:
+    """
+    Index de faits en mémoire utilisé par le moteur de règles.
+
+    Un index peut être posé au-dessus d'un index parent (l'ontologie de base) : les recherches
+    combinent les deux niveaux et les nouveaux faits ne sont ajoutés qu'au niveau courant.
+    """
+
+    def __init__(self, parent=None):
+        """
+        Initialise l'index.
+
+        Args:
+            parent (FactIndex, optional): Index parent consulté en lecture seule
+        """
+        self.parent = parent
+        self.types = {}      # classe -> {individus}
+        self.forward = {}    # propriété -> {sujet -> {objets}}
+        self.backward = {}   # propriété -> {objet -> {sujets}}
+
+    @classmethod
+    def from_graph(cls, graph, parent=None):
+        """
+        Construit un index à partir de tous les triplets d'un graphe rdflib.
+
+        Args:
+            graph (Graph): Graphe à indexer
+            parent (FactIndex, optional): Index parent
+
+        Returns:
+            FactIndex: Index des faits du graphe
+        """
+        index = cls(parent)
+        for s, p, o in graph:
+            index.add(s, p, o)
+        return index
+
+    def add(self, s, p, o):
+        """
+        Ajoute un fait à l'index.
+
+        Returns:
+            bool: True si le fait est nouveau, False s'il était déjà connu
+        """
+        if p == RDF.type:
+            if not isinstance(o, URIRef) or self.has_type(s, o):
+                return False
+            self.types.setdefault(o, set()).add(s)
+            return True
+
+        o = to_value(o)
+        if self.has(s, p, o):
+            return False
+        self.forward.setdefault(p, {}).setdefault(s, set()).add(o)
+        self.backward.setdefault(p, {}).setdefault(o, set()).add(s)
+        return True
+
+    def has_type(self, s, cls):
+        """Indique si l'individu s est du type cls."""
+        if s in self.types.get(cls, ()):
+            return True
+        return self.parent is not None and self.parent.has_type(s, cls)
+
+    def has(self, s, p, o):
+        """Indique si le fait (s, p, o) est connu, o étant une valeur normalisée."""
+        if o in self.forward.get(p, {}).get(s, ()):
+            return True
+        return self.parent is not None and self.parent.has(s, p, o)
+
+    def instances(self, cls):
+        """Itère sur les individus du type cls."""
+        yield from self.types.get(cls, ())
+        if self.parent is not None:
+            for s in self.parent.instances(cls):
+                if s not in self.types.get(cls, ()):
+                    yield s
+
+    def objects(self, s, p):
+        """Itère sur les valeurs de la propriété p pour le sujet s."""
+        own = self.forward.get(p, {}).get(s, ())
+        yield from own
+        if self.parent is not None:
+            for o in self.parent.objects(s, p):
+                if o not in own:
+                    yield o
+
+    def subjects(self, p, o):
+        """Itère sur les sujets ayant la valeur o pour la propriété p."""
+        own = self.backward.get(p, {}).get(o, ())
+        yield from own
+        if self.parent is not None:
+            for s in self.parent.subjects(p, o):
+                if s not in own:
+                    yield s
+
+    def pairs(self, p):
+        """Itère sur toutes les paires (sujet, objet) de la propriété p."""
+        own = self.forward.get(p, {})
+        for s, objs in own.items():
+            for o in objs:
+                yield s, o
+        if self.parent is not None:
+            for s, o in self.parent.pairs(p):
+                if o not in own.get(s, ()):
+                    yield s, o
+
+
+class Atom:
+    """Atome SWRL : classe (1 argument), propriété (2 arguments) ou prédicat intégré swrlb."""
+
+    def __init__(self, kind, predicate, args):
+        """
+        Args:
+            kind (str): "class", "property" ou "builtin"
+            predicate: URI de la classe ou de la propriété, ou nom du prédicat intégré
+            args (list): Arguments ; les variables sont des chaînes commençant par "?"
+        """
+        self.kind = kind
+        self.predicate = predicate
+        self.args = args
+
+    @property
+    def variables(self):
+        return {a for a in self.args if is_variable(a)}
+
+    def __repr__(self):
+        return f"{self.predicate}({', '.join(str(a) for a in self.args)})"
+
+
+def is_variable(arg):
+    return isinstance(arg, str) and not isinstance(arg, (URIRef, Literal)) and arg.startswith("?")
+
+
+class CompiledRule:
+    """Règle SWRL compilée en plan de jointure ordonné."""
+
+    def __init__(self, rule_id, description, text, body, head):
+        """
+        Args:
+            rule_id (int): Numéro de la règle dans le fichier
+            description (str): Description de la règle
+            text (str): Texte source de la règle
+            body (list): Atomes du corps
+            head (list): Atomes de la tête
+        """
+        self.id = rule_id
+        self.description = description
+        self.text = text
+        self.body = body
+        self.head = head
+        self.plan = self._compile()
+        # Nom de propriété associé à chaque variable, utilisé pour expliquer les valeurs liées
+        self.variable_sources = {}
+        for atom in body:
+            if atom.kind == "property" and is_variable(atom.args[1]):
+                self.variable_sources.setdefault(atom.args[1], str(atom.predicate).split('#')[-1])
+
+    def _compile(self):
+        """
+        Ordonne les atomes du corps : les filtres et vérifications sont placés dès que leurs
+        variables sont liées, les parcours complets le plus tard possible.
+
+        Raises:
+            ValueError: Si un prédicat intégré utilise une variable jamais liée
+        """
+        remaining = list(self.body)
+        bound = set()
+        plan = []
+
+        while remaining:
+            best, best_cost = None, None
+            for atom in remaining:
+                cost = self._cost(atom, bound)
+                if cost is not None and (best_cost is None or cost < best_cost):
+                    best, best_cost = atom, cost
+            if best is None:
+                raise ValueError(f"Règle {self.id}: variables non liées dans {remaining}")
+            remaining.remove(best)
+            plan.append(best)
+            bound |= best.variables
+
+        # Toutes les variables de la tête doivent être liées par le corps
+        head_vars = set().union(*(atom.variables for atom in self.head)) if self.head else set()
+        if not head_vars <= bound:
+            raise ValueError(f"Règle {self.id}: variables de tête non liées {head_vars - bound}")
+        return plan
+
+    @staticmethod
+    def _cost(atom, bound):
+        """Coût estimé d'un atome selon les variables déjà liées (None si non évaluable)."""
+        free = atom.variables - bound
+        if atom.kind == "builtin":
+            return None if free else 0
+        if atom.kind == "class":
+            return 1 if not free else 3
+        if not free:
+            return 1
+        return 2 if len(free) == 1 else 4
+
+    def evaluate(self, facts):
+        """
+        Évalue le corps de la règle sur l'index de faits.
+
+        Args:
+            facts (FactIndex): Faits disponibles
+
+        Returns:
+            list: Liaisons de variables (dict) satisfaisant le corps
+        """
+        bindings = [{}]
+        for atom in self.plan:
+            next_bindings = []
+            for binding in bindings:
+                next_bindings.extend(_match(atom, binding, facts))
+            if not next_bindings:
+                return []
+            bindings = next_bindings
+        return bindings
+
+    def instantiate_head(self, binding):
+        """Construit les faits (s, p, o) produits par la tête pour une liaison donnée."""
+        facts = []
+        for atom in self.head:
+            args = [binding[a] if is_variable(a) else a for a in atom.args]
+            if atom.kind == "class":
+                facts.append((args[0], RDF.type, atom.predicate))
+            elif atom.kind == "property":
+                facts.append((args[0], atom.predicate, args[1]))
+        return facts
+
+
+def _resolve(arg, binding):
+    """Retourne (valeur, True) si l'argument est lié ou constant, (None, False) sinon."""
+    if is_variable(arg):
+        if arg in binding:
+            return binding[arg], True
+        return None, False
+    return arg, True
+
+
+def _match(atom, binding, facts):
+    """Étend une liaison avec toutes les correspondances d'un atome."""
+    if atom.kind == "builtin":
+        left, _ = _resolve(atom.args[0], binding)
+        right, _ = _resolve(atom.args[1], binding)
+        try:
+            if BUILTINS[atom.predicate](left, right):
+                yield binding
+        except TypeError:
+            return
+        return
+
+    if atom.kind == "class":
+        var = atom.args[0]
+        value, is_bound = _resolve(var, binding)
+        if is_bound:
+            if facts.has_type(value, atom.predicate):
+                yield binding
+        else:
+            for s in facts.instances(atom.predicate):
+                yield {**binding, var: s}
+        return
+
+    subject_arg, object_arg = atom.args
+    s, s_bound = _resolve(subject_arg, binding)
+    o, o_bound = _resolve(object_arg, binding)
+    if s_bound and o_bound:
+        if facts.has(s, atom.predicate, o):
+            yield binding
+    elif s_bound:
+        for value in facts.objects(s, atom.predicate):
+            yield {**binding, object_arg: value}
+    elif o_bound:
+        for value in facts.subjects(atom.predicate, o):
+            yield {**binding, subject_arg: value}
+    else:
+        for s_value, o_value in facts.pairs(atom.predicate):
+            if subject_arg == object_arg and s_value != o_value:
+                continue
+            yield {**binding, subject_arg: s_value, object_arg: o_value}
+
+
+class SWRLRuleEngine:
+    """Moteur de chaînage avant pour les règles SWRL du fichier de règles."""
+
+    def __init__(self, swrl_rules_path, max_iterations=20):
+        """
+        Initialise le moteur de règles.
+
+        Args:
+            swrl_rules_path (str): Chemin vers le fichier de règles SWRL
+            max_iterations (int): Nombre maximal de passes avant d'abandonner la recherche du point fixe
+        """
+        self.swrl_rules_path = swrl_rules_path
+        self.max_iterations = max_iterations
+        self.rules = None
+        self._lock = threading.Lock()
+
+    def load(self, force_reload=False):
+        """
+        Analyse et compile les règles du fichier.
+
+        Args:
+            force_reload (bool): Force la recompilation même si les règles sont déjà chargées
+
+        Returns:
+            bool: True si les règles ont été compilées avec succès, False sinon
+        """
+        if self.rules is not None and not force_reload:
+            return True
+
+        with self._lock:
+            if self.rules is not None and not force_reload:
+                return True
+            try:
+                with open(self.swrl_rules_path, 'r', encoding='utf-8') as f:
+                    content = f.read()
+                self.rules = parse_rules(content)
+                logger.info(f"{len(self.rules)} règles SWRL compilées depuis {self.swrl_rules_path}")
+                return True
+            except Exception as e:
+                logger.error(f"Erreur lors de la compilation des règles SWRL: {str(e)}")
+                return False
+
+    def run(self, facts):
+        """
+        Applique les règles par chaînage avant jusqu'au point fixe.
+
+        Les faits dérivés sont ajoutés à l'index au fil de l'eau, ce qui permet aux règles
+        de s'appuyer sur les conclusions des autres règles.
+
+        Args:
+            facts (FactIndex): Index de faits, enrichi en place
+
+        Returns:
+            list: Déclenchements distincts des règles (dict avec rule_id, description,
+                bindings, values et triples produits)
+        """
+        if not self.load():
+            return []
+
+        derivations = []
+        fired = set()
+        for _ in range(self.max_iterations):
+            changed = False
+            for rule in self.rules:
+                for binding in rule.evaluate(facts):
+                    key = (rule.id, frozenset(binding.items()))
+                    if key in fired:
+                        continue
+                    fired.add(key)
+
+                    triples = []
+                    for s, p, o in rule.instantiate_head(binding):
+                        if facts.add(s, p, o):
+                            changed = True
+                        triples.append((s, p, to_term(o)))
+                    derivations.append({
+                        "rule_id": rule.id,
+                        "description": rule.description,
+                        "bindings": binding,
+                        "values": {rule.variable_sources[var]: value
+                                   for var, value in binding.items()
+                                   if var in rule.variable_sources and not isinstance(value, URIRef)},
+                        "triples": triples
+                    })
+            if not changed:
+                return derivations
+
+        logger.warning(f"Point fixe non atteint après {self.max_iterations} passes de règles SWRL")
+        return derivations
+
+
+def parse_rules(content):
+    """
+    Analyse le contenu d'un fichier de règles SWRL.
+
+    Args:
+        content (str): Contenu du fichier (préfixes puis blocs "# Règle N: description")
+
+    Returns:
+        list: Règles compilées (CompiledRule)
+    """
+    prefixes = {prefix: uri for prefix, uri in PREFIX_PATTERN.findall(content)}
+
+    rules = []
+    current = None
+    for line in content.split('\n'):
+        header = RULE_HEADER_PATTERN.match(line.strip())
+        if header:
+            current = {"id": int(header.group(1)), "description": header.group(2).strip(), "lines": []}
+            rules.append(current)
+        elif current is not None and line.strip() and not line.strip().startswith('#'):
+            current["lines"].append(line.strip())
+
+    compiled = []
+    for rule in rules:
+        text = " ".join(rule["lines"])
+        if "->" not in text:
+            continue
+        body_text, head_text = text.split("->", 1)
+        body = [_parse_atom(m, prefixes) for m in ATOM_PATTERN.finditer(body_text)]
+        head = [_parse_atom(m, prefixes) for m in ATOM_PATTERN.finditer(head_text)]
+        compiled.append(CompiledRule(rule["id"], rule["description"], text, body, head))
+    return compiled
+
+
+def _parse_atom(match, prefixes):
+    """Construit un Atom à partir d'une correspondance de ATOM_PATTERN."""
+    prefix, local, raw_args = match.groups()
+    args = [_parse_argument(arg.strip(), prefixes) for arg in raw_args.split(',') if arg.strip()]
+
+    namespace = prefixes.get(prefix)
+    if namespace is None:
+        raise ValueError(f"Préfixe inconnu: {prefix}")
+
+    if namespace == SWRLB_URI:
+        if local not in BUILTINS:
+            raise ValueError(f"Prédicat intégré non pris en charge: swrlb:{local}")
+        return Atom("builtin", local, args)
+    if len(args) == 1:
+        return Atom("class", URIRef(namespace + local), args)
+    return Atom("property", URIRef(namespace + local), args)
+
+
+def _parse_argument(arg, prefixes):
+    """Convertit un argument SWRL en variable, URI ou valeur littérale normalisée."""
+    if arg.startswith("?"):
+        return arg
+
+    typed = TYPED_LITERAL_PATTERN.match(arg)
+    if typed:
+        lexical, prefix, local = typed.groups()
+        return to_value(Literal(lexical, datatype=URIRef(prefixes[prefix] + local)))
+
+    if arg.startswith('"') and arg.endswith('"'):
+        return arg[1:-1]
+
+    try:
+        return float(arg)
+    except ValueError:
+        pass
+
+    if ":" in arg:
+        prefix, local = arg.split(":", 1)
+        if prefix in prefixes:
+            return URIRef(prefixes[prefix] + local)
+    raise ValueError(f"Argument SWRL invalide: {arg}")
@@ -0,0 +1,93 @@
+"""Tests du balayage vectorisé des seuils, comparé à une évaluation jour par jour."""
+
+import itertools
+import numpy as np
+import pytest
+from backtest import BacktestData, daily_risk_levels, score, sweep
+
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(1)
+    length = 120
+    days = np.datetime64("2020-06-01") + np.arange(length)
+    series = {
+        "wayen": rng.gamma(2.0, 10.0, length),
+        "gonse": rng.gamma(2.0, 8.0, length),
+        "water_level": rng.uniform(1.5, 4.5, length)
+    }
+    series["wayen"][[5, 60]] = np.nan
+    events = [
+        {"id": "a", "start": 3, "end": 4, "location": "Ouagadougou"},  # fenêtre tronquée au début
+        {"id": "b", "start": 40, "end": 42, "location": "Ouagadougou"},
+        {"id": "c", "start": 45, "end": 45, "location": "Ouagadougou"},  # fenêtre chevauchant la précédente
+        {"id": "d", "start": 100, "end": 103, "location": "Ouagadougou"}
+    ]
+    return BacktestData(days, series, events)
+
+
+def _reference(data, thresholds, min_level, lead_days):
+    """Scores calculés directement sur les alertes journalières."""
+    alarm = daily_risk_levels(data, thresholds) >= min_level
+    windows = [(max(e["start"] - lead_days, 0), e["end"], e["start"]) for e in data.events]
+    hits, leads = 0, []
+    for lo, hi, onset in windows:
+        days = np.flatnonzero(alarm[lo:hi + 1])
+        if len(days):
+            hits += 1
+            leads.append(onset - (lo + days[0]))
+    in_window = np.zeros(len(alarm), dtype=bool)
+    for lo, hi, _ in windows:
+        in_window[lo:hi + 1] = True
+    false_alarms, day = 0, 0
+    while day < len(alarm):
+        if alarm[day]:
+            end = day
+            while end + 1 < len(alarm) and alarm[end + 1]:
+                end += 1
+            false_alarms += not in_window[day:end + 1].any()
+            day = end + 1
+        else:
+            day += 1
+    return {"hits": hits, "misses": len(windows) - hits, "false_alarms": false_alarms,
+            "mean_lead_days": float(np.mean(leads)) if leads else None}
+
+
+GRID = {
+    "wayen_moderate": [10.0, 30.0, 60.0],
+    "gonse_moderate": [20.0, 50.0],
+    "water_level": [3.0, 4.4],
+    "wayen_alert": [40.0, 80.0]
+}
+
+
+@pytest.mark.parametrize("min_level", [1, 2])
+@pytest.mark.parametrize("lead_days", [0, 7])
+def test_sweep_matches_reference_for_every_combination(data, min_level, lead_days):
+    result = sweep(data, GRID, min_level=min_level, lead_days=lead_days)
+    names = list(GRID)
+    active = [name for name in names if not np.isnan(result[name][0])]
+    assert len(result["hits"]) == int(np.prod([len(GRID[name]) for name in active]))
+
+    for i in range(len(result["hits"])):
+        thresholds = {name: float(result[name][i]) for name in active}
+        expected = _reference(data, thresholds, min_level, lead_days)
+        assert result["hits"][i] == expected["hits"]
+        assert result["misses"][i] == expected["misses"]
+        assert result["false_alarms"][i] == expected["false_alarms"]
+        if expected["mean_lead_days"] is None:
+            assert np.isnan(result["mean_lead_days"][i])
+        else:
+            assert result["mean_lead_days"][i] == pytest.approx(expected["mean_lead_days"])
+
+
+def test_score_matches_sweep_entry(data):
+    result = sweep(data, GRID)
+    for combo in itertools.product(*GRID.values()):
+        thresholds = dict(zip(GRID, combo))
+        single = score(data, thresholds)
+        index = np.flatnonzero(np.all([result[name] == value for name, value in thresholds.items()], axis=0))
+        assert len(index) == 1
+        for metric in ("hits", "misses", "false_alarms", "pod", "far", "csi"):
+            assert single[metric] == pytest.approx(float(result[metric][index[0]]))
+        assert single == {**single, **_reference(data, thresholds, 1, 7)}
@@ -0,0 +1,81 @@
+"""Tests des fenêtres glissantes face aux observations tardives ou corrigées."""
+
+import math
+import numpy as np
+import pytest
+from features import RollingSeries, MS_PER_HOUR
+
+HOUR = MS_PER_HOUR
+START = 1_700_000_000_000
+
+
+def _expected(points, hours):
+    """Caractéristiques attendues d'une fenêtre, calculées directement sur les observations."""
+    latest = max(t for t, _ in points)
+    inside = sorted((t, v) for t, v in points if t > latest - hours * HOUR)
+    t = np.array([p[0] for p in inside], dtype=np.float64) / HOUR
+    v = np.array([p[1] for p in inside])
+    slope = np.polyfit(t, v, 1)[0] if len(inside) >= 2 else None
+    return {"count": len(inside), "sum": round(v.sum(), 3), "max": v.max(), "slope": slope}
+
+
+def _assert_matches(series, points):
+    for name, hours in (("24h", 24), ("72h", 72)):
+        summary = series.summary()["windows"][name]
+        expected = _expected(points, hours)
+        assert summary["count"] == expected["count"]
+        assert summary["sum"] == pytest.approx(expected["sum"])
+        assert summary["max"] == expected["max"]
+        assert summary["slope_per_hour"] == pytest.approx(expected["slope"], abs=1e-4)
+
+
+def _hourly(values, first=0):
+    return [(START + (first + i) * HOUR, float(v)) for i, v in enumerate(values)]
+
+
+def test_in_order_observations():
+    points = _hourly(np.sin(np.arange(100) / 5) * 10 + 20)
+    series = RollingSeries()
+    for point in points:
+        series.observe([point])
+    _assert_matches(series, points)
+
+
+def test_late_observation_inside_window_is_merged():
+    points = _hourly(range(48))
+    late = points.pop(40)
+    series = RollingSeries()
+    series.observe(points)
+
+    assert series.observe([late]) == 1
+    _assert_matches(series, points + [late])
+    assert series.summary()["latest"]["value"] == 47.0
+
+
+def test_corrected_observation_replaces_previous_value():
+    points = _hourly(range(48))
+    series = RollingSeries()
+    series.observe(points)
+
+    corrected = (points[45][0], 100.0)
+    assert series.observe([corrected]) == 1
+    points[45] = corrected
+    _assert_matches(series, points)
+    # La même valeur reçue une seconde fois ne change rien
+    assert series.observe([corrected]) == 0
+
+
+def test_observation_older_than_widest_window_is_ignored():
+    points = _hourly(range(100), first=10)
+    series = RollingSeries()
+    series.observe(points)
+    before = series.summary()
+
+    assert series.observe([(START, 1000.0)]) == 0
+    assert series.summary() is before
+
+
+def test_missing_values_are_ignored():
+    series = RollingSeries()
+    assert series.observe([(START, None), (START + HOUR, math.nan), (None, 3.0)]) == 0
+    assert series.summary() is None
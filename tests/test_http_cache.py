@@ -0,0 +1,62 @@
+"""Tests des ETags, des réponses 304 et de la compression des réponses JSON."""
+
+import gzip
+import json
+import pytest
+from flask import Flask
+from http_cache import JSONResponseCache
+
+PAYLOAD = {"station": "Wayen", "values": list(range(500))}
+
+
+@pytest.fixture
+def client():
+    cache = JSONResponseCache(min_compress_size=1024)
+    app = Flask(__name__)
+    state = {"data": PAYLOAD}
+
+    @app.route("/data")
+    def data():
+        return cache.respond(state["data"], envelope={"status": "success"}, max_age=60)
+
+    @app.route("/raw")
+    def raw():
+        return cache.respond(state["data"])
+
+    client = app.test_client()
+    client.state = state
+    return client
+
+
+def test_response_carries_weak_etag_and_cache_headers(client):
+    response = client.get("/data")
+    assert response.status_code == 200
+    assert response.headers["ETag"].startswith('W/"')
+    assert response.headers["Cache-Control"] == "public, max-age=60"
+    assert response.get_json() == {"status": "success", "data": PAYLOAD}
+
+
+def test_matching_if_none_match_returns_304(client):
+    etag = client.get("/data").headers["ETag"]
+    response = client.get("/data", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.data == b""
+    assert response.headers["ETag"] == etag
+    # L'ETag ne dépend pas de l'enveloppe : il est le même avec ou sans
+    assert client.get("/raw").headers["ETag"] == etag
+
+
+def test_changed_data_gets_new_etag(client):
+    etag = client.get("/data").headers["ETag"]
+    client.state["data"] = {**PAYLOAD, "station": "Gonsé"}
+    response = client.get("/data", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+def test_large_response_is_gzip_compressed(client):
+    response = client.get("/raw", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.headers["Vary"] == "Accept-Encoding"
+    assert json.loads(gzip.decompress(response.data)) == PAYLOAD
+    assert "Content-Encoding" not in client.get("/raw").headers
@@ -0,0 +1,110 @@
+"""Tests du raisonnement incrémental, comparé à une fermeture OWL-RL complète par owlrl."""
+
+import owlrl
+from rdflib import BNode, Graph, Literal, Namespace, RDF, RDFS, OWL
+from incremental_reasoner import IncrementalReasoner, materialize_rules
+from swrl_engine import SWRLRuleEngine
+
+EX = Namespace("http://example.org/flood#")
+
+
+def _schema():
+    """Petite ontologie couvrant les règles incrémentales (hiérarchies, domaines, inverses, hasValue...)."""
+    g = Graph()
+    g.add((EX.HydrologicalStation, RDFS.subClassOf, EX.Station))
+    g.add((EX.Station, RDFS.subClassOf, EX.Location))
+    g.add((EX.hasDischarge, RDFS.domain, EX.HydrologicalStation))
+    g.add((EX.isDownstreamOf, RDFS.domain, EX.Zone))
+    g.add((EX.isDownstreamOf, RDFS.range, EX.Station))
+    g.add((EX.isDownstreamOf, OWL.inverseOf, EX.isUpstreamOf))
+    g.add((EX.isDownstreamOf, RDFS.subPropertyOf, EX.dependsOn))
+    g.add((EX.flowsInto, RDF.type, OWL.TransitiveProperty))
+    g.add((EX.adjacentTo, RDF.type, OWL.SymmetricProperty))
+    restriction = BNode()
+    g.add((restriction, RDF.type, OWL.Restriction))
+    g.add((restriction, OWL.onProperty, EX.hasFloodRisk))
+    g.add((restriction, OWL.hasValue, EX.HighRisk))
+    g.add((EX.HighRiskZone, OWL.equivalentClass, restriction))
+    g.add((EX.Kossodo, RDF.type, EX.Zone))
+    g.add((EX.Nakanbe, EX.flowsInto, EX.Volta))
+    return g
+
+
+# Le nœud anonyme de la restriction doit être le même dans tous les graphes comparés
+SCHEMA = _schema()
+
+DELTA = [
+    (EX.Wayen, EX.hasDischarge, Literal(60.0)),
+    (EX.Kossodo, EX.isDownstreamOf, EX.Wayen),
+    (EX.Kossodo, EX.adjacentTo, EX.Pissy),
+    (EX.Massili, EX.flowsInto, EX.Nakanbe),
+    (EX.Kossodo, EX.hasFloodRisk, EX.HighRisk),
+    (EX.Tanghin, RDF.type, EX.HighRiskZone),
+]
+
+
+def _closed(graph):
+    """Ferme le graphe sur place par owlrl et le retourne."""
+    owlrl.DeductiveClosure(owlrl.OWLRL_Semantics).expand(graph)
+    return graph
+
+
+def _individual_facts(graph):
+    """Faits sur les individus de l'exemple : types nommés et propriétés entre termes de l'exemple."""
+    return {(s, p, o) for s, p, o in graph
+            if str(s).startswith(str(EX)) and (str(p).startswith(str(EX)) or p == RDF.type)
+            and (isinstance(o, Literal) or str(o).startswith(str(EX)))}
+
+
+def test_derive_matches_full_closure():
+    base = _closed(SCHEMA + Graph())
+    overlay = Graph()
+    derived = IncrementalReasoner(base).derive(DELTA, overlay)
+
+    full = SCHEMA + Graph()
+    for triple in DELTA:
+        full.add(triple)
+    _closed(full)
+
+    incremental = _individual_facts(base) | _individual_facts(overlay)
+    assert incremental == _individual_facts(full)
+    # Rien n'est dérivé hors de la fermeture complète, et la base n'est pas modifiée
+    assert all(triple in full for triple in derived)
+    assert (EX.Kossodo, EX.isDownstreamOf, EX.Wayen) not in base
+
+
+def test_derive_expected_consequences():
+    base = _closed(SCHEMA + Graph())
+    overlay = Graph()
+    IncrementalReasoner(base).derive(DELTA, overlay)
+
+    assert (EX.Wayen, RDF.type, EX.Location) in overlay  # prp-dom puis cax-sco
+    assert (EX.Wayen, EX.isUpstreamOf, EX.Kossodo) in overlay  # prp-inv
+    assert (EX.Kossodo, EX.dependsOn, EX.Wayen) in overlay  # prp-spo1
+    assert (EX.Pissy, EX.adjacentTo, EX.Kossodo) in overlay  # prp-symp
+    assert (EX.Massili, EX.flowsInto, EX.Volta) in overlay  # prp-trp avec la base
+    assert (EX.Kossodo, RDF.type, EX.HighRiskZone) in overlay  # cls-hv2
+    assert (EX.Tanghin, EX.hasFloodRisk, EX.HighRisk) in overlay  # cls-hv1
+
+
+def test_materialize_rules_matches_closure_of_conclusions(tmp_path):
+    rules = tmp_path / "rules.txt"
+    rules.write_text(
+        "PREFIX ex: <http://example.org/flood#>\n"
+        "PREFIX swrlb: <http://www.w3.org/2003/11/swrlb#>\n"
+        "# Règle 1: Zones en aval d'une station en crue\n"
+        "ex:hasDischarge(?s, ?d) ^ ex:isDownstreamOf(?z, ?s) ^ swrlb:greaterThan(?d, 50.0)\n"
+        "-> ex:hasFloodRisk(?z, ex:HighRisk)\n",
+        encoding="utf-8"
+    )
+    graph = SCHEMA + Graph()
+    for triple in DELTA[:2]:
+        graph.add(triple)
+    _closed(graph)
+
+    derivations = materialize_rules(graph, SWRLRuleEngine(str(rules)), IncrementalReasoner(graph))
+
+    assert [d["rule_id"] for d in derivations] == [1]
+    expected = _closed(graph + Graph())
+    assert _individual_facts(graph) == _individual_facts(expected)
+    assert (EX.Kossodo, RDF.type, EX.HighRiskZone) in graph
@@ -0,0 +1,96 @@
+"""Tests de l'analyse des règles SWRL et du chaînage avant jusqu'au point fixe."""
+
+import os
+import pytest
+from rdflib import Namespace, URIRef, RDF
+from swrl_engine import FactIndex, SWRLRuleEngine, parse_rules
+
+EX = Namespace("http://example.org/flood#")
+
+RULES = """PREFIX ex: <http://example.org/flood#>
+PREFIX swrlb: <http://www.w3.org/2003/11/swrlb#>
+PREFIX xsd: <http://www.w3.org/2001/XMLSchema#>
+
+# Règle 1: Débit élevé
+# Explication: commentaire ignoré par l'analyse
+ex:Station(?s) ^
+ex:hasDischarge(?s, ?d) ^
+swrlb:greaterThan(?d, "10.0"^^xsd:decimal)
+-> ex:HighFlow(?s)
+
+# Règle 2: Zones en aval d'une station en crue
+ex:HighFlow(?s) ^ ex:isDownstreamOf(?z, ?s) -> ex:hasFloodRisk(?z, ex:HighRisk)
+
+# Règle 3: Zones à risque élevé
+ex:hasFloodRisk(?z, ex:HighRisk) -> ex:AtRisk(?z)
+"""
+
+
+@pytest.fixture
+def engine(tmp_path):
+    path = tmp_path / "rules.txt"
+    path.write_text(RULES, encoding="utf-8")
+    return SWRLRuleEngine(str(path))
+
+
+def test_parse_rules_atoms():
+    """Les en-têtes, atomes, prédicats intégrés et littéraux typés sont analysés."""
+    rules = parse_rules(RULES)
+    assert [rule.id for rule in rules] == [1, 2, 3]
+    assert rules[0].description == "Débit élevé"
+    assert [atom.kind for atom in rules[0].body] == ["class", "property", "builtin"]
+    assert rules[0].body[2].args == ["?d", 10]
+    assert rules[1].head[0].args == ["?z", EX.HighRisk]
+    # Le prédicat intégré est évalué une fois ses variables liées
+    assert rules[0].plan[-1].kind == "builtin"
+
+
+def test_parse_rules_rejects_unbound_head_variable():
+    with pytest.raises(ValueError):
+        parse_rules("PREFIX ex: <http://example.org/flood#>\n# Règle 1: x\nex:Station(?s) -> ex:near(?s, ?z)\n")
+
+
+def test_parse_rules_rejects_unknown_builtin():
+    with pytest.raises(ValueError):
+        parse_rules("PREFIX ex: <http://example.org/flood#>\nPREFIX swrlb: <http://www.w3.org/2003/11/swrlb#>\n"
+                    "# Règle 1: x\nex:hasDischarge(?s, ?d) ^ swrlb:between(?d, 1) -> ex:HighFlow(?s)\n")
+
+
+def test_repository_rules_compile():
+    """Les règles livrées dans data/ se compilent toutes."""
+    path = os.path.join(os.path.dirname(__file__), os.pardir, "data", "swrl_rules_final.txt")
+    with open(path, encoding="utf-8") as f:
+        rules = parse_rules(f.read())
+    assert [rule.id for rule in rules] == list(range(1, len(rules) + 1))
+
+
+def test_run_reaches_fixpoint_through_chained_rules(engine):
+    facts = FactIndex()
+    for station, discharge in ((EX.Wayen, 60.0), (EX.Gonse, 4.0)):
+        facts.add(station, RDF.type, EX.Station)
+        facts.add(station, EX.hasDischarge, discharge)
+    facts.add(EX.Kossodo, EX.isDownstreamOf, EX.Wayen)
+    facts.add(EX.Pissy, EX.isDownstreamOf, EX.Gonse)
+
+    derivations = engine.run(facts)
+
+    assert [d["rule_id"] for d in derivations] == [1, 2, 3]
+    assert derivations[0]["values"] == {"hasDischarge": 60.0}
+    assert facts.has_type(EX.Kossodo, EX.AtRisk)
+    assert not facts.has_type(EX.Pissy, EX.AtRisk)
+    # Un second passage ne dérive plus rien de nouveau
+    assert all(not facts.add(*triple) for d in engine.run(facts) for triple in d["triples"])
+
+
+def test_run_on_overlay_leaves_parent_untouched(engine):
+    base = FactIndex()
+    base.add(EX.Wayen, RDF.type, EX.Station)
+    base.add(EX.Kossodo, EX.isDownstreamOf, EX.Wayen)
+    overlay = FactIndex(parent=base)
+    overlay.add(EX.Wayen, EX.hasDischarge, 60.0)
+
+    engine.run(overlay)
+
+    assert overlay.has_type(EX.Kossodo, EX.AtRisk)
+    assert not base.has_type(EX.Kossodo, EX.AtRisk)
+    assert isinstance(next(iter(overlay.instances(EX.Station))), URIRef)
@@ -0,0 +1,56 @@
+"""Tests des bornes du sous-échantillonnage LTTB et min/max."""
+
+import numpy as np
+import pytest
+from timeseries import TimeSeries, MIN_DOWNSAMPLING_POINTS
+
+
+@pytest.fixture
+def series():
+    rng = np.random.default_rng(0)
+    timestamps = np.arange(1000, dtype=np.int64) * 3_600_000
+    values = np.cumsum(rng.normal(size=1000))
+    values[[100, 400]] = [50.0, -50.0]  # extrêmes isolés
+    values[700] = np.nan
+    return TimeSeries(timestamps, values)
+
+
+@pytest.mark.parametrize("max_points", [3, 4, 10, 101, 999])
+def test_lttb_returns_exactly_max_points(series, max_points):
+    sub = series.downsample(max_points, "lttb")
+    assert len(sub) == max_points
+    assert sub.timestamps[0] == series.timestamps[0]
+    assert sub.timestamps[-1] == series.timestamps[-1]
+    assert np.all(np.diff(sub.timestamps) > 0)
+
+
+@pytest.mark.parametrize("max_points", [3, 4, 10, 101, 999])
+def test_minmax_bounds_and_extremes(series, max_points):
+    sub = series.downsample(max_points, "minmax")
+    assert 0 < len(sub) <= max_points
+    assert np.all(np.diff(sub.timestamps) > 0)
+    assert np.nanmax(sub.values) == 50.0
+    assert np.nanmin(sub.values) == -50.0
+
+
+@pytest.mark.parametrize("method", ["lttb", "minmax"])
+def test_short_series_is_returned_unchanged(series, method):
+    assert series.downsample(len(series), method) is series
+    assert series.downsample(None, method) is series
+
+
+@pytest.mark.parametrize("max_points", [0, 1, MIN_DOWNSAMPLING_POINTS - 1])
+def test_too_few_points_is_rejected(series, max_points):
+    with pytest.raises(ValueError):
+        series.downsample(max_points)
+
+
+def test_unknown_method_is_rejected(series):
+    with pytest.raises(ValueError):
+        series.downsample(10, "mean")
+
+
+def test_between_is_inclusive(series):
+    sub = series.between(series.timestamps[10], series.timestamps[20])
+    assert len(sub) == 11
+    assert sub.timestamps[0] == series.timestamps[10]
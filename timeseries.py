@@ -0,0 +1,280 @@
+"""
+Module de stockage en colonnes des séries hydrologiques.
+Chaque série est conservée sous forme de tableaux NumPy (horodatages en millisecondes, valeurs),
+ce qui permet les requêtes par intervalle de temps et le sous-échantillonnage côté serveur
+(LTTB ou min/max par intervalle) sans parcourir la série point par point en Python.
+"""
+
+from collections import OrderedDict
+from datetime import datetime, timezone
+import threading
+import numpy as np
+
+# Méthodes de sous-échantillonnage disponibles
+DOWNSAMPLING_METHODS = ("lttb", "minmax")
+# LTTB conserve toujours le premier et le dernier point : il faut au moins un intervalle entre les deux
+MIN_DOWNSAMPLING_POINTS = 3
+
+
+class TimeSeries:
+    """Série temporelle en colonnes : horodatages (ms, triés) et valeurs."""
+
+    def __init__(self, timestamps, values):
+        """
+        Args:
+            timestamps (np.ndarray): Horodatages en millisecondes (int64)
+            values (np.ndarray): Valeurs (float64, NaN pour les valeurs manquantes)
+        """
+        if len(timestamps) > 1 and np.any(np.diff(timestamps) < 0):
+            order = np.argsort(timestamps, kind="stable")
+            timestamps, values = timestamps[order], values[order]
+        self.timestamps = timestamps
+        self.values = values
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    @classmethod
+    def from_pairs(cls, items):
+        """
+        Construit une série à partir de paires [horodatage ms, valeur] (format FANFAR).
+
+        Args:
+            items (list): Paires [horodatage, valeur] ; les éléments incomplets sont ignorés
+
+        Returns:
+            TimeSeries: Série triée par horodatage
+        """
+        pairs = [item[:2] for item in items if len(item) >= 2]
+        if not pairs:
+            return cls(np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64))
+        array = np.array(pairs, dtype=np.float64)  # None -> NaN
+        return cls(array[:, 0].astype(np.int64), array[:, 1])
+
+    @classmethod
+    def from_columns(cls, columns, value_key):
+        """
+        Construit une série à partir de colonnes {"timestamp": [...], value_key: [...]}.
+
+        Args:
+            columns (dict): Colonnes sérialisables (forme stockée dans le cache)
+            value_key (str): Nom de la colonne des valeurs
+
+        Returns:
+            TimeSeries: Série triée par horodatage
+        """
+        return cls(np.asarray(columns["timestamp"], dtype=np.int64),
+                   np.asarray(columns[value_key], dtype=np.float64))
+
+    def to_columns(self, value_key):
+        """Retourne la série sous forme de colonnes sérialisables en JSON (NaN -> None)."""
+        return {
+            "timestamp": self.timestamps.tolist(),
+            value_key: np.where(np.isnan(self.values), None, self.values).tolist()
+        }
+
+    def between(self, start=None, end=None):
+        """
+        Retourne la portion de la série comprise entre deux horodatages (bornes incluses).
+
+        Les tableaux retournés sont des vues sur ceux de la série, sans copie.
+
+        Args:
+            start (int, optional): Horodatage de début en millisecondes
+            end (int, optional): Horodatage de fin en millisecondes
+
+        Returns:
+            TimeSeries: Sous-série
+        """
+        lo = 0 if start is None else np.searchsorted(self.timestamps, start, side="left")
+        hi = len(self) if end is None else np.searchsorted(self.timestamps, end, side="right")
+        sub = TimeSeries.__new__(TimeSeries)
+        sub.timestamps = self.timestamps[lo:hi]
+        sub.values = self.values[lo:hi]
+        return sub
+
+    def downsample(self, max_points, method="lttb"):
+        """
+        Réduit la série à au plus max_points points en conservant sa forme.
+
+        Args:
+            max_points (int): Nombre maximal de points retournés
+            method (str): "lttb" (Largest-Triangle-Three-Buckets) ou "minmax" (extrêmes par intervalle)
+
+        Returns:
+            TimeSeries: Série sous-échantillonnée (la série elle-même si elle est déjà assez courte)
+
+        Raises:
+            ValueError: Si la méthode est inconnue ou si max_points est inférieur à MIN_DOWNSAMPLING_POINTS
+        """
+        if method not in DOWNSAMPLING_METHODS:
+            raise ValueError(f"Méthode de sous-échantillonnage inconnue: {method}")
+        if max_points is not None and max_points < MIN_DOWNSAMPLING_POINTS:
+            raise ValueError(f"Le nombre de points doit être au moins {MIN_DOWNSAMPLING_POINTS}: {max_points}")
+        if max_points is None or len(self) <= max_points:
+            return self
+
+        indices = _lttb_indices(self.timestamps, self.values, max_points) if method == "lttb" \
+            else _minmax_indices(self.values, max_points)
+        sub = TimeSeries.__new__(TimeSeries)
+        sub.timestamps = self.timestamps[indices]
+        sub.values = self.values[indices]
+        return sub
+
+    def to_records(self, value_key, unit):
+        """
+        Convertit la série en liste de points au format de l'API.
+
+        Args:
+            value_key (str): Nom du champ de valeur (ex: "discharge")
+            unit (str): Unité de la valeur
+
+        Returns:
+            list: Points {"timestamp", "datetime", value_key, "unit"}
+        """
+        datetimes = np.datetime_as_string(self.timestamps.astype("datetime64[ms]").astype("datetime64[s]"))
+        values = np.where(np.isnan(self.values), None, self.values).tolist()
+        return [
+            {"timestamp": ts, "datetime": f"{dt}Z", value_key: value, "unit": unit}
+            for ts, dt, value in zip(self.timestamps.tolist(), datetimes.tolist(), values)
+        ]
+
+
+def _lttb_indices(timestamps, values, max_points):
+    """Indices retenus par l'algorithme Largest-Triangle-Three-Buckets."""
+    x = timestamps.astype(np.float64)
+    y = np.nan_to_num(values, nan=0.0)
+    n = len(x)
+    # Le premier et le dernier point sont toujours conservés ; les autres sont répartis en intervalles
+    edges = np.linspace(1, n - 1, max_points - 1).astype(np.int64)
+    indices = np.empty(max_points, dtype=np.int64)
+    indices[0] = 0
+    indices[-1] = n - 1
+
+    selected = 0
+    for i in range(max_points - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # Moyenne de l'intervalle suivant, troisième sommet du triangle
+        next_lo, next_hi = hi, (edges[i + 2] if i + 2 < len(edges) else n)
+        avg_x = x[next_lo:next_hi].mean()
+        avg_y = y[next_lo:next_hi].mean()
+
+        ax, ay = x[selected], y[selected]
+        areas = np.abs((ax - avg_x) * (y[lo:hi] - ay) - (ax - x[lo:hi]) * (avg_y - ay))
+        selected = lo + int(np.argmax(areas))
+        indices[i + 1] = selected
+    return indices
+
+
+def _minmax_indices(values, max_points):
+    """Indices des minimums et maximums de chaque intervalle, dans l'ordre chronologique."""
+    n = len(values)
+    buckets = max(max_points // 2, 1)
+    edges = np.linspace(0, n, buckets + 1).astype(np.int64)
+    filled = np.nan_to_num(values, nan=np.nanmean(values) if np.any(~np.isnan(values)) else 0.0)
+
+    # Découper en intervalles de même taille à l'aide d'un tableau rembourré
+    width = int(np.max(np.diff(edges)))
+    positions = edges[:-1, None] + np.arange(width)[None, :]
+    valid = positions < edges[1:, None]
+    positions = np.where(valid, positions, edges[1:, None] - 1)
+    window = filled[positions]
+    mins = positions[np.arange(buckets), np.argmin(np.where(valid, window, np.inf), axis=1)]
+    maxs = positions[np.arange(buckets), np.argmax(np.where(valid, window, -np.inf), axis=1)]
+    return np.unique(np.concatenate([mins, maxs]))
+
+
+def parse_time_bound(value):
+    """
+    Convertit une borne de temps de l'API en horodatage en millisecondes.
+
+    Args:
+        value (str): Horodatage en millisecondes ou date ISO 8601 (ex: 2025-06-01 ou 2025-06-01T12:00:00Z)
+
+    Returns:
+        int: Horodatage en millisecondes, ou None si la borne est absente
+
+    Raises:
+        ValueError: Si la valeur n'est pas reconnue
+    """
+    if value is None or value == "":
+        return None
+    if value.lstrip("-").isdigit():
+        return int(value)
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp() * 1000)
+
+
+class HydroSeriesStore:
+    """Séries hydrologiques par station, en colonnes, avec mémorisation des réponses par paramètres."""
+
+    SERIES_KEYS = ("history", "forecast")
+
+    def __init__(self, maxsize=64):
+        """
+        Args:
+            maxsize (int): Nombre maximal de réponses mémorisées
+        """
+        self.maxsize = maxsize
+        self._series = {}  # station -> (donnée en cache, {nom: TimeSeries})
+        self._results = OrderedDict()  # (station, paramètres) -> (donnée en cache, réponse)
+        self._lock = threading.Lock()
+
+    def series(self, station, data):
+        """
+        Retourne les séries en colonnes d'une station, reconstruites seulement si la donnée a changé.
+
+        Args:
+            station (tuple): Identifiant de la station
+            data (dict): Donnée FANFAR en cache (colonnes "history" et "forecast")
+
+        Returns:
+            dict: {"history": TimeSeries, "forecast": TimeSeries}
+        """
+        with self._lock:
+            entry = self._series.get(station)
+            if entry is not None and entry[0] is data:
+                return entry[1]
+
+        series = {name: TimeSeries.from_columns(data[name], "discharge") for name in self.SERIES_KEYS}
+        with self._lock:
+            self._series[station] = (data, series)
+        return series
+
+    def query(self, station, data, start=None, end=None, max_points=None, method="lttb"):
+        """
+        Construit la réponse de l'API pour un intervalle de temps et un nombre de points donnés.
+
+        Args:
+            station (tuple): Identifiant de la station
+            data (dict): Donnée FANFAR en cache
+            start (int, optional): Début de l'intervalle (ms)
+            end (int, optional): Fin de l'intervalle (ms)
+            max_points (int, optional): Nombre maximal de points par série
+            method (str): Méthode de sous-échantillonnage ("lttb" ou "minmax")
+
+        Returns:
+            dict: Station, séries historique et prévision, seuils et graduations
+
+        Raises:
+            ValueError: Si la méthode de sous-échantillonnage est inconnue
+        """
+        key = (station, start, end, max_points, method)
+        with self._lock:
+            entry = self._results.get(key)
+            if entry is not None and entry[0] is data:
+                self._results.move_to_end(key)
+                return entry[1]
+
+        result = {k: v for k, v in data.items() if k not in self.SERIES_KEYS}
+        for name, series in self.series(station, data).items():
+            result[name] = series.between(start, end).downsample(max_points, method).to_records("discharge", "m³/s")
+
+        with self._lock:
+            self._results[key] = (data, result)
+            self._results.move_to_end(key)
+            while len(self._results) > self.maxsize:
+                self._results.popitem(last=False)
+        return result
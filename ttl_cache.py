@@ -0,0 +1,150 @@
+"""
+Module de cache en mémoire à clés multiples.
+Chaque entrée a sa propre durée de vie ; la taille est bornée avec éviction LRU
+et des compteurs de succès, d'échecs et d'évictions sont tenus pour le suivi.
+Un stockage partagé optionnel sert de second niveau entre les processus.
+"""
+
+from collections import OrderedDict
+import threading
+import time
+
+
+class TTLCache:
+    """Cache clé/valeur borné avec durée de vie par entrée et éviction LRU."""
+
+    def __init__(self, maxsize=128, ttl=300, backend=None, name=None):
+        """
+        Initialise le cache.
+
+        Args:
+            maxsize (int): Nombre maximal d'entrées conservées
+            ttl (float): Durée de vie par défaut d'une entrée en secondes
+            backend (SQLiteCacheBackend, optional): Stockage partagé consulté en cas d'absence locale
+            name (str, optional): Nom du cache dans le stockage partagé
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.backend = backend
+        self.name = name
+        self._entries = OrderedDict()  # clé -> (valeur, date de stockage, date d'expiration)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.shared_hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        """
+        Retourne la valeur associée à une clé si elle n'a pas expiré.
+
+        Args:
+            key: Clé recherchée (hachable)
+            default: Valeur retournée en cas d'absence ou d'expiration
+
+        Returns:
+            La valeur en cache ou default
+        """
+        entry = self.lookup(key)
+        return default if entry is None else entry[0]
+
+    def lookup(self, key, max_stale=0):
+        """
+        Recherche une entrée, en acceptant les entrées expirées depuis moins de max_stale secondes.
+
+        Args:
+            key: Clé recherchée (hachable)
+            max_stale (float): Durée maximale après expiration pendant laquelle l'entrée reste utilisable
+
+        Returns:
+            tuple: (valeur, âge en secondes, expirée ou non), ou None si aucune entrée utilisable
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0], now - entry[1], False
+
+        # Entrée écrite par un autre processus : la copier localement pour sa durée de vie restante
+        if self.backend is not None:
+            shared = self.backend.get(self.name, key)
+            if shared is not None and (entry is None or shared[1] > entry[1]):
+                with self._lock:
+                    self._store(key, shared[0], shared[1], shared[2])
+                entry = shared
+                if shared[2] > now:
+                    with self._lock:
+                        self.hits += 1
+                        self.shared_hits += 1
+                    return shared[0], now - shared[1], False
+
+        with self._lock:
+            if entry is not None and entry[2] + max_stale > now:
+                self.stale_hits += 1
+                return entry[0], now - entry[1], True
+            self.misses += 1
+        return None
+
+    def set(self, key, value, ttl=None):
+        """
+        Enregistre une valeur, en évinçant les entrées les moins récemment utilisées si nécessaire.
+
+        Args:
+            key: Clé (hachable)
+            value: Valeur à stocker
+            ttl (float, optional): Durée de vie spécifique à cette entrée
+        """
+        now = time.time()
+        expires_at = now + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._store(key, value, now, expires_at)
+        if self.backend is not None:
+            self.backend.set(self.name, key, value, now, expires_at)
+
+    def _store(self, key, value, stored_at, expires_at):
+        """Enregistre une entrée locale et applique l'éviction LRU (verrou déjà acquis)."""
+        self._entries[key] = (value, stored_at, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def age(self, key):
+        """
+        Retourne l'âge en secondes d'une entrée, expirée ou non.
+
+        Returns:
+            float: Âge de l'entrée, ou None si la clé est absente
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None and self.backend is not None:
+            entry = self.backend.get(self.name, key)
+        return None if entry is None else time.time() - entry[1]
+
+    def clear(self):
+        """Vide le cache sans réinitialiser les compteurs."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """
+        Retourne les statistiques d'utilisation du cache.
+
+        Returns:
+            dict: Taille, capacité, durée de vie et compteurs
+        """
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "shared_hits": self.shared_hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "evictions": self.evictions
+            }